@@ -1,2 +1 @@
 """FastAPI application for {{ cookiecutter.project_name }}."""
-
@@ -0,0 +1,106 @@
+"""Deadline-aware admission control driven by observed latency."""
+
+from __future__ import annotations
+
+import threading
+from typing import Literal
+
+Decision = Literal["admit", "degrade", "reject"]
+
+
+class AdmissionController:
+    """Predict a new request's latency from recent ones and shed what cannot finish in time.
+
+    Completed requests are recorded with the number of requests that were in
+    flight when they were admitted. Latency is tracked as an exponential moving
+    average per load level (in-flight counts grouped by powers of two), so the
+    prediction reflects what batching actually achieves at that load instead of
+    assuming latency grows linearly with the queue. Load levels not seen yet are
+    extrapolated linearly from the highest level below them.
+
+    Args:
+        min_samples: Observations a load level needs before it is trusted.
+            Until any level is trusted every request is admitted.
+        smoothing: Weight of the newest observation in the moving average.
+        degrade_cost: Predicted latency of a degraded request relative to a
+            full one, e.g. the pixel ratio of a smaller input size. ``None``
+            disables degrading.
+    """
+
+    def __init__(
+        self,
+        min_samples: int = 20,
+        smoothing: float = 0.1,
+        degrade_cost: float | None = None,
+    ) -> None:
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self.degrade_cost = degrade_cost
+        self.decisions: dict[Decision, int] = {"admit": 0, "degrade": 0, "reject": 0}
+        self._latency: dict[int, float] = {}
+        self._samples: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, in_flight: int) -> None:
+        """Record the latency of a completed request.
+
+        Args:
+            seconds: Time from admission to result.
+            in_flight: Requests in flight when it was admitted, itself excluded.
+        """
+        level = in_flight.bit_length()
+        with self._lock:
+            previous = self._latency.get(level)
+            if previous is None:
+                self._latency[level] = seconds
+            else:
+                self._latency[level] = previous + self.smoothing * (seconds - previous)
+            self._samples[level] = self._samples.get(level, 0) + 1
+
+    def predict(self, in_flight: int) -> float | None:
+        """Predicted latency in seconds at this load, or ``None`` while uncalibrated."""
+        level = in_flight.bit_length()
+        with self._lock:
+            trusted = [known for known, count in self._samples.items() if count >= self.min_samples]
+            if level in trusted:
+                return self._latency[level]
+            below = [known for known in trusted if known < level]
+            if not below:
+                return None
+            known = max(below)
+            # Level k covers in-flight counts [2**(k-1), 2**k); scale with the load
+            return self._latency[known] * 2 ** (level - known)
+
+    def decide(self, in_flight: int, remaining: float) -> Decision:
+        """Decide how to handle a request with ``remaining`` seconds until its deadline.
+
+        Requests are only shed when load is what makes them late: if even an
+        idle server is predicted to miss the deadline, rejecting would not help
+        and the request is admitted (or degraded, if that fits).
+        """
+        predicted = self.predict(in_flight)
+        idle = self.predict(0)
+        if remaining <= 0:
+            decision: Decision = "reject"
+        elif predicted is None or predicted <= remaining:
+            decision = "admit"
+        elif idle is not None and idle > remaining:
+            fits = self.degrade_cost is not None and idle * self.degrade_cost <= remaining
+            decision = "degrade" if fits else "admit"
+        elif self.degrade_cost is not None and predicted * self.degrade_cost <= remaining:
+            decision = "degrade"
+        else:
+            decision = "reject"
+        with self._lock:
+            self.decisions[decision] += 1
+        return decision
+
+    def render(self) -> str:
+        """Decision counts in the Prometheus text format."""
+        name = "admission_decisions_total"
+        lines = [f"# HELP {name} Admission decisions by outcome", f"# TYPE {name} counter"]
+        with self._lock:
+            decisions = dict(self.decisions)
+        for decision, count in decisions.items():
+            lines.append(name + '{decision="' + decision + '"} ' + str(count))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,200 @@
+"""Dynamic micro-batching scheduler for model inference."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised for queued items whose deadline passed before their batch ran."""
+
+
+class MicroBatcher(Generic[T, R]):
+    """Group concurrent requests into batches for a single forward pass.
+
+    Items submitted with :meth:`submit` are queued and collected until either
+    ``max_batch_size`` items are waiting or ``max_wait_ms`` has elapsed since the
+    first item of the batch arrived. The batch is then passed to ``handler`` in a
+    worker thread and each caller receives its own result. Items whose deadline
+    has passed by the time their batch is formed are failed with
+    :class:`DeadlineExceededError` instead of being computed.
+
+    Args:
+        handler: Function mapping a list of items to a list of results of the same length.
+        max_batch_size: Maximum number of items per batch.
+        max_wait_ms: Maximum time to wait for a batch to fill, in milliseconds.
+        executor: Pool to run ``handler`` in. Defaults to the event loop's default
+            thread pool.
+        max_concurrent_batches: Batches that may run at once, e.g. one per
+            inference process. The next batch is collected while others run.
+        pass_deadline: Call ``handler(items, deadline=...)`` with the latest
+            deadline of the batch's items, or ``None`` if one has none, so the
+            handler can stop waiting once no caller needs the results.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        executor: Executor | None = None,
+        max_concurrent_batches: int = 1,
+        pass_deadline: bool = False,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches must be at least 1")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.max_concurrent_batches = max_concurrent_batches
+        self.pass_deadline = pass_deadline
+        self._queue: asyncio.Queue[tuple[T, asyncio.Future[R], float | None]] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler loop is active."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the scheduler loop on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler loop and fail any requests still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher stopped"))
+
+    @property
+    def pending(self) -> int:
+        """Number of items waiting for a batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, item: T, deadline: float | None = None) -> R:
+        """Queue an item and wait for its result.
+
+        Args:
+            item: Input to include in the next batch.
+            deadline: Optional ``time.monotonic()`` time after which the result is
+                no longer useful.
+
+        Returns:
+            The handler's result for this item.
+
+        Raises:
+            DeadlineExceededError: If the deadline passed before the item's batch ran.
+        """
+        if not self.running:
+            await self.start()
+        assert self._queue is not None
+        future: asyncio.Future[R] = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, deadline))
+        return await future
+
+    async def _collect(self) -> list[tuple[T, asyncio.Future[R], float | None]]:
+        """Wait for the first item, then fill the batch until it is full or times out."""
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Stopped while filling the batch; stop() only fails items still queued
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher stopped"))
+            raise
+        return batch
+
+    async def _run(self) -> None:
+        slots = asyncio.Semaphore(self.max_concurrent_batches)
+        while True:
+            await slots.acquire()
+            try:
+                collected = await self._collect()
+            except BaseException:
+                slots.release()
+                raise
+            now = time.monotonic()
+            batch = []
+            deadlines = []
+            for item, future, deadline in collected:
+                # Callers that gave up (e.g. disconnected clients) are not worth computing
+                if future.done():
+                    continue
+                if deadline is not None and deadline <= now:
+                    future.set_exception(DeadlineExceededError("Deadline passed while queued"))
+                    continue
+                batch.append((item, future))
+                deadlines.append(deadline)
+            if not batch:
+                slots.release()
+                continue
+            latest = None if None in deadlines else max(d for d in deadlines if d is not None)
+            task = asyncio.create_task(self._execute(batch, latest))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _execute(
+        self, batch: list[tuple[T, asyncio.Future[R]]], deadline: float | None
+    ) -> None:
+        items = [item for item, _ in batch]
+        handler = self.handler
+        if self.pass_deadline:
+            # The handler is declared to take the deadline keyword via pass_deadline
+            handler = functools.partial(self.handler, deadline=deadline)  # type: ignore[call-arg]
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.executor, handler, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(items)} inputs"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
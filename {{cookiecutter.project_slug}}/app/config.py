@@ -0,0 +1,155 @@
+"""Deployment settings loaded from ``configs/deployment.yaml``."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+from functools import lru_cache
+from typing import Literal
+
+import yaml
+from pydantic import BaseModel, Field, model_validator
+
+DEFAULT_CONFIG_PATH = pathlib.Path(__file__).resolve().parents[1] / "configs" / "deployment.yaml"
+
+
+class ServerConfig(BaseModel):
+    """Uvicorn server settings."""
+
+    host: str = "0.0.0.0"
+    port: int = 8080
+    workers: int = 1
+    timeout: int = 120
+    reload: bool = False
+
+
+class TelemetryConfig(BaseModel):
+    """Inference logging and latency settings."""
+
+    inference_logging: bool = True
+    latency_budget_ms: float = 120.0
+
+
+class RuntimeConfig(BaseModel):
+    """Thread counts and CPU pinning for each API worker process."""
+
+    threads: int | None = Field(default=None, ge=1)
+    interop_threads: int = Field(default=1, ge=1)
+    opencv_threads: int = Field(default=1, ge=1)
+    pin_cpus: bool = False
+
+
+class BatchingConfig(BaseModel):
+    """Micro-batching limits for the inference scheduler."""
+
+    max_batch_size: int = Field(default=32, ge=1)
+    max_wait_ms: float = Field(default=5.0, ge=0.0)
+    max_request_images: int = Field(default=256, ge=1)
+    max_stream_frames: int = Field(default=4, ge=1)
+    max_tiled_megapixels: float = Field(default=50.0, gt=0.0)
+
+
+class ExecutorConfig(BaseModel):
+    """Worker pool for blocking decode and inference work."""
+
+    kind: Literal["thread", "process"] = "thread"
+    max_workers: int | None = Field(default=None, ge=1)
+    max_in_flight: int = Field(default=64, ge=1)
+
+
+class InferencePoolConfig(BaseModel):
+    """Dedicated inference processes fed through shared memory."""
+
+    processes: int = Field(default=0, ge=0)
+    threads: int | None = Field(default=None, ge=1)
+
+
+class FetchConfig(BaseModel):
+    """Limits for downloading images from URLs."""
+
+    timeout_s: float = Field(default=10.0, gt=0.0)
+    max_bytes: int = Field(default=20 * 1024 * 1024, ge=1)
+    max_connections: int = Field(default=100, ge=1)
+    max_concurrency: int = Field(default=16, ge=1)
+
+
+class ModelConfig(BaseModel):
+    """Model served by the API and the registry holding it."""
+
+    name: str = "default"
+    version: str = "1"
+    architecture: str = "resnet18"
+    num_classes: int = Field(default=1000, ge=1)
+    input_size: tuple[int, int] = (224, 224)
+    checkpoint: pathlib.Path | None = None
+    device: str = "cpu"
+    backend: Literal["eager", "compile", "int8", "torchscript", "onnx"] = "eager"
+    precision: Literal["fp32", "bf16", "fp16"] = "fp32"
+    parity_check: bool = True
+    parity_samples: str | None = None
+    parity_rtol: float | None = Field(default=None, gt=0.0)
+    mmap: bool = True
+    max_resident: int = Field(default=2, ge=1)
+    max_memory_mb: float | None = Field(default=None, gt=0.0)
+    warmup: bool = True
+    swap_dir: pathlib.Path | None = None
+
+    @model_validator(mode="after")
+    def _check_precision(self) -> ModelConfig:
+        if self.precision != "fp32" and self.backend not in ("eager", "compile"):
+            raise ValueError(f"precision {self.precision} needs the eager or compile backend")
+        return self
+
+
+class AdmissionConfig(BaseModel):
+    """Deadline-aware load shedding."""
+
+    enabled: bool = True
+    min_samples: int = Field(default=20, ge=1)
+    degraded_input_size: tuple[int, int] | None = None
+
+
+class CacheConfig(BaseModel):
+    """Prediction cache for byte-identical images."""
+
+    enabled: bool = True
+    max_memory_mb: float = Field(default=64.0, gt=0.0)
+
+
+class DeploymentConfig(BaseModel):
+    """Top-level deployment configuration."""
+
+    server: ServerConfig = Field(default_factory=ServerConfig)
+    telemetry: TelemetryConfig = Field(default_factory=TelemetryConfig)
+    runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
+    batching: BatchingConfig = Field(default_factory=BatchingConfig)
+    executor: ExecutorConfig = Field(default_factory=ExecutorConfig)
+    inference_pool: InferencePoolConfig = Field(default_factory=InferencePoolConfig)
+    fetch: FetchConfig = Field(default_factory=FetchConfig)
+    model: ModelConfig = Field(default_factory=ModelConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+
+
+def load_config(path: str | pathlib.Path | None = None) -> DeploymentConfig:
+    """Load deployment configuration from a YAML file.
+
+    Args:
+        path: Path to the YAML file. Defaults to ``$DEPLOYMENT_CONFIG`` or
+            ``configs/deployment.yaml``.
+
+    Returns:
+        Parsed deployment configuration. Missing sections fall back to defaults.
+    """
+    config_path = pathlib.Path(path or os.getenv("DEPLOYMENT_CONFIG") or DEFAULT_CONFIG_PATH)
+    if not config_path.exists():
+        return DeploymentConfig()
+    with config_path.open() as f:
+        data = yaml.safe_load(f) or {}
+    return DeploymentConfig.model_validate(data)
+
+
+@lru_cache(maxsize=1)
+def get_config() -> DeploymentConfig:
+    """Return the process-wide deployment configuration."""
+    return load_config()
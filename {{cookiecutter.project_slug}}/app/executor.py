@@ -0,0 +1,86 @@
+"""Bounded worker pool for CPU-bound decode and inference work."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Literal, TypeVar
+
+R = TypeVar("R")
+
+
+class ServerBusyError(RuntimeError):
+    """Raised when the in-flight request limit has been reached."""
+
+
+class BoundedExecutor:
+    """Thread or process pool with a cap on concurrently admitted requests.
+
+    Blocking OpenCV and torch work is submitted to the pool with :meth:`run`, so
+    the event loop stays free to serve other requests (including ``/health``).
+    :meth:`admit` bounds the number of requests in flight; once the limit is
+    reached new requests are rejected instead of queueing without bound.
+
+    Args:
+        kind: ``"thread"`` or ``"process"``. Threads suit torch/OpenCV, which
+            release the GIL; processes isolate pure-Python work.
+        max_workers: Pool size. Defaults to the number of CPUs.
+        max_in_flight: Maximum number of admitted requests at any one time.
+    """
+
+    def __init__(
+        self,
+        kind: Literal["thread", "process"] = "thread",
+        max_workers: int | None = None,
+        max_in_flight: int = 64,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._pool: Executor | None = None
+
+    @property
+    def pool(self) -> Executor:
+        """The underlying executor, created on first use."""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif self.kind == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            else:
+                raise ValueError(f"Unknown executor kind: {self.kind!r}")
+        return self._pool
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Reserve an in-flight slot for the duration of a request.
+
+        Raises:
+            ServerBusyError: If ``max_in_flight`` requests are already admitted.
+        """
+        if self.in_flight >= self.max_in_flight:
+            raise ServerBusyError(f"Server busy: {self.in_flight} requests in flight")
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        """Run a blocking function in the pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, fn, *args)
+
+    def shutdown(self) -> None:
+        """Shut down the pool, waiting for running tasks to finish."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,148 @@
+"""Async HTTP fetching of remote images with a shared connection pool."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+
+import httpx
+
+
+class FetchError(RuntimeError):
+    """Raised when a remote image cannot be fetched.
+
+    Attributes:
+        status_code: HTTP status the API should answer with.
+    """
+
+    def __init__(self, message: str, status_code: int = 502) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ImageFetcher:
+    """Download images over a pooled, keep-alive HTTP client.
+
+    Responses are streamed into memory and aborted as soon as they exceed
+    ``max_bytes``, so a large or malicious URL cannot exhaust memory.
+
+    Args:
+        timeout_s: Total time allowed for one download in seconds, from waiting
+            for a pooled connection to the last byte, so a server trickling
+            data cannot hold a request open past it.
+        max_bytes: Maximum accepted response body size.
+        max_connections: Size of the shared connection pool.
+        max_concurrency: Maximum number of downloads running at once in :meth:`fetch_many`.
+    """
+
+    def __init__(
+        self,
+        timeout_s: float = 10.0,
+        max_bytes: int = 20 * 1024 * 1024,
+        max_connections: int = 100,
+        max_concurrency: int = 16,
+    ) -> None:
+        self.timeout_s = timeout_s
+        self.max_bytes = max_bytes
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared HTTP client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout_s),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, url: str) -> bytes:
+        """Download a URL into memory.
+
+        Args:
+            url: ``http`` or ``https`` URL of the image.
+
+        Returns:
+            Response body.
+
+        Raises:
+            FetchError: If the URL is invalid, the server fails, the request
+                times out or the body exceeds ``max_bytes``.
+        """
+        if not url.startswith(("http://", "https://")):
+            raise FetchError(f"Unsupported URL: {url}", status_code=400)
+        try:
+            # httpx timeouts apply to each connect, read and pool wait separately
+            async with asyncio.timeout(self.timeout_s):
+                chunks = await self._download(url)
+        except (TimeoutError, httpx.TimeoutException) as e:
+            raise FetchError(f"Timed out fetching {url}", status_code=504) from e
+        except httpx.HTTPError as e:
+            raise FetchError(f"Could not fetch {url}: {e}") from e
+        return b"".join(chunks)
+
+    async def _download(self, url: str) -> list[bytes]:
+        """Stream a response body, enforcing the status and size limits."""
+        async with self.client.stream("GET", url) as response:
+            if response.status_code >= 400:
+                raise FetchError(f"Fetching {url} returned HTTP {response.status_code}")
+            length = _content_length(response.headers.get("Content-Length"), url)
+            if length is not None and length > self.max_bytes:
+                raise FetchError(f"Image exceeds {self.max_bytes} bytes", status_code=413)
+            chunks: list[bytes] = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise FetchError(f"Image exceeds {self.max_bytes} bytes", status_code=413)
+                chunks.append(chunk)
+        return chunks
+
+    async def fetch_many(self, urls: Sequence[str]) -> list[bytes | FetchError]:
+        """Download several URLs concurrently.
+
+        Args:
+            urls: URLs to download.
+
+        Returns:
+            Body or :class:`FetchError` for each URL, in input order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_one(url: str) -> bytes | FetchError:
+            async with semaphore:
+                try:
+                    return await self.fetch(url)
+                except FetchError as e:
+                    return e
+
+        return list(await asyncio.gather(*(fetch_one(url) for url in urls)))
+
+
+def _content_length(value: str | None, url: str) -> int | None:
+    """Parse a ``Content-Length`` header.
+
+    Raises:
+        FetchError: If the header is not a non-negative integer.
+    """
+    if value is None:
+        return None
+    try:
+        length = int(value)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise FetchError(f"Fetching {url} returned an invalid Content-Length: {value!r}")
+    return length
@@ -0,0 +1,410 @@
+"""Dedicated inference processes fed through shared-memory slots.
+
+Running inference in separate processes scales it across cores without the
+GIL, but pickling decoded images over a pipe would cost about as much as the
+inference itself. Here the API process writes each image, already resized to
+the model input size, straight into a slot of a shared memory block. Only small
+handles (slot index and shape) and the prediction dictionaries cross the
+process boundary; the inference processes preprocess zero-copy numpy views of
+the slots.
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.batching import DeadlineExceededError
+
+if TYPE_CHECKING:
+    import torch
+
+# (slot, shape) of one image in shared memory
+Handle = tuple[int, tuple[int, ...]]
+
+logger = logging.getLogger(__name__)
+
+
+def slot_view(buffer: memoryview, slot: int, slot_bytes: int, shape: Sequence[int]) -> np.ndarray:
+    """A uint8 array of ``shape`` backed by a slot of ``buffer``, without copying."""
+    return np.ndarray(tuple(shape), dtype=np.uint8, buffer=buffer, offset=slot * slot_bytes)
+
+
+class SharedRing:
+    """A shared memory block divided into equal slots reserved and released by index.
+
+    Free slots are handed out in the order they were released, so the block is
+    used as a ring.
+
+    Args:
+        slots: Number of slots.
+        slot_bytes: Size of each slot in bytes.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int) -> None:
+        if slots < 1 or slot_bytes < 1:
+            raise ValueError("slots and slot_bytes must be at least 1")
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.memory = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._free = collections.deque(range(slots))
+        self._available = threading.Condition()
+
+    @property
+    def name(self) -> str:
+        """Name other processes attach to the block with."""
+        return self.memory.name
+
+    @property
+    def free(self) -> int:
+        """Number of slots not reserved."""
+        with self._available:
+            return len(self._free)
+
+    def acquire(self, count: int, timeout: float | None = None) -> list[int]:
+        """Reserve ``count`` slots at once, waiting until they are free.
+
+        Raises:
+            ValueError: If ``count`` exceeds the number of slots.
+            TimeoutError: If the slots did not become free within ``timeout`` seconds.
+        """
+        if count > self.slots:
+            raise ValueError(f"Cannot reserve {count} of {self.slots} slots")
+        with self._available:
+            if not self._available.wait_for(lambda: len(self._free) >= count, timeout):
+                raise TimeoutError(f"No {count} free shared memory slots")
+            return [self._free.popleft() for _ in range(count)]
+
+    def release(self, slots: Sequence[int]) -> None:
+        """Return reserved slots."""
+        with self._available:
+            self._free.extend(slots)
+            self._available.notify_all()
+
+    def view(self, slot: int, shape: Sequence[int]) -> np.ndarray:
+        """A writable array backed by ``slot``."""
+        assert self.memory.buf is not None
+        return slot_view(self.memory.buf, slot, self.slot_bytes, shape)
+
+    def close(self) -> None:
+        """Release and destroy the shared memory block."""
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _serve(
+    memory_name: str,
+    slot_bytes: int,
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    loader: Callable[[], torch.nn.Module | None] | None,
+    threads: int,
+) -> None:
+    """Inference process: load the model once, then predict batches until told to stop."""
+    import cv2
+    import torch
+
+    from {{ cookiecutter.python_package }}.vision import predict_batch
+
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(1)
+    memory = shared_memory.SharedMemory(name=memory_name)
+    assert memory.buf is not None
+    model = loader() if loader is not None else None
+    results.put((None, os.getpid(), None))
+    try:
+        while (task := tasks.get()) is not None:
+            request_id, handles, size, probabilities = task
+            try:
+                images = [slot_view(memory.buf, slot, slot_bytes, shape) for slot, shape in handles]
+                timings: dict[str, float] = {}
+                predictions = predict_batch(
+                    images, size, model=model, timings=timings, probabilities=probabilities
+                )
+                # Views must be gone before the block can be closed
+                del images
+                results.put((request_id, [(p, timings) for p in predictions], None))
+            except Exception as e:
+                results.put((request_id, None, e))
+    finally:
+        memory.close()
+
+
+@dataclass
+class _Batch:
+    """A batch handed to an inference process, and the slots it reads."""
+
+    future: concurrent.futures.Future[list[Any]]
+    slots: list[int]
+    worker: int
+
+
+class InferencePool:
+    """Processes that each hold the model and predict batches written to shared memory.
+
+    :meth:`run` is blocking and thread-safe, so it can serve as a
+    ``MicroBatcher`` handler with ``max_concurrent_batches`` equal to
+    ``processes``. Each batch goes to the process with the fewest batches
+    outstanding. If an inference process dies, the batches sent to it fail
+    with ``RuntimeError`` and the process is restarted; other processes keep
+    their batches. A batch's slots are only released once its process has
+    answered or died, never while it may still be reading them.
+
+    Args:
+        loader: Picklable function returning the model, called once in each
+            process, e.g. a ``functools.partial`` of a module-level function.
+            ``None`` serves placeholder predictions.
+        input_size: Model input size (height, width). Images are resized to it
+            while they are copied into shared memory.
+        processes: Number of inference processes.
+        threads: Torch intra-op threads per process.
+        slots: Shared memory slots, one per image. Must cover the largest batch.
+        channels: Channels per image.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], torch.nn.Module | None] | None,
+        input_size: tuple[int, int],
+        processes: int = 1,
+        threads: int = 1,
+        slots: int = 64,
+        channels: int = 3,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.loader = loader
+        self.input_size = tuple(input_size)
+        self.processes = processes
+        self.threads = threads
+        self.slots = slots
+        self.channels = channels
+        self._ring: SharedRing | None = None
+        self._context = multiprocessing.get_context("spawn")
+        self._queues: list[multiprocessing.Queue] = []
+        self._results: multiprocessing.Queue | None = None
+        self._workers: list[multiprocessing.process.BaseProcess] = []
+        self._pending: dict[int, _Batch] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._reader: threading.Thread | None = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the processes have been started."""
+        return self._ring is not None
+
+    def start(self, timeout: float = 300.0) -> None:
+        """Start the processes and wait until each has loaded the model.
+
+        Raises:
+            RuntimeError: If a process exits or times out while loading.
+        """
+        if self.running:
+            return
+        height, width = self.input_size
+        self._ring = SharedRing(self.slots, height * width * self.channels)
+        self._queues = [self._context.Queue() for _ in range(self.processes)]
+        self._results = self._context.Queue()
+        self._closing = False
+        self._workers = [self._spawn(index) for index in range(self.processes)]
+        ready = 0
+        deadline = time.monotonic() + timeout
+        while ready < self.processes:
+            try:
+                self._results.get(timeout=1.0)
+                ready += 1
+            except queue.Empty:
+                if any(not worker.is_alive() for worker in self._workers):
+                    self.close()
+                    raise RuntimeError("An inference process exited while loading") from None
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("Inference processes did not start in time") from None
+        self._reader = threading.Thread(target=self._read, name="inference-results", daemon=True)
+        self._reader.start()
+
+    def run(
+        self,
+        images: Sequence[np.ndarray],
+        size: tuple[int, int] | None = None,
+        probabilities: bool = False,
+        deadline: float | None = None,
+    ) -> list[tuple[dict[str, Any], dict[str, float]]]:
+        """Predict a batch in an inference process.
+
+        Args:
+            images: uint8 RGB images (H, W, C) of any size.
+            size: Model input size, at most ``input_size`` in each dimension.
+                Defaults to ``input_size``.
+            probabilities: Also return each image's class probabilities, see
+                ``predict_batch``.
+            deadline: Optional ``time.monotonic()`` time after which to stop
+                waiting for the result.
+
+        Returns:
+            Each image's prediction paired with the batch's stage timings.
+
+        Raises:
+            DeadlineExceededError: If the deadline passed before shared memory
+                slots were free or before the result arrived.
+            RuntimeError: If the process predicting the batch died.
+        """
+        import cv2
+
+        if not self.running:
+            raise RuntimeError("InferencePool is not running")
+        assert self._ring is not None
+        height, width = size or self.input_size
+        if height * width * self.channels > self._ring.slot_bytes:
+            raise ValueError(f"Input size {(height, width)} exceeds {self.input_size}")
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            slots = self._ring.acquire(len(images), timeout)
+        except TimeoutError:
+            raise DeadlineExceededError("Deadline passed waiting for shared memory") from None
+        try:
+            handles: list[Handle] = []
+            for slot, image in zip(slots, images, strict=True):
+                view = self._ring.view(slot, (height, width, self.channels))
+                # cv2.resize takes (width, height) and writes into shared memory directly
+                if image.shape[:2] == (height, width):
+                    np.copyto(view, image.reshape(view.shape))
+                else:
+                    cv2.resize(image, (width, height), dst=view)
+                handles.append((slot, view.shape))
+                del view
+        except BaseException:
+            self._ring.release(slots)
+            raise
+        future: concurrent.futures.Future[list[Any]] = concurrent.futures.Future()
+        with self._lock:
+            request_id = next(self._ids)
+            worker = self._least_busy()
+            self._pending[request_id] = _Batch(future, slots, worker)
+            self._queues[worker].put((request_id, handles, (height, width), probabilities))
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            results = future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # The process may still be reading the slots; they are freed with its result
+            raise DeadlineExceededError("Deadline passed during inference") from None
+        for (prediction, _), image in zip(results, images, strict=True):
+            # Report the decoded size, not the shared memory copy's
+            prediction["image_shape"] = image.shape
+        return results
+
+    def close(self) -> None:
+        """Stop the processes and release the shared memory."""
+        if not self.running:
+            return
+        assert self._ring is not None
+        self._closing = True
+        for tasks in self._queues:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        if self._reader is not None:
+            self._reader.join(timeout=2)
+        self._fail_pending(RuntimeError("InferencePool closed"))
+        self._ring.close()
+        self._ring = None
+        self._workers = []
+        self._queues = []
+
+    def _spawn(self, index: int) -> multiprocessing.process.BaseProcess:
+        assert self._ring is not None
+        worker = self._context.Process(
+            target=_serve,
+            args=(
+                self._ring.name,
+                self._ring.slot_bytes,
+                self._queues[index],
+                self._results,
+                self.loader,
+                self.threads,
+            ),
+            name="inference",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _read(self) -> None:
+        """Deliver results to waiting callers and restart processes that died."""
+        assert self._results is not None
+        checked = time.monotonic()
+        while not self._closing:
+            if time.monotonic() - checked >= 1.0:
+                self._check_workers()
+                checked = time.monotonic()
+            try:
+                request_id, payload, error = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if request_id is None:
+                # A restarted process finished loading the model
+                continue
+            with self._lock:
+                batch = self._pending.pop(request_id, None)
+            if batch is not None:
+                self._finish(batch, payload, error)
+
+    def _least_busy(self) -> int:
+        """Index of the process with the fewest batches outstanding; call with the lock held."""
+        outstanding = [0] * len(self._workers)
+        for batch in self._pending.values():
+            outstanding[batch.worker] += 1
+        return outstanding.index(min(outstanding))
+
+    def _check_workers(self) -> None:
+        for index, worker in enumerate(self._workers):
+            if worker.is_alive() or self._closing:
+                continue
+            logger.warning(
+                "Inference process %d exited with %s; restarting", worker.pid, worker.exitcode
+            )
+            with self._lock:
+                lost = [
+                    self._pending.pop(request_id)
+                    for request_id, batch in list(self._pending.items())
+                    if batch.worker == index
+                ]
+                # Tasks still queued for the dead process go with its queue
+                self._queues[index] = self._context.Queue()
+                self._workers[index] = self._spawn(index)
+            for batch in lost:
+                self._finish(batch, None, RuntimeError("Inference process died"))
+
+    def _finish(self, batch: _Batch, payload: Any, error: Exception | None) -> None:
+        """Free a batch's slots, which its process no longer reads, and deliver its result."""
+        assert self._ring is not None
+        self._ring.release(batch.slots)
+        if batch.future.done():
+            return
+        if error is not None:
+            batch.future.set_exception(error)
+        else:
+            batch.future.set_result(payload)
+
+    def _fail_pending(self, error: Exception) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for batch in pending.values():
+            self._finish(batch, None, error)
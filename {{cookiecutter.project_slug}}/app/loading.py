@@ -0,0 +1,108 @@
+"""Building the configured model registry, in API workers and inference processes.
+
+torch and the inference backends are imported when a model is first loaded,
+not with the API.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from app.config import get_config
+from {{ cookiecutter.python_package }}.registry import ModelRegistry
+from {{ cookiecutter.python_package }}.vision import build_model, load_image, preprocess_batch
+
+if TYPE_CHECKING:
+    import torch
+
+# Images of model.parity_samples used for the parity check
+PARITY_BATCH_SIZE = 16
+
+logger = logging.getLogger(__name__)
+
+
+def parity_batch() -> torch.Tensor:
+    """Input batch for the parity check: ``model.parity_samples``, or noise if unset.
+
+    Raises:
+        ValueError: If ``model.parity_samples`` matches no images.
+    """
+    import torch
+
+    config = get_config()
+    size = config.model.input_size
+    if config.model.parity_samples is None:
+        if config.model.parity_check:
+            logger.warning(
+                "Checking model parity on random noise, which hides drift in top-1 "
+                "predictions; set model.parity_samples to real images"
+            )
+        return torch.rand(8, 3, *size, device=config.model.device)
+    # data imports torch datasets; only needed when samples are configured
+    from {{ cookiecutter.python_package }}.data import list_images
+
+    paths = list_images(config.model.parity_samples)[:PARITY_BATCH_SIZE]
+    if not paths:
+        raise ValueError(f"No images found for model.parity_samples: {config.model.parity_samples}")
+    batch = preprocess_batch([load_image(path, size) for path in paths], size)
+    return batch.to(config.model.device)
+
+
+def prepare_runs_model() -> bool:
+    """Whether :func:`prepare_model` runs the model, to trace it or check its parity.
+
+    A process that forks afterwards must not run the model first: the forward
+    pass starts torch's intra-op thread pool, which the forked children inherit
+    in a broken state.
+    """
+    config = get_config()
+    return config.model.backend != "eager" or config.model.precision != "fp32"
+
+
+def prepare_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Wrap a loaded model in the configured precision and backend, checking it against eager.
+
+    Raises:
+        RuntimeError: If the result drifts from the float32 eager model.
+    """
+    from {{ cookiecutter.python_package }}.backends import prepare_inference_model
+
+    config = get_config()
+    return prepare_inference_model(
+        model,
+        config.model.backend,
+        config.model.precision,
+        example=parity_batch() if prepare_runs_model() else None,
+        parity_check=config.model.parity_check,
+        rtol=config.model.parity_rtol,
+    )
+
+
+def build_registry() -> ModelRegistry:
+    """A registry with the configured model registered but not loaded yet."""
+    config = get_config()
+    registry = ModelRegistry(
+        lambda _: build_model(config.model.architecture, config.model.num_classes),
+        max_models=config.model.max_resident,
+        max_bytes=int(config.model.max_memory_mb * 2**20) if config.model.max_memory_mb else None,
+        device=config.model.device,
+        mmap=config.model.mmap,
+        prepare=prepare_model,
+        # Reduced-precision models run on channels_last inputs
+        channels_last=config.model.precision != "fp32",
+    )
+    if config.model.checkpoint is not None:
+        registry.register(config.model.name, config.model.version, config.model.checkpoint)
+    return registry
+
+
+def load_configured_model() -> torch.nn.Module | None:
+    """Load the configured model, or ``None`` if no checkpoint is configured.
+
+    Module-level so it can be passed to inference processes by reference.
+    """
+    config = get_config()
+    if config.model.checkpoint is None:
+        return None
+    return build_registry().get(config.model.name)
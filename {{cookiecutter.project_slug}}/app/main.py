@@ -2,15 +2,380 @@
 
 from __future__ import annotations
 
-import pathlib
-from typing import Any
-
+import asyncio
+import functools
+import itertools
+import logging
+import math
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
 import uvicorn
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.admission import AdmissionController
+from app.batching import DeadlineExceededError, MicroBatcher
+from app.config import get_config
+from app.executor import BoundedExecutor, ServerBusyError
+from app.fetch import FetchError, ImageFetcher
+from app.inference_pool import InferencePool
+from app.loading import build_registry, load_configured_model, prepare_runs_model
+from app.prefork import PRELOAD_ENV
+from app.runtime import (
+    RuntimePlan,
+    apply_runtime,
+    available_cpus,
+    claim_worker_slot,
+    plan_runtime,
+    release_worker_slots,
+    worker_count,
+)
+from app.streaming import LatestFrames
+from app.telemetry import Histogram, RequestTimings, current_timings, timed
 from {{ cookiecutter.python_package }} import __version__
-from {{ cookiecutter.python_package }}.vision import predict_simple
+from {{ cookiecutter.python_package }}.vision import (
+    ContentCache,
+    ImageTooLargeError,
+    check_image_size,
+    content_key,
+    decode_image,
+    iter_tiles,
+    load_image_from_bytes,
+    merge_tiles,
+    predict_batch,
+)
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+# Worker processes of this server: WEB_CONCURRENCY if a launcher sets it, else server.workers
+workers = worker_count(config.server.workers)
+
+
+def configure_worker(slot: int | None) -> RuntimePlan:
+    """Give this worker its share of the CPUs and size its thread pools to match.
+
+    Only plans the share, without importing torch; the app's startup applies
+    it before the model is loaded or run.
+
+    Args:
+        slot: This worker's index in ``[0, workers)``, or ``None`` if unknown.
+
+    Returns:
+        The plan, also kept as ``runtime``.
+    """
+    global runtime
+    runtime = plan_runtime(
+        workers,
+        available_cpus(),
+        slot=slot,
+        threads=config.runtime.threads,
+        interop_threads=config.runtime.interop_threads,
+        opencv_threads=config.runtime.opencv_threads,
+    )
+    return runtime
+
+
+# Plan the worker's share now; it is applied at startup, before any torch work.
+# A preloading parent (app.prefork) holds no slot; it configures each worker
+# after forking it.
+if os.environ.get(PRELOAD_ENV):
+    runtime = configure_worker(None)
+else:
+    runtime = configure_worker(claim_worker_slot(workers) if workers > 1 else 0)
+
+# Blocking decode and inference run here, off the event loop
+executor = BoundedExecutor(
+    kind=config.executor.kind,
+    max_workers=config.executor.max_workers or runtime.threads,
+    max_in_flight=config.executor.max_in_flight,
+)
+
+# Remote images are downloaded over a shared keep-alive connection pool
+fetcher = ImageFetcher(
+    timeout_s=config.fetch.timeout_s,
+    max_bytes=config.fetch.max_bytes,
+    max_connections=config.fetch.max_connections,
+    max_concurrency=config.fetch.max_concurrency,
+)
+
+
+# Models are loaded once and kept warm; POST /models/{name}/swap replaces them without downtime
+registry = build_registry()
+
+# Optionally, inference runs in dedicated processes that each load the model and
+# receive decoded images through shared memory instead of pickled over a pipe
+inference_processes = config.inference_pool.processes
+# The full-size, degraded (when configured) and tiled batchers below all feed the pool
+batcher_count = 3 if config.admission.degraded_input_size is not None else 2
+inference_pool = (
+    InferencePool(
+        load_configured_model,
+        input_size=config.model.input_size,
+        processes=inference_processes,
+        threads=config.inference_pool.threads or max(1, runtime.threads // inference_processes),
+        # Every batcher may have a full batch in every process
+        slots=batcher_count * inference_processes * config.batching.max_batch_size,
+    )
+    if inference_processes > 0
+    else None
+)
+if inference_pool is not None and config.executor.kind == "process":
+    raise ValueError("inference_pool requires executor.kind 'thread'")
+
+
+def preload() -> bool:
+    """Load the active model now, in a parent process before forking workers.
+
+    The model is only preloaded if that does not run it: a forward pass here
+    would start torch's thread pool before the fork. Otherwise each worker
+    loads it on startup.
+
+    Returns:
+        Whether the model was loaded.
+    """
+    if inference_pool is not None or config.model.checkpoint is None or prepare_runs_model():
+        return False
+    registry.get(config.model.name)
+    return True
+
+
+# Byte-identical uploads are answered without decoding or inference
+predictions = (
+    ContentCache(max_bytes=int(config.cache.max_memory_mb * 2**20))
+    if config.cache.enabled
+    else None
+)
+
+
+def run_model(
+    images: list[np.ndarray],
+    size: tuple[int, int] | None = None,
+    probabilities: bool = False,
+    deadline: float | None = None,
+) -> list[tuple[dict[str, Any], dict[str, float]]]:
+    """Batch handler: predict with the active model, or placeholders if none is configured.
+
+    Each prediction is paired with the batch's stage timings, which are
+    measured here because this may run in a worker process. ``deadline``
+    bounds the wait for the inference pool.
+    """
+    size = size or config.model.input_size
+    if inference_pool is not None:
+        return inference_pool.run(images, size, probabilities=probabilities, deadline=deadline)
+    model = registry.get(config.model.name) if config.model.checkpoint is not None else None
+    timings: dict[str, float] = {}
+    results = predict_batch(
+        images, size=size, model=model, timings=timings, probabilities=probabilities
+    )
+    return [(result, timings) for result in results]
+
+
+# Concurrent requests are grouped into batches for a single forward pass
+batcher: MicroBatcher[np.ndarray, tuple[dict[str, Any], dict[str, float]]] = MicroBatcher(
+    run_model,
+    max_batch_size=config.batching.max_batch_size,
+    max_wait_ms=config.batching.max_wait_ms,
+    max_concurrent_batches=max(1, inference_processes),
+    pass_deadline=inference_pool is not None,
+)
+
+# Sheds requests that cannot meet their deadline, or serves them at a smaller input size
+admission = (
+    AdmissionController(
+        min_samples=config.admission.min_samples,
+        degrade_cost=(
+            math.prod(config.admission.degraded_input_size) / math.prod(config.model.input_size)
+            if config.admission.degraded_input_size is not None
+            else None
+        ),
+    )
+    if config.admission.enabled
+    else None
+)
+degraded_batcher = (
+    MicroBatcher(
+        functools.partial(run_model, size=config.admission.degraded_input_size),
+        max_batch_size=config.batching.max_batch_size,
+        max_wait_ms=config.batching.max_wait_ms,
+        max_concurrent_batches=max(1, inference_processes),
+        pass_deadline=inference_pool is not None,
+    )
+    if config.admission.degraded_input_size is not None
+    else None
+)
+# Tiles of /predict/tiled, which need class probabilities to be aggregated
+tiled_batcher: MicroBatcher[np.ndarray, tuple[dict[str, Any], dict[str, float]]] = MicroBatcher(
+    functools.partial(run_model, probabilities=True),
+    max_batch_size=config.batching.max_batch_size,
+    max_wait_ms=config.batching.max_wait_ms,
+    max_concurrent_batches=max(1, inference_processes),
+    pass_deadline=inference_pool is not None,
+)
+
+
+@dataclass
+class Admission:
+    """What an admitted request was granted."""
+
+    start: float
+    in_flight: int
+    input_size: tuple[int, int]
+    # Client deadline on the time.monotonic() clock, from X-Request-Timeout-Ms
+    deadline: float | None = None
+
+
+# Per-stage and end-to-end latency, exposed at /metrics
+stage_seconds = Histogram("inference_stage_seconds", "Time spent per request stage", "stage")
+request_seconds = Histogram("http_request_duration_seconds", "Request latency by route", "route")
+
+
+async def decode_and_predict(
+    content: bytes, granted: Admission, record: bool = True
+) -> dict[str, Any]:
+    """Decode an image and predict it as part of the next batch, timing each stage.
+
+    Args:
+        content: Encoded image bytes.
+        granted: The request's admission.
+        record: Whether to record the request's latency for admission control.
+            Requests predicting many images record one amortised sample instead.
+
+    Raises:
+        DeadlineExceededError: If the client's deadline passes before inference.
+    """
+    if granted.deadline is not None and time.monotonic() >= granted.deadline:
+        raise DeadlineExceededError("Deadline passed before decoding")
+    with timed("decode"):
+        image, shape = await executor.run(decode_image, content, granted.input_size)
+    degraded = granted.input_size != tuple(config.model.input_size)
+    queue = degraded_batcher if degraded and degraded_batcher is not None else batcher
+    start = time.perf_counter()
+    prediction, stages = await queue.submit(image, deadline=granted.deadline)
+    if admission is not None and record:
+        admission.record(time.monotonic() - granted.start, granted.in_flight)
+    timings = current_timings.get()
+    if timings is not None:
+        # Time not spent computing the batch was spent waiting for it
+        timings.add("queue", time.perf_counter() - start - sum(stages.values()))
+        timings.update(stages)
+    # Report the uploaded image's size, not the reduced size it was decoded at
+    return {**prediction, "image_shape": shape}
+
+
+async def predict_content(
+    content: bytes, granted: Admission, record: bool = True
+) -> dict[str, Any]:
+    """Decode an encoded image and predict it, answering repeats from the cache.
+
+    Args:
+        content: Encoded image bytes.
+        granted: The request's admission.
+        record: Whether to record the request's latency for admission control.
+
+    Raises:
+        ValueError: If the image cannot be decoded.
+        DeadlineExceededError: If the client's deadline passes before inference.
+    """
+    if predictions is None:
+        return await decode_and_predict(content, granted, record)
+    version = (
+        registry.active_version(config.model.name) if config.model.checkpoint is not None else None
+    )
+    key = content_key(content, config.model.name, version, granted.input_size)
+    prediction = predictions.get(key)
+    if prediction is None:
+        prediction = await decode_and_predict(content, granted, record)
+        predictions.put(key, prediction)
+    return prediction
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Start background services on startup and stop them on shutdown."""
+    apply_runtime(runtime, pin=config.runtime.pin_cpus)
+    if inference_pool is not None:
+        # Each inference process loads the model itself
+        await asyncio.to_thread(inference_pool.start)
+    elif config.model.checkpoint is not None:
+        # Load before the pool starts so process workers inherit the weights
+        await asyncio.to_thread(registry.get, config.model.name)
+    if config.model.warmup:
+        await executor.run(run_model, [np.zeros((64, 64, 3), dtype=np.uint8)])
+    batcher.executor = executor.pool
+    await batcher.start()
+    if degraded_batcher is not None:
+        degraded_batcher.executor = executor.pool
+        await degraded_batcher.start()
+    tiled_batcher.executor = executor.pool
+    await tiled_batcher.start()
+    yield
+    await batcher.stop()
+    if degraded_batcher is not None:
+        await degraded_batcher.stop()
+    await tiled_batcher.stop()
+    if inference_pool is not None:
+        await asyncio.to_thread(inference_pool.close)
+    # uvicorn workers end by re-raising SIGTERM, which skips atexit
+    release_worker_slots()
+    await fetcher.aclose()
+    executor.shutdown()
+
+
+async def admit_request(
+    timeout_ms: float | None = Header(default=None, alias="X-Request-Timeout-Ms"),
+) -> AsyncIterator[Admission]:
+    """Admit a request, or reject it with 503 if it cannot be served in time.
+
+    Requests are rejected once the in-flight limit is reached, or when the
+    predicted latency at the current load exceeds the client's timeout
+    (``X-Request-Timeout-Ms``, default ``telemetry.latency_budget_ms``). If a
+    smaller input size would fit, the request is served degraded instead.
+
+    The in-flight slot is held until the response body has been sent, which
+    covers streamed responses such as /predict/batch (FastAPI 0.118 and later).
+    """
+    start = time.monotonic()
+    in_flight = executor.in_flight
+    input_size = config.model.input_size
+    budget_ms = timeout_ms if timeout_ms is not None else config.telemetry.latency_budget_ms
+    if admission is not None:
+        decision = admission.decide(in_flight, budget_ms / 1000)
+        if decision == "reject":
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server cannot answer within {budget_ms:.0f}ms at current load",
+                headers={"Retry-After": "1"},
+            )
+        if decision == "degrade" and config.admission.degraded_input_size is not None:
+            input_size = config.admission.degraded_input_size
+    deadline = start + timeout_ms / 1000 if timeout_ms is not None else None
+    try:
+        with executor.admit():
+            yield Admission(start, in_flight, input_size, deadline)
+    except ServerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
+
 
 # Create FastAPI app with OpenAPI documentation
 app = FastAPI(
@@ -20,9 +385,67 @@ app = FastAPI(
     docs_url="/docs",  # Swagger UI
     redoc_url="/redoc",  # ReDoc alternative
     openapi_url="/openapi.json",  # OpenAPI schema
+    lifespan=lifespan,
 )
 
 
+class RecordTimings:
+    """Record per-stage latency and log requests over the latency budget.
+
+    A pure ASGI middleware, so it observes a request once the last chunk of
+    its body is sent. ``@app.middleware("http")`` returns when the headers
+    are sent, before a streamed body such as ``/predict/batch`` runs its stages.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        observed = False
+
+        async def send_and_observe(message: Message) -> None:
+            nonlocal observed
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observed = True
+                self.observe(scope, timings)
+
+        token = current_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_and_observe)
+        finally:
+            current_timings.reset(token)
+            # Requests that failed or were abandoned before the end of their body
+            if not observed:
+                self.observe(scope, timings)
+
+    @staticmethod
+    def observe(scope: Scope, timings: RequestTimings) -> None:
+        """Export a finished request's timings and log it if it was over budget."""
+        elapsed = timings.elapsed
+        route = scope.get("route")
+        request_seconds.observe(getattr(route, "path", "unmatched"), elapsed)
+        for stage, seconds in timings.stages.items():
+            stage_seconds.observe(stage, seconds)
+        budget_ms = config.telemetry.latency_budget_ms
+        if config.telemetry.inference_logging and elapsed * 1000 > budget_ms:
+            logger.warning(
+                "%s %s took %.1fms, over the %.0fms budget: %s",
+                scope["method"],
+                scope["path"],
+                elapsed * 1000,
+                budget_ms,
+                timings.summary(),
+            )
+
+
+app.add_middleware(RecordTimings)
+
+
 # Response models
 class HealthResponse(BaseModel):
     """Health check response model."""
@@ -38,6 +461,45 @@ class PredictionResponse(BaseModel):
     message: str
 
 
+class SwapRequest(BaseModel):
+    """Model version to make active, and its checkpoint relative to ``model.swap_dir``."""
+
+    version: str
+    checkpoint: str
+
+
+class ModelResponse(BaseModel):
+    """The active version of a model."""
+
+    name: str
+    version: str
+
+
+class BatchItemResult(BaseModel):
+    """One line of the NDJSON stream returned by ``/predict/batch``."""
+
+    index: int
+    source: str
+    status_code: int = 200
+    prediction: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class FrameResult(BaseModel):
+    """One message sent back on the ``/predict/stream`` WebSocket."""
+
+    frame_id: int
+    dropped: int
+    prediction: dict[str, Any] | None = None
+    error: str | None = None
+
+
+def serialize(body: BaseModel) -> Response:
+    """Encode a response model to JSON, timed as the ``serialize`` stage."""
+    with timed("serialize"):
+        return Response(body.model_dump_json(), media_type="application/json")
+
+
 # API Routes
 @app.get("/", response_model=dict[str, str])
 async def root() -> dict[str, str]:
@@ -57,8 +519,61 @@ async def health() -> HealthResponse:
     return HealthResponse(status="healthy", version=__version__)
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Latency histograms and admission decisions in the Prometheus text format."""
+    body = stage_seconds.render() + request_seconds.render()
+    if admission is not None:
+        body += admission.render()
+    return PlainTextResponse(
+        body,
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.post("/models/{name}/swap", response_model=ModelResponse)
+async def swap_model(name: str, request: SwapRequest) -> ModelResponse:
+    """Load a new checkpoint and make it the active version of the served model.
+
+    The checkpoint is loaded, prepared and checked completely before the
+    switch. Requests already predicting finish on the old model; batches
+    started afterwards use the new one. Only this API worker's model changes,
+    so with several workers send the request to each of them.
+
+    Raises:
+        HTTPException: 403 if ``model.swap_dir`` is unset, 404 for an unknown
+            model or checkpoint, 400 for a checkpoint outside ``model.swap_dir``,
+            409 if inference runs in other processes, 422 if the checkpoint
+            does not fit the model or fails the parity check.
+    """
+    if config.model.swap_dir is None:
+        raise HTTPException(status_code=403, detail="Model swapping is disabled (model.swap_dir)")
+    if name != config.model.name:
+        raise HTTPException(status_code=404, detail=f"No model named {name!r} is served")
+    if inference_pool is not None or config.executor.kind == "process":
+        # Those processes hold their own registry, which this one cannot reach
+        raise HTTPException(status_code=409, detail="Models run in other processes; restart them")
+    swap_dir = config.model.swap_dir.resolve()
+    checkpoint = (swap_dir / request.checkpoint).resolve()
+    if not checkpoint.is_relative_to(swap_dir):
+        raise HTTPException(status_code=400, detail=f"Checkpoint must be inside {swap_dir}")
+    try:
+        await asyncio.to_thread(registry.swap, name, request.version, checkpoint)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except RuntimeError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    # Predict with the registry from now on, also if the app started without a checkpoint
+    config.model.checkpoint = checkpoint
+    logger.info("Swapped model %s to version %s from %s", name, request.version, checkpoint)
+    return ModelResponse(name=name, version=request.version)
+
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict(file: UploadFile = File(...)) -> PredictionResponse:  # noqa: B008
+async def predict(
+    file: UploadFile = File(...),  # noqa: B008
+    granted: Admission = Depends(admit_request),  # noqa: B008
+) -> Response:
     """Predict endpoint for image classification.
 
     Upload an image file and get predictions.
@@ -76,29 +591,111 @@ async def predict(file: UploadFile = File(...)) -> PredictionResponse:  # noqa:
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
+    # Decode the upload in memory
+    with timed("read"):
+        content = await file.read()
     try:
-        # Save uploaded file temporarily
-        temp_path = pathlib.Path(f"/tmp/{file.filename}")
-        with temp_path.open("wb") as f:
-            content = await file.read()
-            f.write(content)
+        # Run prediction as part of the next batch
+        prediction = await predict_content(content, granted)
+
+        return serialize(
+            PredictionResponse(
+                prediction=prediction,
+                message="Prediction completed successfully",
+            )
+        )
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}") from e
+
 
-        # Run prediction
-        prediction = predict_simple(temp_path)
+@app.post("/predict/tiled", response_model=PredictionResponse)
+async def predict_tiles(
+    file: UploadFile = File(...),  # noqa: B008
+    tile: int = Query(default=512, ge=32),
+    overlap: float = Query(default=0.25, ge=0.0, lt=1.0),
+    aggregate: Literal["mean", "max"] = "mean",
+    granted: Admission = Depends(admit_request),  # noqa: B008
+) -> Response:
+    """Predict a high-resolution image from overlapping tiles at full resolution.
 
-        # Clean up temp file
-        temp_path.unlink()
+    Tiles are predicted through the same micro-batcher and inference processes
+    as ``/predict``. The decoded image stays in memory until every tile is
+    predicted, so uploads with more than ``batching.max_tiled_megapixels`` are
+    rejected from their header, before decoding.
 
-        return PredictionResponse(
-            prediction=prediction,
-            message="Prediction completed successfully",
+    Args:
+        file: Image file to process (JPEG, PNG, etc.)
+        tile: Square tile size in image pixels.
+        overlap: Fraction of a tile shared with its neighbour.
+        aggregate: ``mean`` or ``max`` of the tile class probabilities.
+
+    Returns:
+        The image prediction with one entry per tile.
+
+    Raises:
+        HTTPException: If file is invalid or too large, or processing fails.
+    """
+    if not file.content_type or not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    with timed("read"):
+        content = await file.read()
+    try:
+        check_image_size(content, int(config.batching.max_tiled_megapixels * 1e6))
+        if granted.deadline is not None and time.monotonic() >= granted.deadline:
+            raise DeadlineExceededError("Deadline passed before decoding")
+        with timed("decode"):
+            image = await executor.run(load_image_from_bytes, content)
+        tiles = list(iter_tiles(image, (tile, tile), overlap))
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(tiled_batcher.submit(view, deadline=granted.deadline) for _, view in tiles)
+        )
+        if admission is not None:
+            # One sample per batch of tiles, so large images do not read as slow requests
+            batches = math.ceil(len(tiles) / config.batching.max_batch_size)
+            admission.record((time.monotonic() - granted.start) / batches, granted.in_flight)
+        timings = current_timings.get()
+        if timings is not None:
+            # Tiles from one batch share its timings
+            stages = {id(batch): batch for _, batch in results}.values()
+            computed = 0.0
+            for batch in stages:
+                timings.update(batch)
+                computed += sum(batch.values())
+            timings.add("queue", max(0.0, time.perf_counter() - start - computed))
+        prediction = merge_tiles(
+            image.shape,
+            [(box, result) for (box, _), (result, _) in zip(tiles, results, strict=True)],
+            aggregate,
         )
+        return serialize(
+            PredictionResponse(
+                prediction=prediction,
+                message="Prediction completed successfully",
+            )
+        )
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}") from e
 
 
 @app.post("/predict/url", response_model=PredictionResponse)
-async def predict_from_url(image_url: str) -> PredictionResponse:
+async def predict_from_url(
+    image_url: str,
+    granted: Admission = Depends(admit_request),  # noqa: B008
+) -> Response:
     """Predict from image URL.
 
     Args:
@@ -111,24 +708,186 @@ async def predict_from_url(image_url: str) -> PredictionResponse:
         HTTPException: If URL is invalid or processing fails.
     """
     try:
-        from urllib import request
+        with timed("fetch"):
+            content = await fetcher.fetch(image_url)
+    except FetchError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
 
-        # Download image
-        temp_path = pathlib.Path("/tmp/downloaded_image.jpg")
-        request.urlretrieve(image_url, temp_path)
+    try:
+        # Run prediction as part of the next batch
+        prediction = await predict_content(content, granted)
+
+        return serialize(
+            PredictionResponse(
+                prediction=prediction,
+                message="Prediction completed successfully",
+            )
+        )
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}") from e
+
+
+@app.post(
+    "/predict/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def predict_many(
+    files: list[UploadFile] = File(default=[]),  # noqa: B008
+    urls: list[str] = Form(default=[]),  # noqa: B008
+    granted: Admission = Depends(admit_request),  # noqa: B008
+) -> StreamingResponse:
+    """Predict many images in one request.
+
+    Accepts uploaded files and/or image URLs as multipart form fields. Images go
+    through the shared micro-batcher, and one JSON object per image is streamed
+    back as newline-delimited JSON as soon as its prediction finishes, so results
+    may arrive out of order. Each line carries the image's ``index`` in the
+    request (files first, then URLs) and its own ``status_code``.
 
-        # Run prediction
-        prediction = predict_simple(temp_path)
+    Args:
+        files: Image files to process.
+        urls: Image URLs to download and process.
 
-        # Clean up temp file
-        temp_path.unlink()
+    Returns:
+        NDJSON stream of per-image results.
 
-        return PredictionResponse(
-            prediction=prediction,
-            message="Prediction completed successfully",
+    Raises:
+        HTTPException: If no images are given or the request has too many images.
+    """
+    total = len(files) + len(urls)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="No files or urls given")
+    if total > config.batching.max_request_images:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {config.batching.max_request_images} images per request",
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}") from e
+
+    # Read uploads now, they are closed once this handler returns
+    sources: list[tuple[str, bytes | None]] = [
+        (file.filename or f"file-{index}", await file.read()) for index, file in enumerate(files)
+    ]
+    sources.extend((url, None) for url in urls)
+    fetch_slots = asyncio.Semaphore(fetcher.max_concurrency)
+
+    async def score(index: int, source: str, content: bytes | None) -> str:
+        try:
+            if content is None:
+                async with fetch_slots:
+                    content = await fetcher.fetch(source)
+            prediction = await predict_content(content, granted, record=False)
+            result = BatchItemResult(index=index, source=source, prediction=prediction)
+        except FetchError as e:
+            result = BatchItemResult(
+                index=index, source=source, status_code=e.status_code, error=str(e)
+            )
+        except ImageTooLargeError as e:
+            result = BatchItemResult(index=index, source=source, status_code=413, error=str(e))
+        except ValueError as e:
+            result = BatchItemResult(index=index, source=source, status_code=400, error=str(e))
+        except DeadlineExceededError as e:
+            result = BatchItemResult(index=index, source=source, status_code=504, error=str(e))
+        except Exception as e:
+            result = BatchItemResult(
+                index=index, source=source, status_code=500, error=f"Prediction failed: {e}"
+            )
+        return result.model_dump_json() + "\n"
+
+    async def stream() -> AsyncIterator[str]:
+        tasks = [
+            asyncio.ensure_future(score(index, source, content))
+            for index, (source, content) in enumerate(sources)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+            if admission is not None:
+                # One sample per batch of images, so large requests do not read as slow ones
+                batches = math.ceil(len(tasks) / config.batching.max_batch_size)
+                admission.record((time.monotonic() - granted.start) / batches, granted.in_flight)
+        finally:
+            # Client went away: stop any work still pending
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.websocket("/predict/stream")
+async def predict_stream(websocket: WebSocket) -> None:
+    """Predict a live stream of encoded frames, e.g. from a camera.
+
+    Each binary message is one encoded frame; frames are numbered from 0 in the
+    order they arrive. Waiting frames are predicted together, in one batch
+    with other requests, and a JSON message is sent back per frame with its
+    ``frame_id`` and ``prediction`` (or ``error``). When inference falls behind,
+    the oldest waiting frames are skipped; ``dropped`` counts them so far.
+
+    A stream holds one in-flight slot while connected. Connections over the
+    limit are closed with code 1013 (try again later). A text message closes
+    the stream with code 1003 (unsupported data) once the frames before it
+    are answered.
+    """
+    # Closing before accept() would reject the handshake with 403 instead of 1013
+    await websocket.accept()
+    try:
+        with executor.admit():
+            await _serve_stream(websocket)
+    except ServerBusyError as e:
+        await websocket.close(code=1013, reason=str(e))
+
+
+async def _serve_stream(websocket: WebSocket) -> None:
+    frames: LatestFrames[tuple[int, bytes]] = LatestFrames(config.batching.max_stream_frames)
+
+    async def receive() -> bool:
+        """Queue binary frames until the client disconnects; False on a non-binary message."""
+        try:
+            for frame_id in itertools.count():
+                message = await websocket.receive()
+                # receive() reports a disconnect as a message instead of raising WebSocketDisconnect
+                if message["type"] == "websocket.disconnect":
+                    return True
+                content = message.get("bytes")
+                if content is None:
+                    return False
+                frames.put((frame_id, content))
+        finally:
+            frames.close()
+        return True
+
+    async def predict_frame(content: bytes) -> dict[str, Any]:
+        granted = Admission(time.monotonic(), executor.in_flight, config.model.input_size)
+        return await decode_and_predict(content, granted)
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while batch := await frames.take():
+            results = await asyncio.gather(
+                *(predict_frame(content) for _, content in batch), return_exceptions=True
+            )
+            for (frame_id, _), result in zip(batch, results, strict=True):
+                message = FrameResult(frame_id=frame_id, dropped=frames.dropped)
+                if isinstance(result, Exception):
+                    message.error = str(result)
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    message.prediction = result
+                await websocket.send_text(message.model_dump_json())
+        if not await receiver:
+            await websocket.close(code=1003, reason="Frames must be binary messages")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
 
 
 def run_server(host: str = "0.0.0.0", port: int = 8080, reload: bool = False) -> None:
@@ -144,4 +903,3 @@ def run_server(host: str = "0.0.0.0", port: int = 8080, reload: bool = False) ->
 
 if __name__ == "__main__":
     run_server(reload=True)
-
@@ -0,0 +1,136 @@
+"""Preforking server: import the app and load the model once, then fork the workers.
+
+``uvicorn --workers N`` starts every worker as a fresh interpreter that imports
+torch and loads the model again, which makes cold starts slow and keeps N
+private copies of the weights. Here the parent does that work once and forks
+the workers from it: they start in milliseconds and share the imported modules
+and model weights through copy-on-write memory. Requires ``os.fork`` (Linux,
+macOS).
+
+The fork must happen before torch runs the model, whose intra-op thread pool
+does not survive it; the parent therefore skips preloading when preparing the
+model would run it (see :func:`app.main.preload`).
+
+Usage::
+
+    python -m app.prefork --workers 4
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import time
+from types import FrameType
+
+# Set in the preloading parent, so app.main does not claim a worker slot for it
+PRELOAD_ENV = "APP_PRELOAD"
+
+logger = logging.getLogger(__name__)
+
+
+def serve(host: str | None = None, port: int | None = None, workers: int | None = None) -> None:
+    """Preload the app in this process and serve it from forked workers.
+
+    Workers that exit unexpectedly are restarted in the same slot. SIGINT and
+    SIGTERM are forwarded to the workers, which finish in-flight requests
+    before exiting.
+
+    Args:
+        host: Host to bind to. Defaults to ``server.host``.
+        port: Port to bind to. Defaults to ``server.port``.
+        workers: Number of worker processes. Defaults to ``server.workers``.
+
+    Raises:
+        RuntimeError: If the platform cannot fork.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Preforking requires os.fork; use uvicorn --workers instead")
+    import uvicorn
+
+    from app.config import get_config
+    from app.runtime import WORKERS_ENV
+
+    server = get_config().server
+    workers = workers or server.workers
+    os.environ[PRELOAD_ENV] = "1"
+    # Each worker plans its share of the CPUs for this many workers
+    os.environ[WORKERS_ENV] = str(workers)
+    from app import main
+
+    if not main.preload():
+        logger.info("Model not preloaded; each worker loads it on startup")
+    # Keep preloaded objects out of garbage collection, whose bookkeeping would
+    # otherwise write to (and so copy) their shared pages in every worker
+    gc.freeze()
+
+    config = uvicorn.Config(
+        main.app,
+        host=host or server.host,
+        port=port or server.port,
+        timeout_graceful_shutdown=server.timeout,
+    )
+    sock = config.bind_socket()
+    children: dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Never return into the parent's supervision loop
+            code = 1
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                main.configure_worker(slot)
+                uvicorn.Server(config).run(sockets=[sock])
+                code = 0
+            except BaseException:
+                logger.exception("Worker %d failed", slot)
+            finally:
+                os._exit(code)
+        children[pid] = slot
+
+    def stop(signum: int, _: FrameType | None) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for index in range(workers):
+        spawn(index)
+    logger.info("Serving from %d preforked workers on %s:%d", workers, config.host, config.port)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            logger.warning(
+                "Worker %d (pid %d) exited with status %d; restarting",
+                slot,
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            # Avoid a tight restart loop if workers crash on startup
+            time.sleep(1)
+            spawn(slot)
+    sock.close()
+
+
+def main(host: str | None = None, port: int | None = None, workers: int | None = None) -> None:
+    """Serve the API from preforked workers that share the preloaded model."""
+    logging.basicConfig(level=logging.INFO)
+    serve(host, port, workers)
+
+
+if __name__ == "__main__":
+    import typer
+
+    typer.run(main)
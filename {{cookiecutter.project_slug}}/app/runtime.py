@@ -0,0 +1,178 @@
+"""Per-worker thread counts and CPU affinity for multi-worker serving."""
+
+from __future__ import annotations
+
+import atexit
+import os
+import pathlib
+import tempfile
+from dataclasses import dataclass
+from typing import IO
+
+# Worker count shared by the server's processes; uvicorn and gunicorn read it too
+WORKERS_ENV = "WEB_CONCURRENCY"
+
+# Open slot lock files and their directories; a slot stays claimed for the
+# lifetime of the process
+_slot_locks: list[tuple[pathlib.Path, IO[bytes]]] = []
+
+
+@dataclass
+class RuntimePlan:
+    """Threads and CPUs assigned to one API worker process."""
+
+    slot: int | None
+    cpus: list[int]
+    threads: int
+    interop_threads: int
+    opencv_threads: int
+
+
+def available_cpus() -> list[int]:
+    """CPUs this process may run on, respecting cgroup and taskset limits."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_count(default: int = 1) -> int:
+    """Number of API worker processes sharing the host with this one.
+
+    Read from ``WEB_CONCURRENCY``, which ``uvicorn`` and ``gunicorn`` use as
+    their default worker count and ``app.prefork`` sets for its workers.
+
+    Args:
+        default: Worker count to assume without ``WEB_CONCURRENCY``, e.g. the
+            configured ``server.workers`` that ``--workers`` was given.
+    """
+    value = os.environ.get(WORKERS_ENV)
+    return max(1, int(value) if value else default)
+
+
+def plan_runtime(
+    workers: int,
+    cpus: list[int],
+    slot: int | None = None,
+    threads: int | None = None,
+    interop_threads: int = 1,
+    opencv_threads: int = 1,
+) -> RuntimePlan:
+    """Split ``cpus`` evenly across ``workers`` and size the thread pools.
+
+    Args:
+        workers: Number of API worker processes sharing the host.
+        cpus: CPUs available to all workers together.
+        slot: This worker's index in ``[0, workers)``. ``None`` means the worker
+            could not claim a slot; it gets a fair share of threads but no
+            particular CPUs.
+        threads: Intra-op threads per worker. Defaults to the worker's share of CPUs.
+        interop_threads: Threads running independent ops concurrently.
+        opencv_threads: Threads OpenCV may use inside a single call. Decoding
+            already runs on a pool of threads, so more mostly adds contention.
+
+    Returns:
+        The plan for this worker.
+    """
+    share = max(1, len(cpus) // max(1, workers))
+    own = cpus[slot * share : (slot + 1) * share] if slot is not None else []
+    return RuntimePlan(
+        slot=slot,
+        cpus=own or list(cpus),
+        threads=threads or share,
+        interop_threads=interop_threads,
+        opencv_threads=opencv_threads,
+    )
+
+
+def claim_worker_slot(workers: int, lock_dir: pathlib.Path | None = None) -> int | None:
+    """Claim the lowest free worker index among processes sharing ``lock_dir``.
+
+    Each slot is an exclusive ``flock`` on a file, released by the OS when the
+    process exits, so a restarted worker reuses the slot of the one it replaces.
+    By default ``lock_dir`` is scoped to the parent process, i.e. the workers of
+    one uvicorn or gunicorn master. The last worker to exit removes it, see
+    :func:`release_worker_slots`.
+
+    Returns:
+        The claimed index, or ``None`` if all ``workers`` slots are taken or the
+        platform has no ``flock``.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    if lock_dir is None:
+        lock_dir = pathlib.Path(tempfile.gettempdir()) / f"worker-slots-{os.getppid()}"
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    for slot in range(workers):
+        lock = (lock_dir / f"{slot}.lock").open("wb")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            continue
+        if not _slot_locks:
+            atexit.register(release_worker_slots)
+        _slot_locks.append((lock_dir, lock))
+        return slot
+    return None
+
+
+def release_worker_slots() -> None:
+    """Release this process's slots and remove lock directories no other worker uses.
+
+    Call it on shutdown; it also runs at interpreter exit. Exiting workers
+    take turns through a guard lock, and a directory is removed only if every
+    slot in it is free, i.e. no other worker of the same master is still running.
+    """
+    import fcntl
+
+    directories = {directory for directory, _ in _slot_locks}
+    for _, lock in _slot_locks:
+        lock.close()
+    _slot_locks.clear()
+    for directory in directories:
+        try:
+            with (directory / "cleanup").open("wb") as guard:
+                fcntl.flock(guard, fcntl.LOCK_EX)
+                slots = [path.open("rb") for path in directory.glob("*.lock")]
+                try:
+                    for slot in slots:
+                        fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    for path in directory.iterdir():
+                        path.unlink()
+                    directory.rmdir()
+                finally:
+                    for slot in slots:
+                        slot.close()
+        except OSError:
+            # A slot is still held, or another worker removed the directory first
+            continue
+
+
+def apply_runtime(plan: RuntimePlan, pin: bool = False) -> None:
+    """Apply a plan to torch, OpenCV, OpenMP and, optionally, CPU affinity.
+
+    Call this early, before the first model runs: torch only accepts an
+    inter-op thread count before its inter-op pool has started. The OpenMP and
+    BLAS environment variables are also set, so process pools started later
+    inherit the same limits.
+
+    Args:
+        plan: Plan from :func:`plan_runtime`.
+        pin: Restrict the process to ``plan.cpus``.
+    """
+    import cv2
+    import torch
+
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(plan.threads)
+    torch.set_num_threads(plan.threads)
+    try:
+        torch.set_num_interop_threads(plan.interop_threads)
+    except RuntimeError:
+        # Already started, e.g. when the app is imported a second time
+        pass
+    cv2.setNumThreads(plan.opencv_threads)
+    if pin and plan.slot is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, plan.cpus)
@@ -0,0 +1,54 @@
+"""Frame buffering for streaming inference, where only recent frames matter."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LatestFrames(Generic[T]):
+    """Bounded buffer between a frame receiver and the inference loop.
+
+    When inference falls behind and the buffer is full, the oldest waiting
+    frame is dropped for the new one, so results keep up with the latest
+    frames instead of lagging further and further behind a live feed.
+
+    Args:
+        capacity: Most frames waiting at once; also the most taken per batch.
+    """
+
+    def __init__(self, capacity: int = 4) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.dropped = 0
+        self._frames: collections.deque[T] = collections.deque(maxlen=capacity)
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def put(self, frame: T) -> None:
+        """Add a frame, dropping the oldest waiting one if the buffer is full."""
+        if len(self._frames) == self._frames.maxlen:
+            self.dropped += 1
+        self._frames.append(frame)
+        self._ready.set()
+
+    def close(self) -> None:
+        """Signal that no more frames will arrive."""
+        self._closed = True
+        self._ready.set()
+
+    async def take(self) -> list[T]:
+        """Wait for frames and take all waiting ones, oldest first.
+
+        Returns:
+            The waiting frames, or an empty list once closed and drained.
+        """
+        while not self._frames and not self._closed:
+            self._ready.clear()
+            await self._ready.wait()
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
@@ -0,0 +1,71 @@
+"""Run the benchmarks and compare them with a stored baseline.
+
+Usage::
+
+    python -m benchmarks                  # run, write results, compare with baseline
+    python -m benchmarks --save-baseline  # run and store the results as the new baseline
+    python -m benchmarks --quick          # short smoke run
+    python -m benchmarks --allow-missing-baseline  # do not fail without a baseline
+"""
+
+from __future__ import annotations
+
+import pathlib
+import shutil
+import tempfile
+
+import typer
+
+from benchmarks import bench_api, bench_vision
+from benchmarks.harness import compare, read_results, write_results
+
+BENCHMARK_DIR = pathlib.Path(__file__).resolve().parent
+
+
+def main(
+    output: pathlib.Path = BENCHMARK_DIR / "results" / "latest.json",  # noqa: B008
+    baseline: pathlib.Path = BENCHMARK_DIR / "baseline.json",  # noqa: B008
+    tolerance: float = 0.2,
+    quick: bool = False,
+    save_baseline: bool = False,
+    skip_api: bool = False,
+    allow_missing_baseline: bool = False,
+) -> None:
+    """Run the vision and API benchmarks.
+
+    Exits with status 1 if any result is worse than the baseline by more than
+    ``tolerance``, or if there is no baseline to compare with unless
+    ``allow_missing_baseline`` is set. Baselines are machine specific: record
+    one per host type.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        results = bench_vision.run(pathlib.Path(workdir), quick=quick)
+    if not skip_api:
+        results += bench_api.run(quick=quick)
+
+    width = max(len(result.name) for result in results)
+    for result in results:
+        print(f"{result.name:<{width}}  {result.value:>10.2f} {result.unit}")
+    write_results(results, output)
+    print(f"\nResults written to {output}")
+
+    if save_baseline:
+        shutil.copyfile(output, baseline)
+        print(f"Baseline saved to {baseline}")
+        return
+    if not baseline.exists():
+        print(f"No baseline at {baseline}; run with --save-baseline to record one")
+        if allow_missing_baseline:
+            return
+        raise typer.Exit(code=1)
+    regressions = compare(results, read_results(baseline), tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise typer.Exit(code=1)
+    print(f"No regressions beyond {tolerance:.0%} against {baseline}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
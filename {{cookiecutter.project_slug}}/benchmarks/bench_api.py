@@ -0,0 +1,78 @@
+"""In-process load generator for the FastAPI app."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import cv2
+import httpx
+
+from benchmarks.harness import Result, percentile, synthetic_image
+
+
+async def _load(requests: int, concurrency: int) -> tuple[list[float], float, int]:
+    from app.main import app
+
+    # Distinct images, so the prediction cache does not answer repeats
+    base = cv2.cvtColor(synthetic_image(480, 640), cv2.COLOR_RGB2BGR)
+    uploads = []
+    for index in range(requests):
+        base[0, 0] = index % 256, index // 256 % 256, 0
+        uploads.append(cv2.imencode(".jpg", base)[1].tobytes())
+
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[bytes] = asyncio.Queue()
+    for upload in uploads:
+        queue.put_nowait(upload)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def user() -> None:
+                nonlocal errors
+                while not queue.empty():
+                    upload = queue.get_nowait()
+                    start = time.perf_counter()
+                    # A generous deadline, so load shedding does not count as failures
+                    response = await client.post(
+                        "/predict",
+                        files={"file": ("image.jpg", upload, "image/jpeg")},
+                        headers={"X-Request-Timeout-Ms": "60000"},
+                    )
+                    latencies.append(time.perf_counter() - start)
+                    errors += response.status_code != 200
+
+            start = time.perf_counter()
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    return latencies, elapsed, errors
+
+
+def run(quick: bool = False, concurrency: int = 16) -> list[Result]:
+    """Send concurrent ``/predict`` uploads and report latency percentiles.
+
+    The app runs in this process through an ASGI transport, so the numbers
+    cover routing, decoding, batching and inference but not the network.
+
+    Args:
+        quick: Send fewer requests, for smoke runs.
+        concurrency: Number of simulated clients sending requests back to back.
+
+    Returns:
+        Latency percentiles in milliseconds and throughput in images per second.
+    """
+    requests = 64 if quick else 512
+    latencies, elapsed, errors = asyncio.run(_load(requests, concurrency))
+    if errors:
+        raise RuntimeError(f"{errors} of {requests} benchmark requests failed")
+    milliseconds = [latency * 1000 for latency in latencies]
+    name = f"api_predict[c={concurrency}]"
+    return [
+        Result(f"{name}.p50", percentile(milliseconds, 50), "ms", higher_is_better=False),
+        Result(f"{name}.p95", percentile(milliseconds, 95), "ms", higher_is_better=False),
+        Result(f"{name}.p99", percentile(milliseconds, 99), "ms", higher_is_better=False),
+        Result(f"{name}.throughput", requests / elapsed, "images/s"),
+    ]
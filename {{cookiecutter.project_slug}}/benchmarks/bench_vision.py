@@ -0,0 +1,83 @@
+"""Throughput of decoding, preprocessing and prediction across image and batch sizes."""
+
+from __future__ import annotations
+
+import pathlib
+
+import cv2
+import torch
+
+from benchmarks.harness import Result, measure, synthetic_image
+from {{ cookiecutter.python_package }}.backends import apply_precision
+from {{ cookiecutter.python_package }}.vision import (
+    build_model,
+    load_image,
+    predict_batch,
+    predict_simple,
+    preprocess_batch,
+    preprocess_image,
+)
+
+# (height, width): VGA, full HD and a 12 MP photo
+IMAGE_SIZES = [(480, 640), (1080, 1920), (3000, 4000)]
+BATCH_SIZES = [1, 8, 32]
+INPUT_SIZE = (224, 224)
+
+
+def run(workdir: pathlib.Path, quick: bool = False) -> list[Result]:
+    """Run the vision benchmarks.
+
+    Args:
+        workdir: Directory for the generated test images.
+        quick: Fewer sizes and shorter timings, for smoke runs.
+
+    Returns:
+        Throughput results in images per second.
+    """
+    min_time = 0.2 if quick else 1.0
+    image_sizes = IMAGE_SIZES[:2] if quick else IMAGE_SIZES
+    batch_sizes = BATCH_SIZES[:2] if quick else BATCH_SIZES
+    results = []
+
+    for height, width in image_sizes:
+        label = f"{width}x{height}"
+        image = synthetic_image(height, width)
+        path = workdir / f"{label}.jpg"
+        cv2.imwrite(str(path), cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+
+        seconds = measure(lambda path=path: load_image(path), min_time)
+        results.append(Result(f"load_image[{label}]", 1 / seconds, "images/s"))
+        seconds = measure(lambda path=path: load_image(path, INPUT_SIZE), min_time)
+        results.append(Result(f"load_image_sized[{label}]", 1 / seconds, "images/s"))
+        seconds = measure(lambda image=image: preprocess_image(image, INPUT_SIZE), min_time)
+        results.append(Result(f"preprocess_image[{label}]", 1 / seconds, "images/s"))
+        seconds = measure(lambda path=path: predict_simple(path), min_time)
+        results.append(Result(f"predict_simple[{label}]", 1 / seconds, "images/s"))
+
+    image = synthetic_image(*IMAGE_SIZES[0])
+    model = build_model("resnet18", num_classes=1000).eval()
+    bf16_model = apply_precision(build_model("resnet18", num_classes=1000), "bf16")
+    for batch_size in batch_sizes:
+        images = [image] * batch_size
+        seconds = measure(lambda images=images: preprocess_batch(images, INPUT_SIZE), min_time)
+        results.append(
+            Result(f"preprocess_batch[bs={batch_size}]", batch_size / seconds, "images/s")
+        )
+        with torch.inference_mode():
+            seconds = measure(
+                lambda images=images: predict_batch(images, INPUT_SIZE, model=model), min_time
+            )
+        results.append(
+            Result(f"predict_batch_resnet18[bs={batch_size}]", batch_size / seconds, "images/s")
+        )
+        with torch.inference_mode():
+            seconds = measure(
+                lambda images=images: predict_batch(images, INPUT_SIZE, model=bf16_model),
+                min_time,
+            )
+        results.append(
+            Result(
+                f"predict_batch_resnet18_bf16[bs={batch_size}]", batch_size / seconds, "images/s"
+            )
+        )
+    return results
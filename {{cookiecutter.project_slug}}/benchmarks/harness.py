@@ -0,0 +1,116 @@
+"""Timing, result files and baseline comparison shared by the benchmarks."""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+import torch
+
+
+@dataclass
+class Result:
+    """One benchmark measurement."""
+
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+
+def measure(fn: Callable[[], Any], min_time: float = 0.5, repeats: int = 5) -> float:
+    """Median wall time of one call to ``fn`` in seconds.
+
+    ``fn`` is called once to warm up, then in ``repeats`` rounds of enough
+    calls to last about ``min_time / repeats`` seconds each.
+    """
+    start = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - start, 1e-6)
+    calls = max(1, int(min_time / repeats / once))
+    rounds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        rounds.append((time.perf_counter() - start) / calls)
+    return statistics.median(rounds)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """The ``q``-th percentile (0-100) of ``values``."""
+    return float(np.percentile(values, q))
+
+
+def synthetic_image(height: int, width: int, seed: int = 0) -> np.ndarray:
+    """An RGB image with gradients and noise, so it compresses like a photo."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    image = np.stack([x * 255 // width, y * 255 // height, (x + y) % 256], axis=-1)
+    image = image + rng.integers(-16, 16, size=image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def environment() -> dict[str, Any]:
+    """Host and library details stored with each result file."""
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(results: list[Result], path: pathlib.Path) -> None:
+    """Write results and the environment they were measured in as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "environment": environment(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def read_results(path: pathlib.Path) -> list[Result]:
+    """Read a result file written by :func:`write_results`."""
+    data = json.loads(path.read_text())
+    return [Result(**entry) for entry in data["results"].values()]
+
+
+def compare(results: list[Result], baseline: list[Result], tolerance: float = 0.2) -> list[str]:
+    """Find results that are worse than the baseline by more than ``tolerance``.
+
+    Args:
+        results: Current measurements.
+        baseline: Reference measurements; benchmarks missing from either side
+            are ignored.
+        tolerance: Allowed relative slowdown, e.g. ``0.2`` for 20 %.
+
+    Returns:
+        One description per regression, empty if there are none.
+    """
+    reference = {result.name: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get(result.name)
+        if base is None or base.value == 0:
+            continue
+        change = result.value / base.value - 1
+        worse = -change if result.higher_is_better else change
+        if worse > tolerance:
+            regressions.append(
+                f"{result.name}: {result.value:.4g} {result.unit} vs baseline "
+                f"{base.value:.4g} ({change:+.1%})"
+            )
+    return regressions
@@ -0,0 +1,49 @@
+"""Tests for deadline-aware admission control."""
+
+from app.admission import AdmissionController
+
+
+def _calibrated(**kwargs: float) -> AdmissionController:
+    controller = AdmissionController(min_samples=3, **kwargs)
+    for _ in range(3):
+        controller.record(0.01, in_flight=0)
+        controller.record(0.05, in_flight=4)
+    return controller
+
+
+def test_everything_is_admitted_until_calibrated() -> None:
+    """Without enough samples there is no prediction and nothing is shed."""
+    controller = AdmissionController(min_samples=3)
+    controller.record(1.0, in_flight=0)
+
+    assert controller.predict(0) is None
+    assert controller.decide(in_flight=100, remaining=0.001) == "admit"
+
+
+def test_prediction_uses_the_load_level_and_extrapolates() -> None:
+    """Known load levels use their average; higher ones scale from the nearest below."""
+    controller = _calibrated()
+
+    assert controller.predict(0) == 0.01
+    assert controller.predict(5) == 0.05
+    assert controller.predict(8) == 0.1
+
+
+def test_requests_that_cannot_finish_are_shed_or_degraded() -> None:
+    """Late requests are rejected, or degraded when a smaller input fits the deadline."""
+    assert _calibrated().decide(in_flight=4, remaining=0.1) == "admit"
+    assert _calibrated().decide(in_flight=4, remaining=0.03) == "reject"
+    assert _calibrated(degrade_cost=0.5).decide(in_flight=4, remaining=0.03) == "degrade"
+
+
+def test_requests_late_even_when_idle_are_admitted() -> None:
+    """Shedding cannot help when an idle server would miss the deadline too."""
+    assert _calibrated().decide(in_flight=4, remaining=0.005) == "admit"
+
+
+def test_render_counts_decisions() -> None:
+    """Decisions are exported as a Prometheus counter."""
+    controller = _calibrated()
+    controller.decide(in_flight=4, remaining=0.03)
+
+    assert 'admission_decisions_total{decision="reject"} 1' in controller.render()
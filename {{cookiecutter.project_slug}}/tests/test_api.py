@@ -0,0 +1,381 @@
+"""Tests for the FastAPI application."""
+
+import json
+import pathlib
+import threading
+from collections.abc import Iterator
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import main
+from app.main import app
+from {{ cookiecutter.python_package }}.registry import ModelRegistry
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """Test client with the application lifespan running."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _encoded_image(height: int = 32, width: int = 48) -> bytes:
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return encoded.tobytes()
+
+
+def test_health(client: TestClient) -> None:
+    """Health endpoint reports healthy."""
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+
+def test_predict_upload(client: TestClient) -> None:
+    """Uploaded images are decoded in memory and predicted."""
+    response = client.post("/predict", files={"file": ("image.png", _encoded_image(), "image/png")})
+
+    assert response.status_code == 200
+    assert response.json()["prediction"]["image_shape"] == [32, 48, 3]
+
+
+def test_predict_reports_the_uploaded_size_of_reduced_decodes(client: TestClient) -> None:
+    """Large JPEGs are decoded small, but image_shape is still the uploaded size."""
+    ok, encoded = cv2.imencode(".jpg", np.zeros((900, 1200, 3), dtype=np.uint8))
+    assert ok
+
+    response = client.post(
+        "/predict", files={"file": ("photo.jpg", encoded.tobytes(), "image/jpeg")}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["prediction"]["image_shape"] == [900, 1200, 3]
+
+
+def test_predict_rejects_decompression_bombs_as_too_large(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """JPEGs with more pixels than PIL opens get 413, as on /predict/tiled."""
+    ok, encoded = cv2.imencode(".jpg", np.full((300, 400, 3), 7, dtype=np.uint8))
+    assert ok
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    response = client.post(
+        "/predict", files={"file": ("bomb.jpg", encoded.tobytes(), "image/jpeg")}
+    )
+
+    assert response.status_code == 413
+
+
+def test_predict_upload_rejects_undecodable_image(client: TestClient) -> None:
+    """Corrupt uploads are reported as client errors."""
+    response = client.post("/predict", files={"file": ("image.png", b"garbage", "image/png")})
+
+    assert response.status_code == 400
+
+
+def test_predict_repeated_upload_is_cached(client: TestClient) -> None:
+    """A byte-identical upload is answered from the prediction cache."""
+    content = _encoded_image(17, 19)
+    first = client.post("/predict", files={"file": ("a.png", content, "image/png")})
+    hits = main.predictions.hits
+    second = client.post("/predict", files={"file": ("b.png", content, "image/png")})
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert main.predictions.hits == hits + 1
+
+
+def test_predict_rejected_when_busy(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Requests over the in-flight limit get 503 with Retry-After."""
+    monkeypatch.setattr(main.executor, "in_flight", main.executor.max_in_flight)
+
+    response = client.post("/predict", files={"file": ("image.png", _encoded_image(), "image/png")})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_predict_tiled_returns_one_entry_per_tile(client: TestClient) -> None:
+    """Tiled prediction covers the full-resolution upload with overlapping tiles."""
+    response = client.post(
+        "/predict/tiled",
+        params={"tile": 64, "overlap": 0.5},
+        files={"file": ("image.png", _encoded_image(64, 160), "image/png")},
+    )
+
+    assert response.status_code == 200
+    prediction = response.json()["prediction"]
+    assert prediction["image_shape"] == [64, 160, 3]
+    assert [tile["box"][1] for tile in prediction["tiles"]] == [0, 32, 64, 96]
+
+
+def test_predict_tiled_goes_through_the_batcher_and_admission(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Tiles are predicted in micro-batches and the request's latency is recorded."""
+    batches: list[int] = []
+    handler = main.tiled_batcher.handler
+
+    def counting(images: list[np.ndarray]) -> list[object]:
+        batches.append(len(images))
+        return handler(images)
+
+    monkeypatch.setattr(main.tiled_batcher, "handler", counting)
+    controller = main.AdmissionController(min_samples=1)
+    monkeypatch.setattr(main, "admission", controller)
+
+    response = client.post(
+        "/predict/tiled",
+        params={"tile": 64, "overlap": 0.5},
+        files={"file": ("image.png", _encoded_image(64, 160), "image/png")},
+    )
+
+    assert response.status_code == 200
+    assert sum(batches) == 4
+    assert controller.predict(0) is not None
+
+
+def test_predict_tiled_rejects_images_over_the_pixel_limit(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Uploads too large to hold decoded are refused with 413 before decoding."""
+    monkeypatch.setattr(main.config.batching, "max_tiled_megapixels", 0.005)
+    monkeypatch.setattr(main, "load_image_from_bytes", lambda _: pytest.fail("image was decoded"))
+
+    response = client.post(
+        "/predict/tiled",
+        files={"file": ("image.png", _encoded_image(64, 160), "image/png")},
+    )
+
+    assert response.status_code == 413
+
+
+def test_predict_stream_answers_each_frame_with_its_id(client: TestClient) -> None:
+    """Frames sent over the WebSocket come back as results tagged with frame ids."""
+    with client.websocket_connect("/predict/stream") as websocket:
+        websocket.send_bytes(_encoded_image(20, 30))
+        first = websocket.receive_json()
+        websocket.send_bytes(b"not an image")
+        second = websocket.receive_json()
+
+    assert first["frame_id"] == 0
+    assert first["prediction"]["image_shape"] == [20, 30, 3]
+    assert second["frame_id"] == 1
+    assert second["error"]
+
+
+def test_predict_stream_closes_on_text_frames(client: TestClient) -> None:
+    """A text message closes the stream with 1003 after earlier frames are answered."""
+    with client.websocket_connect("/predict/stream") as websocket:
+        websocket.send_bytes(_encoded_image(20, 30))
+        websocket.send_text("not a frame")
+        first = websocket.receive_json()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert first["frame_id"] == 0
+    assert closed.value.code == 1003
+
+
+def test_predict_stream_closes_with_1013_when_busy(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Streams over the in-flight limit are accepted, then closed with try-again-later."""
+    monkeypatch.setattr(main.executor, "in_flight", main.executor.max_in_flight)
+
+    with client.websocket_connect("/predict/stream") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert closed.value.code == 1013
+
+
+def test_predict_shed_when_deadline_cannot_be_met(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Requests predicted to miss their deadline at the current load get 503."""
+    controller = main.AdmissionController(min_samples=1)
+    controller.record(0.001, in_flight=0)
+    controller.record(10.0, in_flight=1)
+    monkeypatch.setattr(main, "admission", controller)
+    monkeypatch.setattr(main.executor, "in_flight", 1)
+
+    response = client.post(
+        "/predict",
+        files={"file": ("image.png", _encoded_image(), "image/png")},
+        headers={"X-Request-Timeout-Ms": "100"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert controller.decisions["reject"] == 1
+
+
+def test_predict_batch_streams_ndjson(client: TestClient) -> None:
+    """Each image gets its own NDJSON line, including per-image failures."""
+    files = [
+        ("files", ("a.png", _encoded_image(), "image/png")),
+        ("files", ("b.png", _encoded_image(16, 16), "image/png")),
+        ("files", ("c.png", b"garbage", "image/png")),
+    ]
+
+    response = client.post("/predict/batch", files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = sorted(
+        (json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"]
+    )
+    assert [line["source"] for line in lines] == ["a.png", "b.png", "c.png"]
+    assert lines[1]["prediction"]["image_shape"] == [16, 16, 3]
+    assert lines[2]["status_code"] == 400
+
+
+def test_predict_batch_records_one_admission_sample(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A batch request feeds admission control one amortised sample, not one per image."""
+    samples: list[float] = []
+    controller = main.AdmissionController(min_samples=1)
+    monkeypatch.setattr(controller, "record", lambda seconds, in_flight: samples.append(seconds))
+    monkeypatch.setattr(main, "admission", controller)
+    files = [("files", (f"{name}.png", _encoded_image(), "image/png")) for name in "abc"]
+
+    response = client.post("/predict/batch", files=files)
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+    assert len(samples) == 1
+
+
+def test_metrics_exposes_stage_histograms(client: TestClient) -> None:
+    """Per-stage latency histograms are exported in Prometheus format."""
+    client.post("/predict", files={"file": ("image.png", _encoded_image(21, 23), "image/png")})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    for stage in ("read", "decode", "queue", "preprocess", "inference", "serialize"):
+        assert 'inference_stage_seconds_count{stage="' + stage + '"}' in response.text
+    assert 'http_request_duration_seconds_bucket{route="/predict",le="+Inf"}' in response.text
+
+
+def test_metrics_include_the_stages_of_streamed_batches(client: TestClient) -> None:
+    """/predict/batch is observed once its streamed body has finished, with all its stages."""
+    decodes = main.stage_seconds.count("decode")
+    batches = main.request_seconds.count("/predict/batch")
+    files = [
+        ("files", (f"{size}.png", _encoded_image(size, size), "image/png")) for size in (17, 19)
+    ]
+
+    response = client.post("/predict/batch", files=files)
+
+    assert response.status_code == 200
+    assert main.stage_seconds.count("decode") == decodes + 1
+    assert main.request_seconds.count("/predict/batch") == batches + 1
+
+
+def test_slow_requests_are_logged(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Requests over the latency budget are logged with their stage breakdown."""
+    monkeypatch.setattr(main.config.telemetry, "latency_budget_ms", 0.0)
+    # A zero budget would otherwise be shed before any stage runs
+    monkeypatch.setattr(main, "admission", None)
+
+    client.post("/predict", files={"file": ("image.png", _encoded_image(25, 27), "image/png")})
+
+    assert any("decode=" in record.getMessage() for record in caplog.records)
+
+
+def test_preload_skips_models_that_preparation_would_run(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    """A preforking parent must not run the model, so traced backends load per worker."""
+    monkeypatch.setattr(main.config.model, "checkpoint", tmp_path / "model.pt")
+    monkeypatch.setattr(main.config.model, "backend", "torchscript")
+    monkeypatch.setattr(main.registry, "get", lambda name: pytest.fail("model was loaded"))
+
+    assert main.preload() is False
+
+
+def _classifier() -> torch.nn.Module:
+    model = torch.nn.Sequential(
+        torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 2)
+    )
+    torch.nn.init.zeros_(model[2].weight)
+    torch.nn.init.zeros_(model[2].bias)
+    return model
+
+
+def _save_classifier(path: pathlib.Path, label: int) -> pathlib.Path:
+    """A two-class model predicting ``label`` for every image."""
+    model = _classifier()
+    with torch.no_grad():
+        model[2].bias[label] = 5.0
+    torch.save(model.state_dict(), path)
+    return path
+
+
+def test_swap_keeps_in_flight_requests_on_the_old_model(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    """A request predicting during a swap finishes on the old model; later ones use the new."""
+    registry = ModelRegistry(lambda _: _classifier(), mmap=False)
+    registry.register("default", "1", _save_classifier(tmp_path / "v1.pt", label=0))
+    _save_classifier(tmp_path / "v2.pt", label=1)
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main, "predictions", None)
+    monkeypatch.setattr(main.config.model, "name", "default")
+    monkeypatch.setattr(main.config.model, "checkpoint", tmp_path / "v1.pt")
+    monkeypatch.setattr(main.config.model, "swap_dir", tmp_path)
+    predicting, release = threading.Event(), threading.Event()
+    predict_batch = main.predict_batch
+
+    def gated_predict_batch(*args: object, **kwargs: object) -> list:
+        predicting.set()
+        assert release.wait(timeout=10)
+        return predict_batch(*args, **kwargs)
+
+    monkeypatch.setattr(main, "predict_batch", gated_predict_batch)
+    upload = {"file": ("image.png", _encoded_image(), "image/png")}
+    responses = {}
+    in_flight = threading.Thread(
+        target=lambda: responses.update(old=client.post("/predict", files=upload))
+    )
+    in_flight.start()
+    try:
+        assert predicting.wait(timeout=10)
+        swapped = client.post("/models/default/swap", json={"version": "2", "checkpoint": "v2.pt"})
+    finally:
+        release.set()
+        in_flight.join(timeout=10)
+    new = client.post("/predict", files=upload)
+
+    assert swapped.json() == {"name": "default", "version": "2"}
+    assert responses["old"].json()["prediction"]["prediction"] == 0
+    assert new.json()["prediction"]["prediction"] == 1
+    assert registry.active_version("default") == "2"
+
+
+def test_swap_only_loads_checkpoints_from_the_swap_dir(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    """Swapping is off without model.swap_dir and cannot reach outside it."""
+    body = {"version": "2", "checkpoint": "../model.pt"}
+    disabled = client.post(f"/models/{main.config.model.name}/swap", json=body)
+    monkeypatch.setattr(main.config.model, "swap_dir", tmp_path / "models")
+    outside = client.post(f"/models/{main.config.model.name}/swap", json=body)
+
+    assert disabled.status_code == 403
+    assert outside.status_code == 400
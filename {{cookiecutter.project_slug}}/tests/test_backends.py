@@ -0,0 +1,164 @@
+"""Tests for the optimized inference backends."""
+
+import pytest
+import torch
+
+from {{ cookiecutter.python_package }}.backends import (
+    apply_precision,
+    check_parity,
+    optimize_model,
+    parity_rtol,
+    prepare_inference_model,
+    quantize_static,
+)
+from {{ cookiecutter.python_package }}.vision import predict_batch
+
+
+def _model() -> torch.nn.Module:
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, 3),
+        torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(8, 5),
+    ).eval()
+
+
+@pytest.mark.parametrize("backend", ["eager", "int8", "torchscript"])
+def test_backend_matches_eager(backend: str) -> None:
+    """Optimized backends pass the parity check against the eager model."""
+    model = _model()
+    inputs = torch.rand(16, 3, 32, 32)
+
+    optimized = optimize_model(model, backend, example=inputs[:2])
+    report = check_parity(model, optimized, inputs, rtol=parity_rtol(backend))
+
+    assert report.passed
+    assert optimized(inputs[:3]).shape == (3, 5)
+
+
+def test_onnx_backend_matches_eager() -> None:
+    """Exported ONNX models run in onnxruntime with eager-level accuracy."""
+    pytest.importorskip("onnxruntime")
+    model = _model()
+    inputs = torch.rand(4, 3, 32, 32)
+
+    report = check_parity(model, optimize_model(model, "onnx", example=inputs[:1]), inputs)
+
+    assert report.max_abs_diff < 1e-4
+
+
+def test_parity_check_detects_drift() -> None:
+    """A model with different weights fails the parity check."""
+    model = _model()
+    other = _model()
+    with torch.no_grad():
+        other[-1].bias[0] += 100.0  # class 0 always wins
+        model[-1].bias[0] -= 100.0  # class 0 never wins
+
+    assert not check_parity(model, other, torch.rand(16, 3, 32, 32)).passed
+
+
+def test_parity_check_requires_close_outputs() -> None:
+    """Matching top-1 predictions do not hide outputs that drifted numerically."""
+    model = _model()
+    scaled = _model()
+    with torch.no_grad():
+        scaled[-1].weight.mul_(1.5)  # same ranking, different logits
+        scaled[-1].bias.mul_(1.5)
+
+    report = check_parity(model, scaled, torch.rand(16, 3, 32, 32))
+
+    assert report.top1_agreement == 1.0
+    assert not report.passed
+
+
+def test_int8_quantizes_convolutions() -> None:
+    """Static int8 fuses and quantizes convolutions, not just the classifier."""
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, 3),
+        torch.nn.BatchNorm2d(8),
+        torch.nn.ReLU(),
+        torch.nn.Conv2d(8, 8, 3),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(8, 5),
+    ).eval()
+    inputs = torch.rand(16, 3, 32, 32)
+
+    quantized = quantize_static(model, inputs[:8])
+    modules = [type(module).__module__ for module in quantized.modules()]
+
+    assert not any(isinstance(module, torch.nn.Conv2d) for module in quantized.modules())
+    assert sum("quantized" in name for name in modules) >= 3
+    assert isinstance(model[1], torch.nn.BatchNorm2d)
+    assert check_parity(model, quantized, inputs, rtol=parity_rtol("int8")).passed
+
+
+def test_int8_needs_calibration_data() -> None:
+    """Static quantization cannot run without inputs to calibrate on."""
+    with pytest.raises(ValueError, match="example"):
+        optimize_model(_model(), "int8")
+    with pytest.raises(ValueError, match="int8"):
+        prepare_inference_model(_model(), "int8", "bf16", example=torch.rand(2, 3, 32, 32))
+
+
+def test_predict_batch_with_quantized_model() -> None:
+    """Predictions work with backends that do not expose regular parameters."""
+    model = optimize_model(_model(), "int8", example=torch.rand(4, 3, 32, 32))
+
+    (result,) = predict_batch([torch.zeros(40, 40, 3, dtype=torch.uint8).numpy()], model=model)
+
+    assert 0.0 <= result["confidence"] <= 1.0
+
+
+@pytest.mark.parametrize("precision", ["bf16", "fp16"])
+def test_reduced_precision_matches_fp32(precision: str) -> None:
+    """Autocast models pass the parity check and take matching preprocessed input."""
+    model = _model()
+    inputs = torch.rand(16, 3, 32, 32)
+
+    reduced = apply_precision(_model(), precision)
+    report = check_parity(model, reduced, inputs, rtol=parity_rtol(precision=precision))
+    (result,) = predict_batch([torch.zeros(40, 40, 3, dtype=torch.uint8).numpy()], model=reduced)
+
+    assert report.passed
+    assert reduced(inputs[:3]).dtype == torch.float32
+    assert isinstance(result["prediction"], int)
+
+
+def test_reduced_precision_leaves_the_model_unchanged() -> None:
+    """Wrapping neither converts the model's weights nor copies them."""
+    model = _model()
+    weight = model[0].weight
+
+    reduced = apply_precision(model, "bf16")
+
+    assert reduced.model is model
+    assert model[0].weight is weight
+    assert weight.is_contiguous()
+    assert not weight.is_contiguous(memory_format=torch.channels_last)
+
+
+def test_fp32_precision_returns_model() -> None:
+    """fp32 leaves the model untouched, and unknown precisions are rejected."""
+    model = _model()
+
+    assert apply_precision(model, "fp32") is model
+    with pytest.raises(ValueError):
+        apply_precision(model, "int4")
+
+
+def test_prepare_inference_model_checks_parity() -> None:
+    """Changed models need an example to be checked on; drifting ones are refused."""
+    model = _model()
+    inputs = torch.rand(8, 3, 32, 32)
+
+    assert prepare_inference_model(model) is model
+    with pytest.raises(ValueError, match="example"):
+        prepare_inference_model(model, precision="bf16")
+    assert prepare_inference_model(model, "int8", example=inputs) is not model
+    with pytest.raises(RuntimeError, match="parity check"):
+        prepare_inference_model(model, precision="bf16", example=inputs, rtol=1e-9)
@@ -0,0 +1,149 @@
+"""Tests for the micro-batching scheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.batching import DeadlineExceededError, MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch() -> None:
+    """Requests submitted together are served by one handler call."""
+    batch_sizes: list[int] = []
+
+    def handler(items: list[int]) -> list[int]:
+        batch_sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    async def run() -> list[int]:
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert batch_sizes == [5]
+
+
+def test_batches_are_capped_at_max_batch_size() -> None:
+    """No batch exceeds the configured size."""
+    batch_sizes: list[int] = []
+
+    def handler(items: list[int]) -> list[int]:
+        batch_sizes.append(len(items))
+        return items
+
+    async def run() -> list[int]:
+        batcher = MicroBatcher(handler, max_batch_size=3, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == list(range(7))
+    assert max(batch_sizes) <= 3
+    assert sum(batch_sizes) == 7
+
+
+def test_handler_errors_reach_every_caller() -> None:
+    """An exception in the handler is raised for each request in the batch."""
+
+    def handler(items: list[int]) -> list[int]:
+        raise ValueError("boom")
+
+    async def run() -> None:
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=10)
+        try:
+            with pytest.raises(ValueError, match="boom"):
+                await batcher.submit(1)
+        finally:
+            await batcher.stop()
+
+    asyncio.run(run())
+
+
+def test_expired_items_are_dropped_before_inference() -> None:
+    """Items whose deadline passed while queued fail without reaching the handler."""
+    seen: list[int] = []
+
+    def handler(items: list[int]) -> list[int]:
+        seen.extend(items)
+        return items
+
+    async def run() -> None:
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=20)
+        try:
+            expired = batcher.submit(1, deadline=time.monotonic())
+            live = batcher.submit(2, deadline=time.monotonic() + 10)
+            results = await asyncio.gather(expired, live, return_exceptions=True)
+        finally:
+            await batcher.stop()
+        assert isinstance(results[0], DeadlineExceededError)
+        assert results[1] == 2
+
+    asyncio.run(run())
+    assert seen == [2]
+
+
+def test_batches_run_concurrently_up_to_the_limit() -> None:
+    """With max_concurrent_batches, a second batch starts while the first is running."""
+    running = 0
+    peak = 0
+
+    def handler(items: list[int]) -> list[int]:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        time.sleep(0.05)
+        running -= 1
+        return items
+
+    async def run() -> list[int]:
+        batcher = MicroBatcher(handler, max_batch_size=2, max_wait_ms=1, max_concurrent_batches=2)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
+    assert peak == 2
+
+
+def test_handler_gets_the_latest_deadline_of_its_batch() -> None:
+    """With pass_deadline, the handler may wait until the last caller's deadline."""
+    deadlines: list[float | None] = []
+
+    def handler(items: list[int], deadline: float | None) -> list[int]:
+        deadlines.append(deadline)
+        return items
+
+    async def run() -> None:
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=50, pass_deadline=True)
+        now = time.monotonic()
+        try:
+            await asyncio.gather(batcher.submit(1, now + 5), batcher.submit(2, now + 9))
+            await asyncio.gather(batcher.submit(3, now + 5), batcher.submit(4))
+        finally:
+            await batcher.stop()
+        assert deadlines == [now + 9, None]
+
+    asyncio.run(run())
+
+
+def test_stopping_fails_items_of_a_batch_being_collected() -> None:
+    """Items already taken from the queue for the next batch are failed, not dropped."""
+
+    async def run() -> None:
+        batcher = MicroBatcher(lambda items: items, max_batch_size=8, max_wait_ms=10_000)
+        await batcher.start()
+        submitted = asyncio.create_task(batcher.submit(1))
+        await asyncio.sleep(0.05)
+        assert batcher.pending == 0
+        await batcher.stop()
+        with pytest.raises(RuntimeError, match="Batcher stopped"):
+            await asyncio.wait_for(submitted, timeout=1)
+
+    asyncio.run(run())
@@ -0,0 +1,47 @@
+"""Tests for the benchmark result comparison."""
+
+import pathlib
+
+import pytest
+import typer
+
+from benchmarks import __main__ as cli
+from benchmarks.harness import Result, compare, read_results, write_results
+
+
+def test_compare_flags_regressions_beyond_tolerance() -> None:
+    """Slower throughput and higher latency beyond the tolerance are regressions."""
+    baseline = [
+        Result("decode", 100.0, "images/s"),
+        Result("p99", 50.0, "ms", higher_is_better=False),
+        Result("removed", 1.0, "images/s"),
+    ]
+    results = [
+        Result("decode", 85.0, "images/s"),
+        Result("p99", 70.0, "ms", higher_is_better=False),
+        Result("added", 1.0, "images/s"),
+    ]
+
+    assert len(compare(results, baseline, tolerance=0.2)) == 1
+    assert len(compare(results, baseline, tolerance=0.1)) == 2
+
+
+def test_results_round_trip(tmp_path: pathlib.Path) -> None:
+    """Result files can be read back for comparison."""
+    results = [Result("decode", 100.0, "images/s")]
+    write_results(results, tmp_path / "results.json")
+
+    assert read_results(tmp_path / "results.json") == results
+
+
+def test_missing_baseline_fails_unless_allowed(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Without a baseline nothing is compared, so the run fails unless told otherwise."""
+    monkeypatch.setattr(cli.bench_vision, "run", lambda *_, **__: [Result("decode", 1.0, "x")])
+    options = {"output": tmp_path / "latest.json", "baseline": tmp_path / "missing.json"}
+
+    with pytest.raises(typer.Exit) as info:
+        cli.main(**options, skip_api=True)
+    assert info.value.exit_code == 1
+    cli.main(**options, skip_api=True, allow_missing_baseline=True)
@@ -0,0 +1,156 @@
+"""Tests for checkpoint saving and loading."""
+
+import json
+import os
+import pathlib
+
+import pytest
+import torch
+
+from {{ cookiecutter.python_package }}.utils import (
+    AsyncCheckpointer,
+    TensorFile,
+    TensorStore,
+    load_state,
+    save_state,
+)
+from {{ cookiecutter.python_package }}.utils.checkpointing import write_sharded
+
+
+def _state() -> dict[str, object]:
+    return {
+        "model": {
+            "fc.weight": torch.randn(3, 4),
+            "fc.bias": torch.zeros(3, dtype=torch.bfloat16),
+            "steps": torch.tensor(7),
+        },
+        "epoch": 10,
+        "metrics": {"accuracy": 0.5},
+    }
+
+
+def test_torch_format_round_trip_with_mmap(tmp_path: pathlib.Path) -> None:
+    """Checkpoints saved with torch.save can be memory-mapped on load."""
+    state = _state()
+    path = save_state(state, tmp_path)
+
+    loaded = load_state(path, mmap=True)
+
+    torch.testing.assert_close(loaded["model"]["fc.weight"], state["model"]["fc.weight"])
+    assert loaded["epoch"] == 10
+
+
+def test_safetensors_format_round_trip(tmp_path: pathlib.Path) -> None:
+    """Nested tensors and JSON values survive the safetensors format."""
+    state = _state()
+    path = save_state(state, tmp_path, format="safetensors")
+
+    loaded = load_state(path)
+
+    assert path.suffix == ".safetensors"
+    for name, tensor in state["model"].items():
+        torch.testing.assert_close(loaded["model"][name], tensor)
+    assert loaded["epoch"] == 10
+    assert loaded["metrics"] == {"accuracy": 0.5}
+
+
+def test_tensor_file_gives_lazy_per_tensor_access(tmp_path: pathlib.Path) -> None:
+    """Individual tensors can be read without materializing the whole file."""
+    state = _state()
+    path = save_state(state, tmp_path, format="safetensors")
+
+    tensors = TensorFile(path)
+
+    assert set(tensors) == {"model/fc.weight", "model/fc.bias", "model/steps"}
+    torch.testing.assert_close(tensors["model/fc.weight"], state["model"]["fc.weight"])
+
+
+def test_async_checkpointer_keeps_last_and_best(tmp_path: pathlib.Path) -> None:
+    """Background writes honour retention and record a manifest."""
+    model = torch.nn.Linear(4, 2)
+    with AsyncCheckpointer(tmp_path, keep_last=2, keep_best=1, mode="min") as checkpointer:
+        for step, loss in enumerate([0.1, 0.5, 0.4, 0.3]):
+            checkpointer.save({"model": model.state_dict(), "step": step}, step, metric=loss)
+            with torch.no_grad():
+                model.weight.add_(1.0)
+        checkpointer.wait()
+
+        assert checkpointer.best == tmp_path / "checkpoint-00000000.pt"
+        assert checkpointer.latest == tmp_path / "checkpoint-00000003.pt"
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    kept = sorted(record["step"] for record in manifest["checkpoints"])
+    assert kept == [0, 2, 3]
+    assert sorted(p.name for p in tmp_path.glob("*.pt")) == [
+        "checkpoint-00000000.pt",
+        "checkpoint-00000002.pt",
+        "checkpoint-00000003.pt",
+    ]
+    # The snapshot was taken at save() time, not when the write happened
+    torch.testing.assert_close(
+        load_state(tmp_path / "checkpoint-00000000.pt")["model"]["weight"],
+        model.weight.detach() - 4.0,
+    )
+
+
+def test_sharded_checkpoint_round_trip(tmp_path: pathlib.Path) -> None:
+    """Sharded checkpoints are written in parallel and reassembled on load."""
+    state = {"model": {f"layer{i}.weight": torch.randn(8, 8) for i in range(5)}, "epoch": 3}
+    with AsyncCheckpointer(tmp_path, num_shards=3) as checkpointer:
+        path = checkpointer.save(state, step=1).result()
+
+    assert path.is_dir()
+    assert len(list(path.glob("shard-*"))) == 3
+    loaded = load_state(path, mmap=True)
+    assert loaded["epoch"] == 3
+    for name, tensor in state["model"].items():
+        torch.testing.assert_close(loaded["model"][name], tensor)
+
+
+def test_sharded_checkpoint_overwrite_keeps_a_copy_until_replaced(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Overwriting moves the old directory aside; it is never deleted before the new one lands."""
+    path = tmp_path / "checkpoint"
+    write_sharded({"weight": torch.zeros(4)}, path, num_shards=2)
+    write_sharded({"weight": torch.ones(4)}, path, num_shards=2)
+    torch.testing.assert_close(load_state(path)["weight"], torch.ones(4))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["checkpoint"]
+
+    replace = os.replace
+
+    def crash_on_final_rename(src: str | os.PathLike, dst: str | os.PathLike) -> None:
+        if pathlib.Path(dst) == path:
+            raise OSError("crash during rename")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", crash_on_final_rename)
+    with pytest.raises(OSError):
+        write_sharded({"weight": torch.full((4,), 2.0)}, path, num_shards=2)
+    # The previous checkpoint survives, moved aside, and the partial one is removed
+    torch.testing.assert_close(load_state(tmp_path / ".checkpoint.old")["weight"], torch.ones(4))
+    assert not (tmp_path / ".checkpoint.tmp").exists()
+
+
+def test_tensor_store_only_writes_changed_tensors(tmp_path: pathlib.Path) -> None:
+    """Unchanged tensors are reused across checkpoints and load_state reassembles them."""
+    store = TensorStore(tmp_path)
+    backbone = torch.randn(16, 16)
+    head = torch.zeros(4, 16)
+
+    first = store.save({"model": {"backbone": backbone, "head": head}, "epoch": 0}, "epoch-0")
+    written = store.last_stats.blobs_written
+    head.add_(1.0)
+    second = store.save({"model": {"backbone": backbone, "head": head}, "epoch": 1}, "epoch-1")
+
+    assert written == 3  # backbone, head and the non-tensor state
+    assert store.last_stats.blobs_reused == 1  # backbone
+    assert store.last_stats.blobs_written == 2
+    loaded = load_state(second, mmap=True)
+    torch.testing.assert_close(loaded["model"]["backbone"], backbone)
+    torch.testing.assert_close(loaded["model"]["head"], head)
+    assert loaded["epoch"] == 1
+
+    first.unlink()
+    assert store.gc() == 2
+    torch.testing.assert_close(store.load(second)["model"]["head"], head)
@@ -0,0 +1,45 @@
+"""Tests for the streaming image dataset."""
+
+import pathlib
+
+import cv2
+import numpy as np
+
+from {{ cookiecutter.python_package }}.data import ImageStream, list_images
+
+
+def _write_images(directory: pathlib.Path, count: int) -> list[pathlib.Path]:
+    paths = []
+    for index in range(count):
+        path = directory / f"image_{index:03d}.png"
+        cv2.imwrite(str(path), np.full((20 + index, 30, 3), index, dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def test_list_images_from_directory_glob_and_manifest(tmp_path: pathlib.Path) -> None:
+    """Directories, glob patterns and manifests resolve to the same files."""
+    paths = _write_images(tmp_path, 3)
+    (tmp_path / "notes.md").write_text("not an image")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("\n".join(path.name for path in paths))
+
+    assert list_images(tmp_path) == paths
+    assert list_images(str(tmp_path / "*.png")) == paths
+    assert list_images(manifest) == paths
+
+
+def test_image_stream_yields_ordered_batches(tmp_path: pathlib.Path) -> None:
+    """Batches arrive in order, preprocessed, with failures reported."""
+    paths = _write_images(tmp_path, 7)
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"garbage")
+
+    stream = ImageStream([*paths, broken], batch_size=3, size=(16, 16), num_workers=2, prefetch=2)
+    batches = list(stream)
+
+    assert len(batches) == len(stream) == 3
+    assert [batch.images.shape[0] for batch in batches] == [3, 3, 1]
+    assert [path for batch in batches for path in batch.paths] == paths
+    assert batches[-1].failed == [broken]
+    assert batches[0].images.shape[1:] == (3, 16, 16)
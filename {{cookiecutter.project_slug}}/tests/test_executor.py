@@ -0,0 +1,29 @@
+"""Tests for the bounded inference executor."""
+
+import asyncio
+
+import pytest
+
+from app.executor import BoundedExecutor, ServerBusyError
+
+
+def test_run_executes_in_pool() -> None:
+    """Blocking functions run in the pool and return their result."""
+    executor = BoundedExecutor(max_workers=2)
+    try:
+        assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+    finally:
+        executor.shutdown()
+
+
+def test_admit_rejects_beyond_limit() -> None:
+    """Requests beyond max_in_flight are rejected and slots are released."""
+    executor = BoundedExecutor(max_in_flight=1)
+
+    with executor.admit():
+        with pytest.raises(ServerBusyError):
+            with executor.admit():
+                pass
+    with executor.admit():
+        assert executor.in_flight == 1
+    assert executor.in_flight == 0
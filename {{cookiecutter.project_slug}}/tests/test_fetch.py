@@ -0,0 +1,117 @@
+"""Tests for the async image fetcher against a local HTTP server."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TypeVar
+
+import httpx
+import pytest
+
+from app.fetch import FetchError, ImageFetcher
+
+T = TypeVar("T")
+
+PAYLOAD = b"x" * 4096
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        if self.path == "/slow":
+            # Each read completes well within the timeout, the whole body does not
+            self.send_response(200)
+            self.send_header("Content-Length", "10")
+            self.end_headers()
+            try:
+                for _ in range(10):
+                    self.wfile.write(b"x")
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client gave up, as it should
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url() -> Iterator[str]:
+    """Base URL of a local stand-in image server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _run(fetcher: ImageFetcher, call: Callable[[], Awaitable[T]]) -> T:
+    """Run a fetcher call in a fresh event loop and close the client afterwards."""
+
+    async def run() -> T:
+        try:
+            return await call()
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+def test_fetch_returns_body(server_url: str) -> None:
+    """A successful download returns the full body."""
+    fetcher = ImageFetcher()
+
+    assert _run(fetcher, lambda: fetcher.fetch(f"{server_url}/image.jpg")) == PAYLOAD
+
+
+def test_fetch_enforces_max_bytes(server_url: str) -> None:
+    """Bodies over the size cap are rejected with 413."""
+    fetcher = ImageFetcher(max_bytes=1024)
+
+    with pytest.raises(FetchError) as info:
+        _run(fetcher, lambda: fetcher.fetch(f"{server_url}/image.jpg"))
+    assert info.value.status_code == 413
+
+
+def test_fetch_many_reports_errors_per_url(server_url: str) -> None:
+    """Concurrent fetches return bodies and errors in input order."""
+    fetcher = ImageFetcher(max_concurrency=2)
+    urls = [f"{server_url}/a.jpg", f"{server_url}/missing", "ftp://example.com/b.jpg"]
+
+    results = _run(fetcher, lambda: fetcher.fetch_many(urls))
+
+    assert results[0] == PAYLOAD
+    assert isinstance(results[1], FetchError) and results[1].status_code == 502
+    assert isinstance(results[2], FetchError) and results[2].status_code == 400
+
+
+def test_fetch_timeout_covers_the_whole_download(server_url: str) -> None:
+    """A server trickling bytes is cut off after ``timeout_s`` in total, with 504."""
+    fetcher = ImageFetcher(timeout_s=0.4)
+
+    start = time.perf_counter()
+    with pytest.raises(FetchError) as info:
+        _run(fetcher, lambda: fetcher.fetch(f"{server_url}/slow"))
+    assert info.value.status_code == 504
+    assert time.perf_counter() - start < 0.9
+
+
+def test_fetch_rejects_malformed_content_length() -> None:
+    """An unparseable Content-Length is an upstream error, not a crash."""
+    fetcher = ImageFetcher()
+    # http.server output is validated by httpx's parser before it reaches the fetcher
+    response = httpx.Response(200, headers={"Content-Length": "lots"})
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda _: response))
+
+    with pytest.raises(FetchError) as info:
+        _run(fetcher, lambda: fetcher.fetch("http://images.example/a.jpg"))
+    assert info.value.status_code == 502
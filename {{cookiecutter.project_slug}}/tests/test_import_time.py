@@ -0,0 +1,41 @@
+"""Import-time budget: modules that do not need torch, OpenCV or PIL must not load them."""
+
+import subprocess
+import sys
+
+import pytest
+
+# Seconds to import each module in a fresh interpreter, heavy modules excluded
+IMPORT_BUDGETS = {
+    "{{ cookiecutter.python_package }}": 0.1,
+    "{{ cookiecutter.python_package }}.utils": 0.1,
+    "{{ cookiecutter.python_package }}.vision": 1.0,
+    "{{ cookiecutter.python_package }}.shards": 1.0,
+    # FastAPI, pydantic and httpx; the model and its libraries load at startup
+    "app.main": 2.0,
+}
+# Imported on first use, never by importing the modules above
+HEAVY_MODULES = ("torch", "cv2", "PIL")
+
+
+def _import(module: str) -> tuple[float, list[str]]:
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(*[name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+    return float(output[0]), output[1].split()
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGETS)
+def test_import_stays_within_budget(module: str) -> None:
+    """Importing the module is fast and does not pull in torch, OpenCV or PIL."""
+    seconds, loaded = _import(module)
+
+    assert loaded == []
+    assert seconds < IMPORT_BUDGETS[module]
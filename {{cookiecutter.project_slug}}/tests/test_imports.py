@@ -1,7 +1,5 @@
 """Test that all imports work correctly."""
 
-import pytest
-
 
 def test_package_import() -> None:
     """Test that the main package can be imported."""
@@ -20,11 +18,17 @@ def test_utils_import() -> None:
 
 def test_vision_import() -> None:
     """Test that vision module can be imported."""
-    from {{ cookiecutter.python_package }}.vision import load_image, preprocess_image, predict_simple
+    from {{ cookiecutter.python_package }}.vision import (
+        load_image,
+        predict_batch,
+        predict_simple,
+        preprocess_image,
+    )
 
     assert callable(load_image)
     assert callable(preprocess_image)
     assert callable(predict_simple)
+    assert callable(predict_batch)
 
 
 def test_app_import() -> None:
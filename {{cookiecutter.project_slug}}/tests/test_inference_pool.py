@@ -0,0 +1,128 @@
+"""Tests for the shared-memory inference process pool."""
+
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from app.batching import DeadlineExceededError
+from app.inference_pool import InferencePool, SharedRing
+
+
+class _SlowModel(torch.nn.Module):
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        time.sleep(1.0)
+        return torch.zeros(len(inputs), 3)
+
+
+def _slow_model() -> torch.nn.Module:
+    return _SlowModel()
+
+
+def test_ring_hands_out_released_slots_in_order() -> None:
+    """Slots are reserved together and reused after the others, like a ring."""
+    ring = SharedRing(slots=3, slot_bytes=16)
+    try:
+        first = ring.acquire(2)
+        assert first == [0, 1]
+        ring.release(first)
+        assert ring.acquire(3) == [2, 0, 1]
+        with pytest.raises(TimeoutError):
+            ring.acquire(1, timeout=0.01)
+    finally:
+        ring.close()
+
+
+def test_ring_views_share_memory() -> None:
+    """Writes through a slot view land in the shared block without copies."""
+    ring = SharedRing(slots=2, slot_bytes=12)
+    try:
+        view = ring.view(1, (2, 2, 3))
+        view[:] = 7
+        assert bytes(ring.memory.buf[12:24]) == bytes([7] * 12)
+        del view
+    finally:
+        ring.close()
+
+
+def test_pool_predicts_batches_in_another_process() -> None:
+    """Images go through shared memory and predictions come back in order."""
+    pool = InferencePool(None, input_size=(8, 8), processes=1, slots=4)
+    pool.start()
+    try:
+        images = [np.full((16, 12, 3), value, dtype=np.uint8) for value in (0, 255)]
+        first = pool.run(images)
+        second = pool.run(images[:1])
+    finally:
+        pool.close()
+
+    assert [prediction["image_shape"] for prediction, _ in first] == [(16, 12, 3)] * 2
+    assert first[0][0]["processed_shape"] == [1, 3, 8, 8]
+    assert set(first[0][1]) == {"preprocess", "inference"}
+    assert len(second) == 1
+
+
+def test_pool_stops_waiting_at_the_deadline_but_keeps_the_slots() -> None:
+    """A late batch times out, and its slots stay reserved until the process is done."""
+    pool = InferencePool(_slow_model, input_size=(8, 8), processes=1, slots=4)
+    pool.start()
+    try:
+        images = [np.zeros((8, 8, 3), dtype=np.uint8)] * 2
+        with pytest.raises(DeadlineExceededError):
+            pool.run(images, deadline=time.monotonic() + 0.1)
+        assert pool._ring is not None and pool._ring.free == 2
+        assert len(pool.run(images)) == 2
+        assert pool._ring.free == 4
+    finally:
+        pool.close()
+
+
+def test_pool_stops_waiting_for_slots_at_the_deadline() -> None:
+    """A batch that cannot get shared memory slots times out instead of blocking."""
+    pool = InferencePool(None, input_size=(8, 8), processes=1, slots=2)
+    pool.start()
+    try:
+        assert pool._ring is not None
+        held = pool._ring.acquire(2)
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            pool.run([np.zeros((8, 8, 3), dtype=np.uint8)], deadline=start + 0.2)
+        assert time.monotonic() - start < 1.0
+        pool._ring.release(held)
+        assert len(pool.run([np.zeros((8, 8, 3), dtype=np.uint8)])) == 1
+    finally:
+        pool.close()
+
+
+def test_pool_fails_only_the_batches_of_a_dead_process() -> None:
+    """Killing one process fails its batch; the other process's batch completes."""
+    pool = InferencePool(_slow_model, input_size=(8, 8), processes=2, slots=4)
+    pool.start()
+    outcomes: dict[int, object] = {}
+
+    def run(index: int) -> None:
+        try:
+            outcomes[index] = pool.run([np.zeros((8, 8, 3), dtype=np.uint8)])
+        except RuntimeError as e:
+            outcomes[index] = e
+
+    try:
+        first = threading.Thread(target=run, args=(0,))
+        first.start()
+        time.sleep(0.1)
+        second = threading.Thread(target=run, args=(1,))
+        second.start()
+        time.sleep(0.3)
+        pid = pool._workers[0].pid
+        assert pid is not None
+        os.kill(pid, signal.SIGKILL)
+        first.join(timeout=10)
+        second.join(timeout=10)
+        assert isinstance(outcomes[0], RuntimeError)
+        assert isinstance(outcomes[1], list)
+    finally:
+        pool.close()
@@ -0,0 +1,119 @@
+"""Tests for the model registry."""
+
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from {{ cookiecutter.python_package }}.registry import ModelRegistry
+from {{ cookiecutter.python_package }}.utils import save_state
+
+
+def _checkpoint(directory: pathlib.Path, value: float, prefix: str) -> pathlib.Path:
+    model = torch.nn.Linear(4, 2)
+    torch.nn.init.constant_(model.weight, value)
+    return save_state({"model": model.state_dict()}, directory, prefix=prefix)
+
+
+def _registry(**kwargs: object) -> ModelRegistry:
+    return ModelRegistry(lambda _: torch.nn.Linear(4, 2), **kwargs)  # type: ignore[arg-type]
+
+
+def test_registered_models_load_lazily(tmp_path: pathlib.Path) -> None:
+    """Registering does not load; the first get() does and later calls reuse it."""
+    registry = _registry()
+    registry.register("clf", "1", _checkpoint(tmp_path, 1.0, "v1"))
+
+    assert registry.resident() == []
+    model = registry.get("clf")
+    assert registry.get("clf") is model
+    assert not model.training
+    torch.testing.assert_close(model.weight, torch.ones(2, 4))
+
+
+def test_swap_keeps_old_model_usable(tmp_path: pathlib.Path) -> None:
+    """Swapping activates the new version while holders keep the old model."""
+    registry = _registry()
+    registry.register("clf", "1", _checkpoint(tmp_path, 1.0, "v1"))
+    old = registry.get("clf")
+
+    registry.swap("clf", "2", _checkpoint(tmp_path, 2.0, "v2"))
+
+    assert registry.active_version("clf") == "2"
+    torch.testing.assert_close(registry.get("clf").weight, torch.full((2, 4), 2.0))
+    torch.testing.assert_close(old.weight, torch.ones(2, 4))
+
+
+def test_swap_with_room_for_one_model_keeps_the_new_one(tmp_path: pathlib.Path) -> None:
+    """With max_models=1 the old version is evicted, not the one just swapped in."""
+    registry = _registry(max_models=1)
+    registry.register("clf", "1", _checkpoint(tmp_path, 1.0, "v1"))
+    registry.get("clf")
+
+    registry.swap("clf", "2", _checkpoint(tmp_path, 2.0, "v2"))
+
+    assert [(entry.name, entry.version) for entry in registry.resident()] == [("clf", "2")]
+
+
+def test_least_recently_used_inactive_models_are_evicted(tmp_path: pathlib.Path) -> None:
+    """The LRU inactive model is evicted once max_models is exceeded."""
+    registry = _registry(max_models=2)
+    for name in ("a", "b", "c"):
+        registry.register(name, "1", _checkpoint(tmp_path, 1.0, name))
+        registry.get(name)
+
+    # All are active for their own name, so none is evicted yet
+    assert len(registry.resident()) == 3
+    registry.swap("a", "2", _checkpoint(tmp_path, 2.0, "a2"))
+
+    assert ("a", "1") not in {(entry.name, entry.version) for entry in registry.resident()}
+
+
+def test_mmap_loading_matches_regular_loading(tmp_path: pathlib.Path) -> None:
+    """Memory-mapped weights are identical to regularly loaded ones."""
+    checkpoint = _checkpoint(tmp_path, 3.0, "v1")
+    mapped = _registry(mmap=True).load("clf", "1", checkpoint)
+    loaded = _registry(mmap=False).load("clf", "1", checkpoint)
+
+    torch.testing.assert_close(mapped.weight, loaded.weight)
+    torch.testing.assert_close(mapped(torch.ones(1, 4)), loaded(torch.ones(1, 4)))
+
+
+def test_channels_last_converts_conv_weights_once_on_load(tmp_path: pathlib.Path) -> None:
+    """Convolution weights are loaded in channels_last layout with unchanged values."""
+    conv = torch.nn.Conv2d(3, 4, 3)
+    checkpoint = save_state({"model": conv.state_dict()}, tmp_path, prefix="conv")
+    registry = ModelRegistry(lambda _: torch.nn.Conv2d(3, 4, 3), channels_last=True)
+
+    model = registry.load("conv", "1", checkpoint)
+
+    assert model.weight.is_contiguous(memory_format=torch.channels_last)
+    torch.testing.assert_close(model.weight, conv.weight)
+
+
+def test_concurrent_cold_gets_load_once(tmp_path: pathlib.Path) -> None:
+    """A burst of first requests shares one load instead of building a copy each."""
+    registry = _registry()
+    registry.register("clf", "1", _checkpoint(tmp_path, 1.0, "v1"))
+    builds = 0
+    release = threading.Event()
+    build = registry._build
+
+    def slow_build(name: str, checkpoint: pathlib.Path) -> torch.nn.Module:
+        nonlocal builds
+        builds += 1
+        release.wait(timeout=5)
+        return build(name, checkpoint)
+
+    registry._build = slow_build  # type: ignore[method-assign]
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(registry.get, "clf") for _ in range(8)]
+        # Let every get() arrive while the first build is still running
+        time.sleep(0.2)
+        release.set()
+        models = [future.result() for future in futures]
+
+    assert builds == 1
+    assert all(model is models[0] for model in models)
@@ -0,0 +1,77 @@
+"""Tests for per-worker thread and CPU planning."""
+
+import fcntl
+import pathlib
+
+import pytest
+
+from app.runtime import (
+    WORKERS_ENV,
+    claim_worker_slot,
+    plan_runtime,
+    release_worker_slots,
+    worker_count,
+)
+
+
+def test_plan_splits_cpus_across_workers() -> None:
+    """Each worker gets a disjoint share of the CPUs and matching thread count."""
+    cpus = list(range(32))
+
+    plans = [plan_runtime(4, cpus, slot=slot) for slot in range(4)]
+
+    assert [plan.threads for plan in plans] == [8, 8, 8, 8]
+    assert plans[1].cpus == list(range(8, 16))
+    assert sorted(cpu for plan in plans for cpu in plan.cpus) == cpus
+
+
+def test_plan_without_slot_keeps_fair_thread_share() -> None:
+    """A worker without a slot is not pinned but still avoids oversubscription."""
+    plan = plan_runtime(4, list(range(8)), slot=None, interop_threads=2)
+
+    assert plan.threads == 2
+    assert plan.cpus == list(range(8))
+    assert plan.interop_threads == 2
+
+
+def test_claim_worker_slot_hands_out_distinct_slots(tmp_path: pathlib.Path) -> None:
+    """Slots are exclusive until all are taken."""
+    claimed = [claim_worker_slot(2, tmp_path) for _ in range(3)]
+
+    assert claimed == [0, 1, None]
+
+
+def test_worker_count_defaults_to_a_single_process(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a multi-worker launcher the app gets the whole host."""
+    monkeypatch.delenv(WORKERS_ENV, raising=False)
+    assert worker_count() == 1
+
+    monkeypatch.setenv(WORKERS_ENV, "4")
+    assert worker_count() == 4
+
+
+def test_worker_count_falls_back_to_the_configured_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """``uvicorn --workers N`` sets no environment, so server.workers is assumed instead."""
+    monkeypatch.delenv(WORKERS_ENV, raising=False)
+    assert worker_count(default=3) == 3
+
+    monkeypatch.setenv(WORKERS_ENV, "4")
+    assert worker_count(default=3) == 4
+
+
+def test_last_worker_removes_the_lock_directory(tmp_path: pathlib.Path) -> None:
+    """Lock directories stay while another worker holds a slot and go with the last one."""
+    lock_dir = tmp_path / "slots"
+    claim_worker_slot(2, lock_dir)
+    other = (lock_dir / "1.lock").open("wb")
+    fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    release_worker_slots()
+    assert lock_dir.exists()
+
+    other.close()
+    claim_worker_slot(2, lock_dir)
+    release_worker_slots()
+    assert not lock_dir.exists()
@@ -0,0 +1,126 @@
+"""Tests for offline bulk scoring."""
+
+import json
+import pathlib
+
+import cv2
+import numpy as np
+import pytest
+
+from {{ cookiecutter.python_package }}.scoring import chunk_path, score_images, shard
+
+
+def _images(directory: pathlib.Path, count: int) -> pathlib.Path:
+    directory.mkdir()
+    for index in range(count):
+        cv2.imwrite(str(directory / f"{index:02d}.png"), np.full((8, 8, 3), index, np.uint8))
+    return directory
+
+
+def _rows(output_dir: pathlib.Path) -> list[dict]:
+    return [
+        json.loads(line)
+        for path in sorted(output_dir.glob("part-*.ndjson"))
+        for line in path.read_text().splitlines()
+    ]
+
+
+def test_shards_are_disjoint_and_complete() -> None:
+    """Sharding by index splits the input evenly with no overlap."""
+    paths = [pathlib.Path(f"{index}.png") for index in range(10)]
+    shards = [shard(paths, index, 3) for index in range(3)]
+
+    assert sorted(path for part in shards for path in part) == sorted(paths)
+    assert [len(part) for part in shards] == [4, 3, 3]
+
+
+def test_scoring_writes_chunks_and_resumes(tmp_path: pathlib.Path) -> None:
+    """Finished chunks are skipped on a rerun; only missing ones are scored again."""
+    source = _images(tmp_path / "raw", 5)
+    (source / "broken.png").write_bytes(b"not an image")
+    output = tmp_path / "out"
+
+    first = score_images(source, output, input_size=(8, 8), chunk_size=2)
+    chunk_path(output, 0, 1, "ndjson").unlink()
+    second = score_images(source, output, input_size=(8, 8), chunk_size=2)
+
+    assert (first.chunks, first.images, first.failed) == (3, 6, 1)
+    assert (second.chunks, second.skipped_chunks) == (1, 2)
+    rows = _rows(output)
+    assert len(rows) == 6
+    assert sum(row["error"] is not None for row in rows) == 1
+    with pytest.raises(ValueError, match="different job"):
+        score_images(source, output, input_size=(8, 8), chunk_size=3)
+
+
+def test_scoring_with_worker_processes(tmp_path: pathlib.Path) -> None:
+    """Worker processes produce the same rows as scoring in-process."""
+    source = _images(tmp_path / "raw", 4)
+
+    summary = score_images(
+        source, tmp_path / "out", input_size=(8, 8), chunk_size=1, workers=2, num_shards=2
+    )
+
+    assert (summary.chunks, summary.images) == (2, 2)
+    assert {row["path"] for row in _rows(tmp_path / "out")} == {
+        str(source / "00.png"),
+        str(source / "02.png"),
+    }
+
+
+def test_resuming_refuses_a_different_model_or_image_list(tmp_path: pathlib.Path) -> None:
+    """A changed checkpoint, precision or image list does not resume the job."""
+    torch = pytest.importorskip("torch")
+    from {{ cookiecutter.python_package }}.vision import build_model
+
+    source = _images(tmp_path / "raw", 4)
+    checkpoint = tmp_path / "model.pt"
+    torch.save(build_model("resnet18", num_classes=3).state_dict(), checkpoint)
+    output = tmp_path / "out"
+    options = {"checkpoint": checkpoint, "num_classes": 3, "input_size": (32, 32)}
+    score_images(source, output, **options)
+    job = json.loads((output / "job.json").read_text())
+
+    with pytest.raises(ValueError, match=r"\(precision changed\)"):
+        score_images(source, output, precision="bf16", **options)
+    (source / "00.png").rename(source / "04.png")
+    with pytest.raises(ValueError, match=r"\(images_sha256 changed\)"):
+        score_images(source, output, **options)
+    (source / "04.png").rename(source / "00.png")
+    torch.save(build_model("resnet18", num_classes=3).state_dict(), checkpoint)
+    with pytest.raises(ValueError, match=r"\(checkpoint_sha256 changed\)"):
+        score_images(source, output, **options)
+    assert job["checkpoint"] == str(checkpoint.resolve())
+    assert (job["precision"], job["input_size"]) == ("fp32", [32, 32])
+
+
+def test_in_process_scoring_does_not_reuse_the_previous_model(tmp_path: pathlib.Path) -> None:
+    """Scoring without a checkpoint after a run with one gives placeholder predictions."""
+    torch = pytest.importorskip("torch")
+    from {{ cookiecutter.python_package }}.vision import build_model
+
+    source = _images(tmp_path / "raw", 2)
+    checkpoint = tmp_path / "model.pt"
+    torch.save(build_model("resnet18", num_classes=3).state_dict(), checkpoint)
+    threads = torch.get_num_threads()
+    score_images(
+        source, tmp_path / "first", checkpoint=checkpoint, num_classes=3, input_size=(32, 32)
+    )
+    score_images(source, tmp_path / "second", input_size=(32, 32))
+
+    assert {row["prediction"] for row in _rows(tmp_path / "second")} == {"placeholder"}
+    assert torch.get_num_threads() == threads
+
+
+def test_resuming_refuses_a_reordered_manifest(tmp_path: pathlib.Path) -> None:
+    """Chunks are slices of the listing, so a reordered manifest is a different job."""
+    source = _images(tmp_path / "raw", 4)
+    manifest = tmp_path / "images.txt"
+    paths = sorted(str(path) for path in source.iterdir())
+    manifest.write_text("\n".join(paths) + "\n")
+    output = tmp_path / "out"
+    score_images(manifest, output, input_size=(8, 8), chunk_size=2)
+
+    manifest.write_text("\n".join(reversed(paths)) + "\n")
+    with pytest.raises(ValueError, match=r"\(images_sha256 changed\)"):
+        score_images(manifest, output, input_size=(8, 8), chunk_size=2)
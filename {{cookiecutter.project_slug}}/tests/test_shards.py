@@ -0,0 +1,59 @@
+"""Tests for packed image shards."""
+
+import pathlib
+
+import cv2
+import numpy as np
+
+from {{ cookiecutter.python_package }}.shards import ShardDataset, pack_images
+
+
+def test_pack_and_read_shards(tmp_path: pathlib.Path) -> None:
+    """Packed images decode identically by index and by sequential iteration."""
+    raw = tmp_path / "raw"
+    (raw / "cats").mkdir(parents=True)
+    images = []
+    for index in range(5):
+        image = np.full((8 + index, 12, 3), index * 40, dtype=np.uint8)
+        cv2.imwrite(str(raw / "cats" / f"{index}.png"), image)
+        images.append(image)
+
+    index_path = pack_images(raw, tmp_path / "shards", max_shard_images=2)
+    dataset = ShardDataset(index_path)
+
+    assert len(dataset) == 5
+    assert len(dataset.shards) == 3
+    assert dataset.name(3) == "cats/3.png"
+    np.testing.assert_array_equal(dataset[3], images[3])
+    np.testing.assert_array_equal(dataset[-1], images[4])
+    for decoded, expected in zip(dataset, images, strict=True):
+        np.testing.assert_array_equal(decoded, expected)
+    raw_bytes = ShardDataset(tmp_path / "shards", decode=bytes)[0]
+    assert raw_bytes == (raw / "cats" / "0.png").read_bytes()
+
+
+def test_pack_keeps_same_named_files_apart(tmp_path: pathlib.Path) -> None:
+    """Files with the same name in different directories stay distinct members."""
+    for index, folder in enumerate(["a", "b"]):
+        (tmp_path / folder).mkdir()
+        cv2.imwrite(str(tmp_path / folder / "0.png"), np.full((4, 4, 3), index, np.uint8))
+
+    dataset = ShardDataset(pack_images(str(tmp_path / "*" / "0.png"), tmp_path / "shards"))
+
+    assert [dataset.name(i) for i in range(len(dataset))] == ["a/0.png", "b/0.png"]
+    assert dataset[1][0, 0, 0] == 1
+
+
+def test_close_leaves_views_held_by_samples_readable(tmp_path: pathlib.Path) -> None:
+    """Closing while a sample still views a shard unmaps the others and does not raise."""
+    for index in range(2):
+        cv2.imwrite(str(tmp_path / f"{index}.png"), np.full((4, 4, 3), index, np.uint8))
+    index_path = pack_images(str(tmp_path / "*.png"), tmp_path / "shards", max_shard_images=1)
+    dataset = ShardDataset(index_path, decode=lambda view: view)
+    held = dataset[0]
+    unheld = dataset._map(1)
+
+    dataset.close()
+
+    assert unheld.closed
+    assert bytes(held) == (tmp_path / "0.png").read_bytes()
@@ -0,0 +1,37 @@
+"""Tests for streaming frame buffering."""
+
+import asyncio
+
+from app.streaming import LatestFrames
+
+
+def test_full_buffer_drops_the_oldest_frames() -> None:
+    """When inference falls behind only the newest frames are kept."""
+
+    async def run() -> tuple[list[int], int]:
+        frames: LatestFrames[int] = LatestFrames(capacity=2)
+        for frame in range(5):
+            frames.put(frame)
+        return await frames.take(), frames.dropped
+
+    assert asyncio.run(run()) == ([3, 4], 3)
+
+
+def test_take_waits_for_frames_and_ends_when_closed() -> None:
+    """take() blocks until a frame arrives and returns nothing once closed and drained."""
+
+    async def run() -> list[list[int]]:
+        frames: LatestFrames[int] = LatestFrames()
+
+        async def produce() -> None:
+            await asyncio.sleep(0.01)
+            frames.put(1)
+            await asyncio.sleep(0.01)
+            frames.close()
+
+        producer = asyncio.create_task(produce())
+        taken = [await frames.take(), await frames.take()]
+        await producer
+        return taken
+
+    assert asyncio.run(run()) == [[1], []]
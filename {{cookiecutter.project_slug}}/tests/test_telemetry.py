@@ -0,0 +1,28 @@
+"""Tests for request timing and Prometheus histograms."""
+
+from app.telemetry import Histogram, RequestTimings
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    """Bucket counts are cumulative and end with +Inf, sum and count."""
+    histogram = Histogram("latency_seconds", "Latency", "stage", buckets=[0.1, 1.0])
+    for seconds in (0.05, 0.5, 5.0):
+        histogram.observe("decode", seconds)
+
+    lines = histogram.render().splitlines()
+
+    assert 'latency_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="decode",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="decode"} 5.55' in lines
+    assert histogram.count("decode") == 3
+
+
+def test_request_timings_accumulate_stages() -> None:
+    """Repeated stages add up and appear in the summary."""
+    timings = RequestTimings()
+    timings.add("decode", 0.002)
+    timings.update({"decode": 0.001, "inference": 0.04})
+
+    assert timings.stages["decode"] == 0.003
+    assert timings.summary() == "decode=3.0ms inference=40.0ms"
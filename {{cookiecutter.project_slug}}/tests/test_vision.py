@@ -0,0 +1,259 @@
+"""Tests for the vision preprocessing and prediction helpers."""
+
+import pathlib
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from {{ cookiecutter.python_package }}.vision import (
+    ContentCache,
+    ImageTooLargeError,
+    check_image_size,
+    content_key,
+    iter_tiles,
+    load_image_from_bytes,
+    merge_tiles,
+    predict_batch,
+    predict_bytes,
+    predict_tiled,
+    preprocess_batch,
+    preprocess_bytes,
+    preprocess_image,
+)
+
+
+def _image(height: int = 48, width: int = 64) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+def test_preprocess_batch_matches_preprocess_image() -> None:
+    """Batched preprocessing gives the same result as per-image preprocessing."""
+    images = [_image(), _image(32, 32)]
+    batch = preprocess_batch(images, size=(24, 40))
+
+    assert batch.shape == (2, 3, 24, 40)
+    for index, image in enumerate(images):
+        torch.testing.assert_close(batch[index : index + 1], preprocess_image(image, (24, 40)))
+
+
+def test_preprocess_batch_normalization_and_channels_last() -> None:
+    """Mean/std normalization is applied and channels_last layout is honoured."""
+    image = np.full((16, 16, 3), 255, dtype=np.uint8)
+    batch = preprocess_batch(
+        np.stack([image, image]),
+        size=(16, 16),
+        mean=(0.5, 0.5, 0.5),
+        std=(0.25, 0.25, 0.25),
+        channels_last=True,
+    )
+
+    assert batch.is_contiguous(memory_format=torch.channels_last)
+    torch.testing.assert_close(batch, torch.full((2, 3, 16, 16), 2.0))
+
+
+@pytest.mark.parametrize("channels_last", [False, True])
+def test_preprocess_batch_reduced_precision(channels_last: bool) -> None:
+    """bfloat16 batches match the float32 batch to bfloat16 precision."""
+    images = [_image(), _image(32, 32)]
+    expected = preprocess_batch(images, size=(24, 40))
+
+    batch = preprocess_batch(
+        images, size=(24, 40), dtype=torch.bfloat16, channels_last=channels_last
+    )
+
+    assert batch.dtype == torch.bfloat16
+    assert batch.is_contiguous(
+        memory_format=torch.channels_last if channels_last else torch.contiguous_format
+    )
+    torch.testing.assert_close(batch.float(), expected, atol=1e-2, rtol=1e-2)
+
+
+def test_preprocess_batch_rejects_mismatched_out() -> None:
+    """A preallocated buffer of the wrong shape is rejected."""
+    with pytest.raises(ValueError):
+        preprocess_batch([_image()], size=(8, 8), out=torch.empty(2, 3, 8, 8))
+
+
+def test_predict_batch_returns_one_result_per_image() -> None:
+    """Each input image gets its own prediction."""
+    results = predict_batch([_image(), _image(20, 30)])
+
+    assert len(results) == 2
+    assert results[1]["image_shape"] == (20, 30, 3)
+    assert results[1]["processed_shape"] == [1, 3, 224, 224]
+
+
+def test_load_image_from_bytes_round_trip() -> None:
+    """Encoded bytes decode to the original RGB image."""
+    image = _image()
+    ok, encoded = cv2.imencode(".png", cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    assert ok
+
+    np.testing.assert_array_equal(load_image_from_bytes(encoded.tobytes()), image)
+    assert predict_bytes(encoded.tobytes())["image_shape"] == image.shape
+
+
+def test_load_image_from_bytes_rejects_garbage() -> None:
+    """Undecodable data raises ValueError."""
+    with pytest.raises(ValueError):
+        load_image_from_bytes(b"not an image")
+
+
+def test_content_cache_evicts_least_recently_used() -> None:
+    """The in-memory tier stays within its byte budget, dropping the oldest entry."""
+    cache = ContentCache(max_bytes=3 * 400)
+    for key in "abc":
+        cache.put(key, torch.zeros(100))
+    cache.get("a")
+    cache.put("d", torch.zeros(100))
+
+    assert cache.nbytes == 3 * 400
+    assert "b" not in cache
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_preprocess_bytes_uses_disk_tier(tmp_path: pathlib.Path) -> None:
+    """Preprocessed tensors are cached by content and reloaded from disk."""
+    ok, encoded = cv2.imencode(".png", _image())
+    assert ok
+    data = encoded.tobytes()
+    cache = ContentCache(directory=tmp_path)
+
+    first = preprocess_bytes(data, size=(16, 16), cache=cache)
+    assert preprocess_bytes(data, size=(16, 16), cache=cache) is first
+    assert content_key(data, "a") != content_key(data, "b")
+
+    cache.clear()
+    reloaded = preprocess_bytes(data, size=(16, 16), cache=cache)
+    torch.testing.assert_close(reloaded, first)
+    assert cache.hits == 2
+
+
+def test_content_cache_keeps_bfloat16_tensors_in_memory(tmp_path: pathlib.Path) -> None:
+    """Tensors numpy cannot hold skip the disk tier instead of failing the write."""
+    cache = ContentCache(directory=tmp_path)
+    value = torch.ones(2, 3, dtype=torch.bfloat16)
+
+    cache.put("a", value)
+
+    assert cache.get("a") is value
+    assert not list(tmp_path.rglob("*.npy"))
+
+
+def _photo(height: int, width: int) -> np.ndarray:
+    y, x = np.mgrid[0:height, 0:width]
+    return np.stack([x * 255 // width, y * 255 // height, (x + y) % 256], axis=-1).astype(np.uint8)
+
+
+def test_reduced_jpeg_decode_matches_full_decode() -> None:
+    """Large JPEGs decode straight to the target size, close to a full decode and resize."""
+    photo = _photo(1200, 1600)
+    ok, encoded = cv2.imencode(".jpg", cv2.cvtColor(photo, cv2.COLOR_RGB2BGR))
+    assert ok
+
+    reduced = load_image_from_bytes(encoded.tobytes(), size=(224, 224))
+    full = cv2.resize(
+        load_image_from_bytes(encoded.tobytes()), (224, 224), interpolation=cv2.INTER_AREA
+    )
+
+    assert reduced.shape == (224, 224, 3)
+    assert np.abs(reduced.astype(int) - full.astype(int)).mean() < 3
+
+
+def test_reduced_jpeg_decode_rejects_decompression_bombs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """JPEGs with more pixels than PIL opens fail as too large, not as an unexpected error."""
+    ok, encoded = cv2.imencode(".jpg", _photo(120, 160))
+    assert ok
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    with pytest.raises(ImageTooLargeError):
+        load_image_from_bytes(encoded.tobytes(), size=(32, 32))
+
+
+def test_sized_decode_leaves_small_images_unchanged() -> None:
+    """Images not larger than the target keep their size; others are resized exactly."""
+    ok, encoded = cv2.imencode(".png", _image(48, 64))
+    assert ok
+    ok, large = cv2.imencode(".png", _photo(300, 400))
+    assert ok
+
+    assert load_image_from_bytes(encoded.tobytes(), size=(100, 32)).shape == (48, 64, 3)
+    assert load_image_from_bytes(large.tobytes(), size=(30, 40)).shape == (30, 40, 3)
+
+
+def test_tiles_are_overlapping_views_covering_the_image() -> None:
+    """Tiles share memory with the image, overlap, and reach every edge."""
+    image = np.zeros((100, 130, 3), dtype=np.uint8)
+
+    tiles = list(iter_tiles(image, tile=(40, 40), overlap=0.25))
+
+    assert all(np.shares_memory(view, image) for _, view in tiles)
+    assert {view.shape for _, view in tiles} == {(40, 40, 3)}
+    assert sorted({y for (y, _, _, _), _ in tiles}) == [0, 30, 60]
+    assert sorted({x for (_, x, _, _), _ in tiles}) == [0, 30, 60, 90]
+
+
+def test_predict_tiled_aggregates_tile_probabilities() -> None:
+    """A bright patch in one tile decides the image under max but not mean aggregation."""
+    model = torch.nn.Sequential(
+        torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 2)
+    ).eval()
+    with torch.no_grad():
+        model[2].weight.copy_(torch.tensor([[0.0, 0.0, 0.0], [10.0, 10.0, 10.0]]))
+        model[2].bias.copy_(torch.tensor([5.0, 0.0]))
+    image = np.zeros((64, 256, 3), dtype=np.uint8)
+    image[:, 192:] = 255
+
+    options = {"tile": (64, 64), "overlap": 0.0, "size": (8, 8), "model": model}
+    mean = predict_tiled(image, batch_size=3, **options)
+    peak = predict_tiled(image, aggregate="max", **options)
+
+    assert [tile["prediction"] for tile in mean["tiles"]] == [0, 0, 0, 1]
+    assert mean["tiles"][3]["box"] == [0, 192, 64, 64]
+    assert mean["prediction"] == 0
+    assert peak["prediction"] == 1
+    assert mean["processed_shape"] == [4, 3, 8, 8]
+
+
+def test_merge_tiles_matches_predict_tiled() -> None:
+    """Tiles predicted one batch at a time merge into the same prediction."""
+    model = torch.nn.Sequential(
+        torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 4)
+    ).eval()
+    image = _image(96, 160)
+    tiles = list(iter_tiles(image, tile=(48, 48), overlap=0.25))
+    predictions = [predict_batch([view], (8, 8), model, probabilities=True)[0] for _, view in tiles]
+
+    for aggregate in ("mean", "max"):
+        merged = merge_tiles(
+            image.shape,
+            [(box, p) for (box, _), p in zip(tiles, predictions, strict=True)],
+            aggregate,
+        )
+        direct = predict_tiled(
+            image, tile=(48, 48), overlap=0.25, size=(8, 8), model=model, aggregate=aggregate
+        )
+        assert merged["prediction"] == direct["prediction"]
+        assert merged["confidence"] == pytest.approx(direct["confidence"])
+        assert [(t["box"], t["prediction"]) for t in merged["tiles"]] == [
+            (t["box"], t["prediction"]) for t in direct["tiles"]
+        ]
+        assert merged["processed_shape"] == direct["processed_shape"]
+
+
+def test_check_image_size_reads_the_header() -> None:
+    """Image sizes are checked from the header, before anything is decoded."""
+    ok, encoded = cv2.imencode(".png", _image(40, 60))
+    assert ok
+
+    assert check_image_size(encoded.tobytes(), max_pixels=2400) == (40, 60)
+    with pytest.raises(ImageTooLargeError):
+        check_image_size(encoded.tobytes(), max_pixels=2399)
+    with pytest.raises(ValueError):
+        check_image_size(b"not an image", max_pixels=2400)
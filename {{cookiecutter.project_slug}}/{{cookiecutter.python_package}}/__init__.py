@@ -1,10 +1,38 @@
 """{{ cookiecutter.project_description }}."""
 
-from importlib import metadata as _metadata
+import importlib
+from typing import Any
 
-__all__ = ["__version__"]
+__all__ = [
+    "__version__",
+    "backends",
+    "data",
+    "registry",
+    "scoring",
+    "shards",
+    "utils",
+    "vision",
+]
 
-try:
-    __version__ = _metadata.version("{{ cookiecutter.project_slug }}")
-except _metadata.PackageNotFoundError:  # pragma: no cover - during local dev
-    __version__ = "0.0.0"
+# Submodules are imported on first attribute access (PEP 562), so importing the
+# package stays cheap and torch is only loaded by the modules that need it
+_SUBMODULES = {"backends", "data", "registry", "scoring", "shards", "utils", "vision"}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from importlib import metadata
+
+        try:
+            version = metadata.version("{{ cookiecutter.project_slug }}")
+        except metadata.PackageNotFoundError:  # pragma: no cover - during local dev
+            version = "0.0.0"
+        globals()["__version__"] = version
+        return version
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
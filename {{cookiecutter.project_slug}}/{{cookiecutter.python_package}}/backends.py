@@ -0,0 +1,281 @@
+"""Optimized CPU inference backends with an accuracy check against eager PyTorch."""
+
+from __future__ import annotations
+
+import copy
+import pathlib
+import tempfile
+from dataclasses import dataclass
+from typing import Literal
+
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+Backend = Literal["eager", "compile", "int8", "torchscript", "onnx"]
+BACKENDS: tuple[Backend, ...] = ("eager", "compile", "int8", "torchscript", "onnx")
+Precision = Literal["fp32", "bf16", "fp16"]
+PRECISIONS: dict[Precision, torch.dtype] = {
+    "fp32": torch.float32,
+    "bf16": torch.bfloat16,
+    "fp16": torch.float16,
+}
+
+# Output drift each mode is expected to stay within, relative to the largest reference output
+PARITY_RTOL: dict[str, float] = {"int8": 5e-2, "bf16": 2e-2, "fp16": 5e-3}
+DEFAULT_PARITY_RTOL = 1e-3
+
+
+@dataclass
+class ParityReport:
+    """How closely an optimized model reproduces the eager model's outputs."""
+
+    max_abs_diff: float
+    top1_agreement: float
+    passed: bool
+
+
+class OnnxModule(torch.nn.Module):
+    """Run an exported ONNX model with onnxruntime behind the ``nn.Module`` interface.
+
+    Args:
+        path: Path to the ``.onnx`` file.
+        num_threads: Intra-op threads for the runtime. Defaults to its own choice.
+    """
+
+    def __init__(self, path: pathlib.Path, num_threads: int | None = None) -> None:
+        super().__init__()
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("The onnx backend needs onnxruntime: install the 'onnx' extra") from e
+        options = onnxruntime.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        array = inputs.detach().cpu().contiguous().numpy()
+        (outputs,) = self.session.run(None, {self.input_name: array})
+        return torch.from_numpy(outputs)
+
+
+class AutocastModule(torch.nn.Module):
+    """Run a model in reduced precision under CPU autocast, on channels_last inputs.
+
+    Weights stay in float32; autocast runs matmuls and convolutions in
+    ``dtype``, which uses the bfloat16/float16 units of recent CPUs (AVX512-BF16,
+    AMX) and halves the bandwidth of activations. ``input_dtype`` and
+    ``channels_last`` tell :func:`~{{ cookiecutter.python_package }}.vision.predict_batch`
+    to preprocess straight into that format; float32 inputs work too.
+
+    The wrapped model is not modified. Convolutions are fastest when their
+    weights are channels_last as well, which ``ModelRegistry(channels_last=True)``
+    converts once when loading the model.
+
+    Args:
+        model: Model in eval mode.
+        dtype: ``torch.bfloat16`` or ``torch.float16``.
+    """
+
+    channels_last = True
+
+    def __init__(self, model: torch.nn.Module, dtype: torch.dtype) -> None:
+        super().__init__()
+        self.model = model
+        self.input_dtype = dtype
+
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        inputs = inputs.contiguous(memory_format=torch.channels_last)
+        with torch.autocast(inputs.device.type, dtype=self.input_dtype):
+            return self.model(inputs).float()
+
+
+def apply_precision(model: torch.nn.Module, precision: Precision = "fp32") -> torch.nn.Module:
+    """Wrap a model to run in ``precision``; ``"fp32"`` returns it unchanged.
+
+    Check the result against the float32 model with :func:`check_parity`
+    before serving it.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {tuple(PRECISIONS)}")
+    model = model.eval()
+    if precision == "fp32":
+        return model
+    return AutocastModule(model, PRECISIONS[precision])
+
+
+def quantize_static(model: torch.nn.Module, calibration: torch.Tensor) -> torch.nn.Module:
+    """Statically quantize a copy of ``model`` to int8 after calibrating it.
+
+    Uses FX graph mode: convolutions are fused with the batch norms and ReLUs
+    that follow them, observers record activation ranges while
+    ``calibration`` runs through the model, and convolutions and ``Linear``
+    layers are then converted to int8 kernels for the current
+    ``torch.backends.quantized.engine`` (x86/fbgemm on Intel and AMD CPUs).
+
+    Args:
+        model: Float32 model in eval mode. It must be symbolically traceable,
+            i.e. free of data-dependent control flow.
+        calibration: Input batch representative of real traffic. Activation
+            ranges are fixed from it, so noise makes a poorly calibrated model.
+
+    Returns:
+        Quantized module taking and returning float32 tensors.
+    """
+    qconfig = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    prepared = prepare_fx(copy.deepcopy(model).eval(), qconfig, (calibration,))
+    with torch.no_grad():
+        prepared(calibration)
+    return convert_fx(prepared)
+
+
+def optimize_model(
+    model: torch.nn.Module,
+    backend: Backend = "eager",
+    example: torch.Tensor | None = None,
+    export_path: pathlib.Path | None = None,
+) -> torch.nn.Module:
+    """Wrap a model in an optimized inference backend.
+
+    - ``"eager"``: the model itself in eval mode.
+    - ``"compile"``: ``torch.compile``; compiles on the first call, so warm up
+      before serving.
+    - ``"int8"``: static int8 quantization of convolutions and ``Linear``
+      layers, calibrated on ``example``, see :func:`quantize_static`.
+    - ``"torchscript"``: traced, frozen and optimized for inference.
+    - ``"onnx"``: exported to ONNX and run with onnxruntime (``onnx`` extra).
+
+    Args:
+        model: Model with weights loaded. Backends other than ``eager`` and
+            ``compile`` return a new module and leave ``model`` untouched.
+        backend: Backend to use, one of :data:`BACKENDS`.
+        example: Example input batch, required for ``int8`` (which calibrates
+            on it), ``torchscript`` and ``onnx``.
+        export_path: Where to keep the exported ONNX file. Defaults to a
+            temporary file deleted once the runtime has loaded it.
+
+    Returns:
+        Module in eval mode that maps an input batch to the model's outputs.
+    """
+    model = model.eval()
+    if backend == "eager":
+        return model
+    if backend == "compile":
+        return torch.compile(model)  # type: ignore[return-value]
+    if example is None:
+        raise ValueError(f"The {backend} backend needs an example input")
+    if backend == "int8":
+        return quantize_static(model, example)
+    if backend == "torchscript":
+        with torch.no_grad():
+            traced = torch.jit.trace(model, example)
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    if backend == "onnx":
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_path or pathlib.Path(tmp) / "model.onnx"
+            torch.onnx.export(
+                model,
+                (example,),
+                str(path),
+                input_names=["input"],
+                output_names=["output"],
+                dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+            )
+            return OnnxModule(path)
+    raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
+
+def parity_rtol(backend: Backend = "eager", precision: Precision = "fp32") -> float:
+    """Default :func:`check_parity` tolerance for a backend running in ``precision``."""
+    return max(
+        PARITY_RTOL.get(backend, DEFAULT_PARITY_RTOL),
+        PARITY_RTOL.get(precision, DEFAULT_PARITY_RTOL),
+    )
+
+
+def check_parity(
+    reference: torch.nn.Module,
+    candidate: torch.nn.Module,
+    inputs: torch.Tensor,
+    rtol: float = DEFAULT_PARITY_RTOL,
+    atol: float = 1e-5,
+    min_top1_agreement: float = 0.99,
+) -> ParityReport:
+    """Compare an optimized model against the eager reference on the same inputs.
+
+    A candidate passes only if both hold: every output is within
+    ``atol + rtol * max(|reference outputs|)`` of the reference, and its top-1
+    predictions agree on at least ``min_top1_agreement`` of the inputs.
+    Quantized and reduced-precision models need a looser ``rtol``, see
+    :func:`parity_rtol`. Top-1 agreement only means something on real
+    images; on noise most predictions are near ties.
+
+    Args:
+        reference: Eager model.
+        candidate: Optimized model, e.g. from :func:`optimize_model`.
+        inputs: Input batch (N, C, H, W), ideally real validation images.
+        rtol: Allowed difference relative to the largest reference output.
+        atol: Allowed absolute difference on top of ``rtol``.
+        min_top1_agreement: Minimum fraction of matching top-1 predictions.
+
+    Returns:
+        Parity measurements and whether the candidate passed.
+    """
+    with torch.inference_mode():
+        expected = reference(inputs).float().cpu()
+        actual = candidate(inputs).float().cpu()
+    max_abs_diff = (expected - actual).abs().max().item()
+    agreement = (expected.argmax(dim=-1) == actual.argmax(dim=-1)).float().mean().item()
+    within = max_abs_diff <= atol + rtol * expected.abs().max().item()
+    passed = within and agreement >= min_top1_agreement
+    return ParityReport(max_abs_diff, agreement, passed)
+
+
+def prepare_inference_model(
+    model: torch.nn.Module,
+    backend: Backend = "eager",
+    precision: Precision = "fp32",
+    example: torch.Tensor | None = None,
+    parity_check: bool = True,
+    rtol: float | None = None,
+) -> torch.nn.Module:
+    """Run a float32 model in ``precision`` on ``backend``, checked against the original.
+
+    Args:
+        model: Eager float32 model with weights loaded.
+        backend: Backend to use, one of :data:`BACKENDS`.
+        precision: Precision to run in, one of :data:`PRECISIONS`.
+        example: Input batch, ideally real images, that the backend is traced
+            or calibrated with and the parity check runs on. Required unless the model runs
+            unchanged (eager, fp32).
+        parity_check: Check the result with :func:`check_parity`.
+        rtol: Parity tolerance. Defaults to :func:`parity_rtol`.
+
+    Returns:
+        Module in eval mode that maps an input batch to the model's outputs.
+
+    Raises:
+        ValueError: If the model is changed and no ``example`` is given, or
+            ``int8`` is combined with a reduced precision.
+        RuntimeError: If the result fails the parity check.
+    """
+    if backend == "eager" and precision == "fp32":
+        return model.eval()
+    if example is None:
+        raise ValueError(f"The {backend} backend in {precision} needs an example input")
+    if backend == "int8" and precision != "fp32":
+        raise ValueError(f"The int8 backend quantizes float32 models, not {precision}")
+    optimized = optimize_model(apply_precision(model, precision), backend, example=example)
+    if parity_check:
+        report = check_parity(
+            model, optimized, example, rtol=rtol or parity_rtol(backend, precision)
+        )
+        if not report.passed:
+            raise RuntimeError(
+                f"{backend} backend in {precision} failed the parity check: {report}"
+            )
+    return optimized
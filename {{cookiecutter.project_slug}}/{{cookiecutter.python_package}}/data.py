@@ -0,0 +1,152 @@
+"""Streaming image datasets with parallel decoding."""
+
+from __future__ import annotations
+
+import csv
+import glob
+import os
+import pathlib
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import torch
+
+from {{ cookiecutter.python_package }}.vision import load_image, preprocess_batch
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def list_images(source: str | pathlib.Path | Sequence[str | pathlib.Path]) -> list[pathlib.Path]:
+    """Resolve an image source to a list of file paths.
+
+    Args:
+        source: One of
+            - a directory, searched recursively for image files,
+            - a glob pattern such as ``"data/raw/**/*.jpg"``,
+            - a manifest file: ``.txt`` with one path per line, or ``.csv`` with a
+              ``path`` column (relative paths resolve against the manifest's directory),
+            - an explicit sequence of paths.
+
+    Returns:
+        Image paths in a deterministic order.
+    """
+    if not isinstance(source, str | pathlib.Path):
+        return [pathlib.Path(path) for path in source]
+
+    path = pathlib.Path(source)
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if path.is_file() and path.suffix.lower() in {".txt", ".csv"}:
+        if path.suffix.lower() == ".csv":
+            with path.open(newline="") as f:
+                entries = [row["path"] for row in csv.DictReader(f)]
+        else:
+            entries = [line.strip() for line in path.read_text().splitlines()]
+        return [path.parent / entry for entry in entries if entry and not entry.startswith("#")]
+    return sorted(pathlib.Path(p) for p in glob.glob(str(source), recursive=True))
+
+
+@dataclass
+class ImageBatch:
+    """A preprocessed batch and the files it came from."""
+
+    images: torch.Tensor
+    paths: list[pathlib.Path]
+    failed: list[pathlib.Path] = field(default_factory=list)
+
+
+class ImageStream(torch.utils.data.IterableDataset):
+    """Iterate over preprocessed image batches decoded in parallel.
+
+    Batches are decoded by a thread pool (OpenCV releases the GIL) while the
+    consumer works on earlier ones. At most ``prefetch`` batches are in flight,
+    so memory stays bounded no matter how many images the source lists.
+    Images that fail to decode are reported in :attr:`ImageBatch.failed`
+    instead of stopping the stream, so a batch may hold fewer than
+    ``batch_size`` images.
+
+    When used inside a ``torch.utils.data.DataLoader`` with workers (and
+    ``batch_size=None``), each loader worker streams its own slice of the files.
+
+    Args:
+        source: Directory, glob pattern, manifest file or list of paths, see
+            :func:`list_images`.
+        batch_size: Number of images per batch.
+        size: Target size (height, width).
+        num_workers: Decode threads. Defaults to the number of CPUs.
+        prefetch: Maximum number of batches decoded ahead. Defaults to
+            twice ``num_workers``.
+        pin_memory: Pin batches in page-locked memory for fast GPU transfer.
+        mean: Optional per-channel normalization mean, see ``preprocess_batch``.
+        std: Optional per-channel normalization std.
+        channels_last: Produce batches in ``torch.channels_last`` memory format.
+    """
+
+    def __init__(
+        self,
+        source: str | pathlib.Path | Sequence[str | pathlib.Path],
+        batch_size: int = 32,
+        size: tuple[int, int] = (224, 224),
+        num_workers: int | None = None,
+        prefetch: int | None = None,
+        pin_memory: bool = False,
+        mean: Sequence[float] | None = None,
+        std: Sequence[float] | None = None,
+        channels_last: bool = False,
+    ) -> None:
+        super().__init__()
+        self.paths = list_images(source)
+        self.batch_size = batch_size
+        self.size = size
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.prefetch = prefetch or 2 * self.num_workers
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self.mean = mean
+        self.std = std
+        self.channels_last = channels_last
+
+    def __len__(self) -> int:
+        return -(-len(self.paths) // self.batch_size)
+
+    def __iter__(self) -> Iterator[ImageBatch]:
+        paths = self.paths
+        worker = torch.utils.data.get_worker_info()
+        if worker is not None:
+            paths = paths[worker.id :: worker.num_workers]
+        chunks = (
+            paths[start : start + self.batch_size]
+            for start in range(0, len(paths), self.batch_size)
+        )
+
+        with ThreadPoolExecutor(self.num_workers, thread_name_prefix="decode") as pool:
+            pending: deque[Future[ImageBatch]] = deque()
+            try:
+                for chunk in chunks:
+                    pending.append(pool.submit(self._load_batch, chunk))
+                    if len(pending) >= self.prefetch:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # Consumer stopped early: drop work that has not started
+                for future in pending:
+                    future.cancel()
+
+    def _load_batch(self, paths: list[pathlib.Path]) -> ImageBatch:
+        images, loaded, failed = [], [], []
+        for path in paths:
+            try:
+                images.append(load_image(path, self.size))
+                loaded.append(path)
+            except ValueError:
+                failed.append(path)
+        if not images:
+            return ImageBatch(torch.empty(0, 3, *self.size), [], failed)
+        tensor = preprocess_batch(
+            images, self.size, mean=self.mean, std=self.std, channels_last=self.channels_last
+        )
+        if self.pin_memory:
+            tensor = tensor.pin_memory()
+        return ImageBatch(tensor, loaded, failed)
@@ -0,0 +1,241 @@
+"""Model registry keeping warm, preloaded models in memory.
+
+torch is imported when the first model is loaded, so creating a registry
+(e.g. while the API is imported) does not pay for it.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import pathlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import torch
+
+ModelKey = tuple[str, str]
+
+
+@dataclass
+class ModelEntry:
+    """A resident model and its bookkeeping."""
+
+    name: str
+    version: str
+    model: torch.nn.Module
+    nbytes: int
+    checkpoint: pathlib.Path | None = None
+
+
+def model_nbytes(model: torch.nn.Module) -> int:
+    """Return the memory held by a model's parameters and buffers in bytes."""
+    tensors = [*model.parameters(), *model.buffers()]
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class ModelRegistry:
+    """LRU cache of loaded models keyed by ``(name, version)``.
+
+    Each name has an *active* version that :meth:`get` returns by default.
+    Checkpoints registered with :meth:`register` are loaded lazily on first
+    use; :meth:`load` loads eagerly (e.g. at startup). When more than
+    ``max_models`` models are resident, or their parameters exceed
+    ``max_bytes``, the least recently used inactive models are evicted.
+
+    :meth:`swap` loads a new checkpoint completely before making it active, so
+    requests already holding the old model finish with it and new requests
+    see the new one; nothing is dropped. Concurrent first requests for a model
+    that is not resident wait for a single load instead of each building a copy.
+
+    Args:
+        factory: Builds an uninitialized model for a name. The checkpoint's
+            state dict is loaded into it.
+        max_models: Maximum number of resident models.
+        max_bytes: Optional memory budget for resident models in bytes.
+        device: Device to place loaded models on.
+        mmap: Memory-map checkpoints and use the mapped tensors as the CPU
+            model's weights, so worker processes serving the same checkpoint
+            share one copy through the OS page cache.
+        prepare: Optional function applied to each loaded model before it is
+            served, e.g. ``backends.optimize_model``.
+        channels_last: Convert convolution weights to ``torch.channels_last``
+            once when loading, for reduced-precision models (see
+            ``backends.AutocastModule``). Converted weights are copies, so with
+            ``mmap`` they move from the shared page cache into each process's
+            private memory (about 95 MB for ResNet-50).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], torch.nn.Module],
+        max_models: int = 2,
+        max_bytes: int | None = None,
+        device: str | torch.device = "cpu",
+        mmap: bool = True,
+        prepare: Callable[[torch.nn.Module], torch.nn.Module] | None = None,
+        channels_last: bool = False,
+    ) -> None:
+        if max_models < 1:
+            raise ValueError("max_models must be at least 1")
+        self.factory = factory
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.device = device
+        self.mmap = mmap
+        self.prepare = prepare
+        self.channels_last = channels_last
+        self._entries: OrderedDict[ModelKey, ModelEntry] = OrderedDict()
+        self._checkpoints: dict[ModelKey, pathlib.Path] = {}
+        self._active: dict[str, str] = {}
+        self._loading: dict[ModelKey, concurrent.futures.Future[torch.nn.Module]] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, version: str, checkpoint: pathlib.Path) -> None:
+        """Record where a model version can be loaded from, without loading it.
+
+        The first version registered for a name becomes its active version.
+        """
+        with self._lock:
+            self._checkpoints[(name, version)] = pathlib.Path(checkpoint)
+            self._active.setdefault(name, version)
+
+    def active_version(self, name: str) -> str:
+        """Return the active version for a model name."""
+        with self._lock:
+            if name not in self._active:
+                raise KeyError(f"No model registered under {name!r}")
+            return self._active[name]
+
+    def load(
+        self, name: str, version: str, checkpoint: pathlib.Path | None = None
+    ) -> torch.nn.Module:
+        """Load a model version into memory and return it.
+
+        Args:
+            name: Model name.
+            version: Model version.
+            checkpoint: Checkpoint to load. Defaults to the registered path.
+
+        Returns:
+            The loaded model in eval mode.
+        """
+        key = (name, version)
+        with self._lock:
+            if key in self._entries and checkpoint is None:
+                self._entries.move_to_end(key)
+                return self._entries[key].model
+            pending = self._loading.get(key) if checkpoint is None else None
+            if pending is None:
+                if checkpoint is None:
+                    if key not in self._checkpoints:
+                        raise KeyError(f"No checkpoint registered for {name}:{version}")
+                    checkpoint = self._checkpoints[key]
+                future: concurrent.futures.Future[torch.nn.Module] = concurrent.futures.Future()
+                self._loading[key] = future
+        if pending is not None:
+            # Another caller is already loading this version; share its model
+            return pending.result()
+
+        try:
+            # Build and load outside the lock so serving other models is not blocked
+            assert checkpoint is not None
+            checkpoint = pathlib.Path(checkpoint)
+            model = self._build(name, checkpoint)
+            if self.prepare is not None:
+                model = self.prepare(model)
+            entry = ModelEntry(name, version, model, model_nbytes(model), checkpoint)
+            with self._lock:
+                self._checkpoints[key] = checkpoint
+                self._active.setdefault(name, version)
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                # Keep the new model even if inactive, e.g. for swap() to activate
+                self._evict(keep=key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+        future.set_result(model)
+        return model
+
+    def get(self, name: str, version: str | None = None) -> torch.nn.Module:
+        """Return a model, loading it if it is not resident.
+
+        Args:
+            name: Model name.
+            version: Model version. Defaults to the active version.
+        """
+        return self.load(name, version or self.active_version(name))
+
+    def swap(self, name: str, version: str, checkpoint: pathlib.Path | None = None) -> None:
+        """Load a model version and make it the active one.
+
+        The new model is fully loaded before the switch, and the previously
+        active model stays usable by requests that already hold it.
+        """
+        self.load(name, version, checkpoint)
+        with self._lock:
+            self._active[name] = version
+            self._evict()
+
+    def unload(self, name: str, version: str) -> None:
+        """Drop a model from memory. It can still be reloaded later."""
+        with self._lock:
+            self._entries.pop((name, version), None)
+
+    def resident(self) -> list[ModelEntry]:
+        """Return the resident models, least recently used first."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def _build(self, name: str, checkpoint: pathlib.Path) -> torch.nn.Module:
+        import torch
+
+        model = self._load_weights(name, checkpoint)
+        if self.channels_last:
+            model.to(memory_format=torch.channels_last)
+        return model
+
+    def _load_weights(self, name: str, checkpoint: pathlib.Path) -> torch.nn.Module:
+        import torch
+
+        from {{ cookiecutter.python_package }}.utils.checkpointing import load_state
+
+        device = torch.device(self.device)
+        state = load_state(checkpoint, mmap=self.mmap)
+        # Accept both bare state dicts and {"model": state_dict, ...} checkpoints
+        state_dict = state.get("model", state)
+        if self.mmap and device.type == "cpu":
+            # Skip random initialization and adopt the mapped tensors as weights
+            with torch.device("meta"):
+                model = self.factory(name)
+            model.load_state_dict(state_dict, assign=True)
+            tensors = [*model.parameters(), *model.buffers()]
+            if not any(tensor.is_meta for tensor in tensors):
+                return model.eval()
+        # Buffers missing from the checkpoint need a regular initialization
+        model = self.factory(name)
+        model.load_state_dict(state_dict)
+        return model.to(device).eval()
+
+    def _evict(self, keep: ModelKey | None = None) -> None:
+        """Evict least recently used inactive models, other than ``keep``, until within budget."""
+        active = set(self._active.items())
+
+        def over_budget() -> bool:
+            total = sum(entry.nbytes for entry in self._entries.values())
+            too_many = len(self._entries) > self.max_models
+            return too_many or (self.max_bytes is not None and total > self.max_bytes)
+
+        for key in list(self._entries):
+            if not over_budget():
+                break
+            if key not in active and key != keep:
+                del self._entries[key]
@@ -0,0 +1,383 @@
+"""Offline bulk scoring: predictions for millions of images, sharded and resumable.
+
+The input list (a directory, glob or manifest, see ``data.list_images``) is
+split by index into ``num_shards`` shards, e.g. one per machine, and each
+shard into chunks of ``chunk_size`` images. Chunks are scored by a pool of
+worker processes that each load the model once, and every finished chunk is
+written atomically as its own output file. A job that is killed and started
+again with the same arguments skips the chunks already written; ``job.json``
+records the image list, the checkpoint's hash and the settings, and a job
+that does not match them refuses to resume.
+
+Usage::
+
+    python -m {{ cookiecutter.python_package }}.scoring --source science/data/raw \\
+        --output-dir science/data/output/predictions --checkpoint models/model.safetensors \\
+        --workers 8 --shard-index 0 --num-shards 4
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import pathlib
+from collections.abc import Iterator, Sequence
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+from {{ cookiecutter.python_package }}.vision import load_image, predict_batch, preprocess_batch
+
+if TYPE_CHECKING:
+    import torch
+
+    from {{ cookiecutter.python_package }}.backends import Precision
+
+OutputFormat = Literal["ndjson", "parquet"]
+JOB_FILE = "job.json"
+# Images of the shard the reduced-precision model is checked on
+PARITY_BATCH_SIZE = 16
+
+# Model of the current worker process, loaded once by _init_worker
+_model: torch.nn.Module | None = None
+
+
+@dataclass
+class ScoringJob:
+    """Settings that must not change when a job is resumed.
+
+    Chunks written under different settings would mix predictions of
+    different models or inputs, so a job only resumes if all of them match.
+    """
+
+    images: int
+    images_sha256: str
+    num_shards: int
+    chunk_size: int
+    format: OutputFormat
+    checkpoint: str | None
+    checkpoint_sha256: str | None
+    architecture: str
+    num_classes: int
+    precision: Precision
+    input_size: tuple[int, int]
+
+
+@dataclass
+class ScoringSummary:
+    """What one :func:`score_images` call did."""
+
+    chunks: int
+    skipped_chunks: int
+    images: int
+    failed: int
+
+
+def shard(paths: Sequence[pathlib.Path], index: int, count: int) -> list[pathlib.Path]:
+    """Every ``count``-th path starting at ``index``, so shards are balanced and disjoint."""
+    if not 0 <= index < count:
+        raise ValueError(f"shard index {index} is not in [0, {count})")
+    return list(paths[index::count])
+
+
+def chunk_path(output_dir: pathlib.Path, shard_index: int, chunk: int, format: str) -> pathlib.Path:
+    """Output file of one chunk."""
+    return output_dir / f"part-{shard_index:05d}-{chunk:06d}.{format}"
+
+
+def file_sha256(path: pathlib.Path) -> str:
+    """SHA-256 of a file, or of the names and contents of every file in a directory."""
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        if path.is_dir():
+            digest.update(file.relative_to(path).as_posix().encode() + b"\0")
+        with file.open("rb") as f:
+            while block := f.read(2**20):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _parity_batch(paths: Sequence[str], size: tuple[int, int]) -> torch.Tensor:
+    """The first images of ``paths`` that load, or noise if none do."""
+    import torch
+
+    images = []
+    for path in paths:
+        try:
+            images.append(load_image(path, size))
+        except (OSError, ValueError):
+            continue
+        if len(images) == PARITY_BATCH_SIZE:
+            break
+    if not images:
+        return torch.rand(8, 3, *size)
+    return preprocess_batch(images, size)
+
+
+def _init_worker(
+    checkpoint: str | None,
+    architecture: str,
+    num_classes: int,
+    threads: int,
+    precision: Precision,
+    input_size: tuple[int, int],
+    parity_paths: list[str],
+) -> None:
+    global _model
+    import torch
+
+    from {{ cookiecutter.python_package }}.backends import prepare_inference_model
+    from {{ cookiecutter.python_package }}.registry import ModelRegistry
+    from {{ cookiecutter.python_package }}.vision import build_model
+
+    torch.set_num_threads(threads)
+    if checkpoint is not None:
+        # Memory-mapped weights are shared by all workers through the page cache
+        registry = ModelRegistry(
+            lambda _: build_model(architecture, num_classes),
+            mmap=True,
+            channels_last=precision != "fp32",
+        )
+        registry.register("model", "1", pathlib.Path(checkpoint))
+        example = _parity_batch(parity_paths, input_size) if precision != "fp32" else None
+        _model = prepare_inference_model(
+            registry.get("model"), precision=precision, example=example
+        )
+    else:
+        _model = None
+
+
+def _score_chunk(
+    task: tuple[int, list[str], tuple[int, int], int],
+) -> tuple[int, list[dict[str, Any]]]:
+    """Score one chunk in a worker; images that fail to load get an ``error`` row."""
+    chunk, paths, size, batch_size = task
+    rows: list[dict[str, Any]] = []
+    for start in range(0, len(paths), batch_size):
+        batch: list[dict[str, Any]] = [
+            {"path": path, "prediction": None, "confidence": None, "error": None}
+            for path in paths[start : start + batch_size]
+        ]
+        images, loaded = [], []
+        for row in batch:
+            try:
+                images.append(load_image(row["path"], size))
+                loaded.append(row)
+            except (OSError, ValueError) as e:
+                row["error"] = str(e)
+        for row, result in zip(loaded, predict_batch(images, size, model=_model), strict=True):
+            row["prediction"] = result["prediction"]
+            row["confidence"] = result["confidence"]
+        rows.extend(batch)
+    return chunk, rows
+
+
+def write_rows(rows: list[dict[str, Any]], path: pathlib.Path, format: OutputFormat) -> None:
+    """Write rows atomically: the file appears complete or not at all.
+
+    Raises:
+        ImportError: If ``format`` is ``"parquet"`` and pyarrow is not installed.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if format == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output requires the 'parquet' extra (pyarrow)") from e
+        pq.write_table(pa.Table.from_pylist(rows), tmp)
+    else:
+        with tmp.open("w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    os.replace(tmp, path)
+
+
+def _check_job(output_dir: pathlib.Path, job: ScoringJob) -> None:
+    """Record the job settings, or check that a resumed job uses the same ones."""
+    path = output_dir / JOB_FILE
+    settings = json.loads(json.dumps(asdict(job)))
+    if path.exists():
+        previous = json.loads(path.read_text())
+        changed = sorted(
+            key
+            for key in settings.keys() | previous.keys()
+            if settings.get(key) != previous.get(key)
+        )
+        if changed:
+            raise ValueError(
+                f"{output_dir} holds a different job ({', '.join(changed)} changed); "
+                "use a new output directory or the same settings"
+            )
+        return
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(settings, indent=2) + "\n")
+    os.replace(tmp, path)
+
+
+def score_images(
+    source: str | pathlib.Path | Sequence[str | pathlib.Path],
+    output_dir: pathlib.Path,
+    checkpoint: pathlib.Path | None = None,
+    architecture: str = "resnet18",
+    num_classes: int = 1000,
+    input_size: tuple[int, int] = (224, 224),
+    shard_index: int = 0,
+    num_shards: int = 1,
+    workers: int = 1,
+    chunk_size: int = 1024,
+    batch_size: int = 32,
+    format: OutputFormat = "ndjson",
+    precision: Precision = "fp32",
+) -> ScoringSummary:
+    """Score one shard of an image collection, resuming from chunks already written.
+
+    Args:
+        source: Directory, glob pattern, manifest file or list of paths.
+        output_dir: Directory for ``part-SSSSS-CCCCCC.<format>`` chunk files
+            and ``job.json``. Shards of one job share it.
+        checkpoint: Model weights; without them predictions are placeholders.
+        architecture: torchvision architecture the checkpoint belongs to.
+        num_classes: Number of output classes.
+        input_size: Model input size (height, width).
+        shard_index: This shard, in ``[0, num_shards)``.
+        num_shards: Number of shards the input is split into, e.g. machines.
+        workers: Scoring processes. ``1`` scores in this process.
+        chunk_size: Images per output file, and the unit of resumption.
+        batch_size: Images per forward pass.
+        format: ``"ndjson"``, or ``"parquet"`` with the ``parquet`` extra.
+        precision: ``"fp32"``, or ``"bf16"``/``"fp16"`` CPU autocast, checked
+            against float32 before scoring.
+
+    Returns:
+        Counts of chunks scored and skipped, and of images scored and failed.
+
+    Raises:
+        ValueError: If ``output_dir`` holds a job with different settings.
+        RuntimeError: If ``precision`` drifts from float32 beyond the parity check.
+    """
+    paths = _list_images(source)
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # In listing order: shards and chunks are slices of it, so a reordered
+    # manifest would put different images in the chunks already written
+    listing = "\n".join(str(path) for path in paths).encode()
+    job = ScoringJob(
+        images=len(paths),
+        images_sha256=hashlib.sha256(listing).hexdigest(),
+        num_shards=num_shards,
+        chunk_size=chunk_size,
+        format=format,
+        checkpoint=str(pathlib.Path(checkpoint).resolve()) if checkpoint is not None else None,
+        checkpoint_sha256=file_sha256(pathlib.Path(checkpoint)) if checkpoint is not None else None,
+        architecture=architecture,
+        num_classes=num_classes,
+        precision=precision,
+        input_size=input_size,
+    )
+    _check_job(output_dir, job)
+
+    mine = shard(paths, shard_index, num_shards)
+    chunks = [mine[start : start + chunk_size] for start in range(0, len(mine), chunk_size)]
+    pending = [
+        (index, [str(path) for path in chunk], input_size, batch_size)
+        for index, chunk in enumerate(chunks)
+        if not chunk_path(output_dir, shard_index, index, format).exists()
+    ]
+    summary = ScoringSummary(0, len(chunks) - len(pending), 0, 0)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    initargs = (
+        str(checkpoint) if checkpoint is not None else None,
+        architecture,
+        num_classes,
+        threads,
+        precision,
+        input_size,
+        [str(path) for path in mine[: 4 * PARITY_BATCH_SIZE]],
+    )
+    for index, rows in _map(pending, workers, initargs):
+        write_rows(rows, chunk_path(output_dir, shard_index, index, format), format)
+        summary.chunks += 1
+        summary.images += len(rows)
+        summary.failed += sum(row["error"] is not None for row in rows)
+    return summary
+
+
+def _list_images(
+    source: str | pathlib.Path | Sequence[str | pathlib.Path],
+) -> list[pathlib.Path]:
+    # data imports torch for its datasets; listing does not need it otherwise
+    from {{ cookiecutter.python_package }}.data import list_images
+
+    return list_images(source)
+
+
+def _map(
+    tasks: list[tuple[int, list[str], tuple[int, int], int]],
+    workers: int,
+    initargs: tuple[Any, ...],
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """Score chunks in this process or a worker pool, yielding each as it finishes."""
+    if not tasks:
+        return
+    if workers <= 1:
+        import torch
+
+        # _init_worker sets the thread count for a worker; restore the caller's
+        threads = torch.get_num_threads()
+        try:
+            _init_worker(*initargs)
+            for task in tasks:
+                yield _score_chunk(task)
+        finally:
+            torch.set_num_threads(threads)
+        return
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        yield from pool.imap_unordered(_score_chunk, tasks)
+
+
+def main(
+    source: str = "science/data/raw",
+    output_dir: pathlib.Path = pathlib.Path("science/data/output/predictions"),  # noqa: B008
+    checkpoint: pathlib.Path | None = None,  # noqa: B008
+    architecture: str = "resnet18",
+    num_classes: int = 1000,
+    shard_index: int = 0,
+    num_shards: int = 1,
+    workers: int = 1,
+    chunk_size: int = 1024,
+    batch_size: int = 32,
+    format: str = "ndjson",
+    precision: str = "fp32",
+) -> None:
+    """Score images (a directory, glob or manifest) into chunked, resumable output files."""
+    if format not in ("ndjson", "parquet"):
+        raise ValueError(f"Unknown format: {format!r}")
+    summary = score_images(
+        source,
+        output_dir,
+        checkpoint=checkpoint,
+        architecture=architecture,
+        num_classes=num_classes,
+        shard_index=shard_index,
+        num_shards=num_shards,
+        workers=workers,
+        chunk_size=chunk_size,
+        batch_size=batch_size,
+        format=format,  # type: ignore[arg-type]
+        precision=precision,  # type: ignore[arg-type]
+    )
+    print(
+        f"Shard {shard_index}/{num_shards}: scored {summary.images} images in "
+        f"{summary.chunks} chunks ({summary.failed} failed), "
+        f"skipped {summary.skipped_chunks} finished chunks; output in {output_dir}"
+    )
+
+
+if __name__ == "__main__":
+    import typer
+
+    typer.run(main)
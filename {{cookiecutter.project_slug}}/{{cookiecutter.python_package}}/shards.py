@@ -0,0 +1,210 @@
+"""Packed image shards: tar files with an offset index for fast reads.
+
+Millions of small files are slow to read one by one, especially from network
+storage. :func:`pack_images` copies the encoded files, unmodified, into large
+uncompressed tar shards and records where each image's bytes start.
+:class:`ShardDataset` then streams shards sequentially or memory-maps them for
+O(1) random access, decoding straight from the mapping without copies.
+
+Usage::
+
+    python -m {{ cookiecutter.python_package }}.shards --source science/data/raw \\
+        --output-dir science/data/processed/shards
+"""
+
+from __future__ import annotations
+
+import bisect
+import io
+import itertools
+import json
+import mmap
+import os
+import pathlib
+import tarfile
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+
+from {{ cookiecutter.python_package }}.vision import load_image_from_buffer
+
+INDEX_FILE = "index.json"
+
+
+def pack_images(
+    source: str | pathlib.Path | Sequence[str | pathlib.Path],
+    output_dir: pathlib.Path,
+    max_shard_bytes: int = 1 << 30,
+    max_shard_images: int = 100_000,
+) -> pathlib.Path:
+    """Pack image files into tar shards with an offset index.
+
+    Args:
+        source: Directory, glob pattern, manifest file or list of paths, see
+            ``data.list_images``.
+        output_dir: Directory for ``shard-NNNNN.tar`` files and ``index.json``.
+        max_shard_bytes: Start a new shard once this many bytes are written.
+        max_shard_images: Start a new shard once it holds this many images.
+
+    Returns:
+        Path to the dataset ``index.json``.
+    """
+    # data imports torch for its datasets; packing does not need it otherwise
+    from {{ cookiecutter.python_package }}.data import list_images
+
+    paths = list_images(source)
+    members = _member_names(paths, source)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    shards: list[dict[str, Any]] = []
+    tar: tarfile.TarFile | None = None
+    records: dict[str, list[Any]] = {}
+
+    def close_shard() -> None:
+        if tar is not None:
+            tar.close()
+            shards[-1].update(records)
+
+    for path, member in zip(paths, members, strict=True):
+        if tar is None or (
+            tar.offset >= max_shard_bytes or len(records["names"]) >= max_shard_images
+        ):
+            close_shard()
+            name = f"shard-{len(shards):05d}.tar"
+            tar = tarfile.open(output_dir / name, "w", format=tarfile.PAX_FORMAT)
+            records = {"names": [], "offsets": [], "sizes": []}
+            shards.append({"path": name})
+
+        data = path.read_bytes()
+        info = tarfile.TarInfo(member)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        # The member's data ends at the current offset, padded to whole blocks
+        blocks = -(-len(data) // tarfile.BLOCKSIZE)
+        records["offsets"].append(tar.offset - blocks * tarfile.BLOCKSIZE)
+        records["sizes"].append(len(data))
+        records["names"].append(member)
+    close_shard()
+
+    index = output_dir / INDEX_FILE
+    index.write_text(json.dumps({"shards": shards}))
+    return index
+
+
+def _member_names(
+    paths: Sequence[pathlib.Path], source: str | pathlib.Path | Sequence[str | pathlib.Path]
+) -> list[str]:
+    """Tar member names: paths relative to the source directory or the files' common parent.
+
+    Keeping the directories, not just file names, keeps ``a/0.png`` and
+    ``b/0.png`` from globs and manifests distinct.
+    """
+    if isinstance(source, str | pathlib.Path) and pathlib.Path(source).is_dir():
+        root = pathlib.Path(source)
+        return [path.relative_to(root).as_posix() for path in paths]
+    if not paths:
+        return []
+    resolved = [path.resolve() for path in paths]
+    root = pathlib.Path(os.path.commonpath([path.parent for path in resolved]))
+    return [path.relative_to(root).as_posix() for path in resolved]
+
+
+class ShardDataset:
+    """Read images from shards written by :func:`pack_images`.
+
+    ``dataset[i]`` memory-maps the shard holding image ``i`` and decodes it
+    straight from the mapping, so random access costs one index lookup and
+    touches only that image's pages. Iterating reads shards front to back,
+    which is the fastest pattern for network and spinning storage. The class
+    follows the ``torch.utils.data.Dataset`` protocol.
+
+    Args:
+        index: Path to the ``index.json`` written by :func:`pack_images`, or its directory.
+        decode: Function turning encoded bytes into a sample. Defaults to
+            ``load_image_from_buffer`` (RGB numpy array); pass ``bytes`` to get raw data.
+    """
+
+    def __init__(
+        self,
+        index: str | pathlib.Path,
+        decode: Callable[[memoryview], Any] = load_image_from_buffer,
+    ) -> None:
+        index = pathlib.Path(index)
+        if index.is_dir():
+            index = index / INDEX_FILE
+        self.root = index.parent
+        self.decode = decode
+        self.shards = json.loads(index.read_text())["shards"]
+        counts = [len(shard["names"]) for shard in self.shards]
+        self._starts = [0, *itertools.accumulate(counts)]
+        self._maps: dict[int, mmap.mmap] = {}
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        shard = bisect.bisect_right(self._starts, index) - 1
+        position = index - self._starts[shard]
+        return self.decode(self._record(shard, position))
+
+    def __iter__(self) -> Iterator[Any]:
+        for shard in range(len(self.shards)):
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._map(shard).madvise(mmap.MADV_SEQUENTIAL)
+            for position in range(len(self.shards[shard]["names"])):
+                yield self.decode(self._record(shard, position))
+
+    def name(self, index: int) -> str:
+        """Original file name (relative to the packed directory) of image ``index``."""
+        shard = bisect.bisect_right(self._starts, index) - 1
+        return self.shards[shard]["names"][index - self._starts[shard]]
+
+    def close(self) -> None:
+        """Unmap all shards.
+
+        A shard that samples still hold views of, e.g. from a ``decode`` that
+        returns ``memoryview`` or ``np.frombuffer`` data, is unmapped once those
+        samples are gone.
+        """
+        for mapping in self._maps.values():
+            try:
+                mapping.close()
+            except BufferError:
+                # Exported views keep the mapping alive; it is unmapped when freed
+                pass
+        self._maps.clear()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Memory maps cannot be pickled; DataLoader workers map shards themselves
+        return {**self.__dict__, "_maps": {}}
+
+    def _map(self, shard: int) -> mmap.mmap:
+        if shard not in self._maps:
+            with (self.root / self.shards[shard]["path"]).open("rb") as f:
+                self._maps[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[shard]
+
+    def _record(self, shard: int, position: int) -> memoryview:
+        offset = self.shards[shard]["offsets"][position]
+        size = self.shards[shard]["sizes"][position]
+        return memoryview(self._map(shard))[offset : offset + size]
+
+
+def main(
+    source: str = "science/data/raw",
+    output_dir: pathlib.Path = pathlib.Path("science/data/processed/shards"),  # noqa: B008
+    max_shard_mb: int = 1024,
+) -> None:
+    """Pack images (a directory, glob or manifest) into tar shards with an offset index."""
+    index = pack_images(source, output_dir, max_shard_bytes=max_shard_mb << 20)
+    dataset = ShardDataset(index)
+    print(f"Packed {len(dataset)} images into {len(dataset.shards)} shards at {output_dir}")
+
+
+if __name__ == "__main__":
+    import typer
+
+    typer.run(main)
@@ -1,5 +1,28 @@
 """Utility functions for {{ cookiecutter.project_name }}."""
 
-from {{ cookiecutter.python_package }}.utils.checkpointing import load_state, save_state
+import importlib
+from typing import Any
 
-__all__ = ["load_state", "save_state"]
+__all__ = ["AsyncCheckpointer", "TensorFile", "TensorStore", "load_state", "save_state"]
+
+# Exports are imported on first access (PEP 562), so using one submodule does
+# not load the others
+_EXPORTS = {
+    "AsyncCheckpointer": "async_checkpoint",
+    "TensorFile": "checkpointing",
+    "TensorStore": "tensor_store",
+    "load_state": "checkpointing",
+    "save_state": "checkpointing",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,205 @@
+"""Background checkpoint writer with retention and a manifest."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import shutil
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Literal
+
+import torch
+
+from {{ cookiecutter.python_package }}.utils.checkpointing import (
+    SAFETENSORS_SUFFIX,
+    atomic_path,
+    write_sharded,
+    write_state,
+)
+
+MANIFEST = "manifest.json"
+
+
+def snapshot_state(value: Any) -> Any:
+    """Copy every tensor in a nested state to CPU memory.
+
+    The copy decouples the checkpoint from the live training state, so the
+    training loop can keep updating parameters while it is written.
+    """
+    if isinstance(value, torch.Tensor):
+        return value.detach().to("cpu", copy=True)
+    if isinstance(value, Mapping):
+        return {key: snapshot_state(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return type(value)(snapshot_state(item) for item in value)
+    return value
+
+
+class AsyncCheckpointer:
+    """Write checkpoints from a background thread.
+
+    :meth:`save` snapshots the state to CPU and returns immediately; the file is
+    written by a background thread through a temporary file and an atomic
+    rename. With ``num_shards > 1`` tensors are split across several files
+    written in parallel. After each write, checkpoints outside the retention
+    policy are deleted and ``manifest.json`` in ``directory`` is updated.
+
+    At most one write is outstanding: a ``save`` issued while the previous one is
+    still running waits for it, which bounds memory to one extra snapshot.
+
+    Args:
+        directory: Directory to write checkpoints and the manifest into.
+        prefix: Filename prefix for checkpoints.
+        format: ``"torch"`` or ``"safetensors"``, see ``save_state``.
+        num_shards: Number of files to split each checkpoint across.
+        keep_last: Number of most recent checkpoints to keep.
+        keep_best: Number of best checkpoints (by metric) to keep in addition.
+        mode: Whether a lower (``"min"``) or higher (``"max"``) metric is better.
+    """
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        prefix: str = "checkpoint",
+        format: Literal["torch", "safetensors"] = "torch",
+        num_shards: int = 1,
+        keep_last: int = 3,
+        keep_best: int = 1,
+        mode: Literal["min", "max"] = "min",
+    ) -> None:
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self.directory = pathlib.Path(directory)
+        self.prefix = prefix
+        self.format = format
+        self.num_shards = num_shards
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.mode = mode
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self._shard_pool = (
+            ThreadPoolExecutor(max_workers=num_shards, thread_name_prefix="checkpoint-shard")
+            if num_shards > 1
+            else None
+        )
+        self._pending: Future[pathlib.Path] | None = None
+        self._lock = threading.Lock()
+        self._records: list[dict[str, Any]] = self._read_manifest().get("checkpoints", [])
+
+    def save(
+        self, state: Mapping[str, Any], step: int, metric: float | None = None
+    ) -> Future[pathlib.Path]:
+        """Snapshot ``state`` and write it in the background.
+
+        Args:
+            state: State dictionary to save.
+            step: Training step or epoch, used in the filename and for ordering.
+            metric: Optional validation metric used to keep the best checkpoints.
+
+        Returns:
+            Future resolving to the checkpoint path once it is on disk.
+
+        Raises:
+            Exception: The error of a previous write that failed.
+        """
+        self.wait()
+        snapshot = snapshot_state(state)
+        self._pending = self._writer.submit(self._write, snapshot, step, metric)
+        return self._pending
+
+    def wait(self) -> pathlib.Path | None:
+        """Block until the outstanding write, if any, is on disk.
+
+        Returns:
+            Path of the last checkpoint written, or ``None`` if nothing was pending.
+        """
+        pending, self._pending = self._pending, None
+        return pending.result() if pending is not None else None
+
+    def close(self) -> None:
+        """Finish the outstanding write and stop the background threads."""
+        try:
+            self.wait()
+        finally:
+            self._writer.shutdown()
+            if self._shard_pool is not None:
+                self._shard_pool.shutdown()
+
+    def __enter__(self) -> AsyncCheckpointer:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def latest(self) -> pathlib.Path | None:
+        """Path of the most recent checkpoint on disk."""
+        with self._lock:
+            records = sorted(self._records, key=lambda r: r["step"])
+        return self.directory / records[-1]["path"] if records else None
+
+    @property
+    def best(self) -> pathlib.Path | None:
+        """Path of the checkpoint with the best metric."""
+        with self._lock:
+            ranked = self._ranked()
+        return self.directory / ranked[0]["path"] if ranked else None
+
+    def _write(self, state: Mapping[str, Any], step: int, metric: float | None) -> pathlib.Path:
+        if self.num_shards > 1:
+            path = self.directory / f"{self.prefix}-{step:08d}"
+            write_sharded(state, path, self.num_shards, self.format, self._shard_pool)
+        else:
+            suffix = SAFETENSORS_SUFFIX if self.format == "safetensors" else ".pt"
+            path = self.directory / f"{self.prefix}-{step:08d}{suffix}"
+            write_state(state, path, self.format)
+
+        record = {"path": path.name, "step": step, "metric": metric, "created": time.time()}
+        with self._lock:
+            self._records = [r for r in self._records if r["path"] != path.name]
+            self._records.append(record)
+            self._apply_retention()
+            self._write_manifest()
+        return path
+
+    def _ranked(self) -> list[dict[str, Any]]:
+        """Records with a metric, best first."""
+        scored = [r for r in self._records if r["metric"] is not None]
+        return sorted(scored, key=lambda r: r["metric"], reverse=self.mode == "max")
+
+    def _apply_retention(self) -> None:
+        by_step = sorted(self._records, key=lambda r: r["step"])
+        keep = {r["path"] for r in by_step[-self.keep_last :]} if self.keep_last > 0 else set()
+        keep |= {r["path"] for r in self._ranked()[: self.keep_best]}
+        for record in self._records:
+            if record["path"] not in keep:
+                path = self.directory / record["path"]
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+        self._records = [r for r in by_step if r["path"] in keep]
+
+    def _read_manifest(self) -> dict[str, Any]:
+        path = self.directory / MANIFEST
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _write_manifest(self) -> None:
+        ranked = self._ranked()
+        manifest = {
+            "latest": self._records[-1]["path"] if self._records else None,
+            "best": ranked[0]["path"] if ranked else None,
+            "checkpoints": self._records,
+        }
+        with atomic_path(self.directory / MANIFEST) as tmp:
+            tmp.write_text(json.dumps(manifest, indent=2))
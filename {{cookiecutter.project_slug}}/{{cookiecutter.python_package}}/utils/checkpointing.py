@@ -3,16 +3,46 @@
 from __future__ import annotations
 
 import datetime as dt
+import json
+import mmap as _mmap
+import os
 import pathlib
-from typing import Any, Mapping
+import shutil
+import struct
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Literal
 
 import torch
 
+SAFETENSORS_SUFFIX = ".safetensors"
+SHARD_INDEX = "index.json"
+
+# safetensors dtype names, shared by the on-disk formats in this package
+DTYPES: dict[str, torch.dtype] = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+DTYPE_NAMES = {dtype: name for name, dtype in DTYPES.items()}
+
+# Separator between nesting levels when flattening a state dict into tensor names
+_SEP = "/"
+
 
 def save_state(
     state: Mapping[str, Any],
     directory: pathlib.Path,
     prefix: str = "checkpoint",
+    format: Literal["torch", "safetensors"] = "torch",
 ) -> pathlib.Path:
     """Save state dictionary to checkpoint file.
 
@@ -20,22 +50,54 @@ def save_state(
         state: State dictionary to save.
         directory: Directory to save checkpoint in.
         prefix: Filename prefix for checkpoint.
+        format: ``"torch"`` writes a ``.pt`` file with ``torch.save``.
+            ``"safetensors"`` writes a ``.safetensors`` file whose tensors can be
+            memory-mapped and read lazily; non-tensor values must be JSON
+            serializable.
 
     Returns:
         Path to saved checkpoint file.
     """
     directory.mkdir(parents=True, exist_ok=True)
     timestamp = dt.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    path = directory / f"{prefix}-{timestamp}.pt"
-    torch.save(state, path)
+    suffix = SAFETENSORS_SUFFIX if format == "safetensors" else ".pt"
+    path = directory / f"{prefix}-{timestamp}{suffix}"
+    write_state(state, path, format)
     return path
 
 
-def load_state(path: pathlib.Path) -> Mapping[str, Any]:
+def write_state(
+    state: Mapping[str, Any],
+    path: pathlib.Path,
+    format: Literal["torch", "safetensors"] = "torch",
+) -> None:
+    """Write a state dictionary to an exact path, atomically.
+
+    Data goes to a temporary file that is fsynced and renamed over ``path``,
+    so a crash never leaves a truncated checkpoint behind.
+
+    Args:
+        state: State dictionary to write.
+        path: Destination file.
+        format: ``"torch"`` or ``"safetensors"``, see :func:`save_state`.
+    """
+    with atomic_path(path) as tmp:
+        if format == "safetensors":
+            write_tensor_file(state, tmp)
+        else:
+            torch.save(state, tmp)
+
+
+def load_state(path: pathlib.Path, mmap: bool = False) -> Mapping[str, Any]:
     """Load state dictionary from checkpoint file.
 
     Args:
         path: Path to checkpoint file.
+        mmap: Memory-map tensor data instead of reading it into RAM. Pages are
+            loaded on first access and shared between processes through the OS
+            page cache. ``.safetensors`` files are always memory-mapped.
+            ``path`` may also be a sharded checkpoint directory written by
+            :func:`write_sharded` or a ``TensorStore`` manifest (``.json``).
 
     Returns:
         Loaded state dictionary.
@@ -45,5 +107,257 @@ def load_state(path: pathlib.Path) -> Mapping[str, Any]:
     """
     if not path.exists():
         raise FileNotFoundError(f"Checkpoint {path} does not exist")
-    return torch.load(path, map_location="cpu")
+    if path.is_dir():
+        return _load_sharded(path, mmap)
+    if path.suffix == ".json":
+        from {{ cookiecutter.python_package }}.utils.tensor_store import TensorStore
+
+        return TensorStore(path.parent).load(path, mmap=mmap)
+    if path.suffix == SAFETENSORS_SUFFIX:
+        return TensorFile(path).to_state()
+    return torch.load(path, map_location="cpu", mmap=mmap)
+
+
+def write_tensor_file(state: Mapping[str, Any], path: pathlib.Path) -> None:
+    """Write a state dictionary in the safetensors format.
+
+    Nested mappings are flattened with ``/`` between levels, so
+    ``{"model": {"fc.weight": t}}`` stores a tensor named ``model/fc.weight``.
+    Non-tensor values are kept as JSON in the file metadata and all keys are
+    stored as strings, so use the torch format for optimizer state.
+
+    Args:
+        state: State dictionary to write.
+        path: Destination file.
+    """
+    tensors: dict[str, torch.Tensor] = {}
+    skeleton = _split_tensors(state, "", tensors)
+
+    header: dict[str, Any] = {"__metadata__": {"state": json.dumps(skeleton)}}
+    offset = 0
+    for name, tensor in tensors.items():
+        if tensor.dtype not in DTYPE_NAMES:
+            raise TypeError(f"Unsupported dtype {tensor.dtype} for tensor {name}")
+        nbytes = tensor.numel() * tensor.element_size()
+        header[name] = {
+            "dtype": DTYPE_NAMES[tensor.dtype],
+            "shape": list(tensor.shape),
+            "data_offsets": [offset, offset + nbytes],
+        }
+        offset += nbytes
+
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    # Pad the header so tensor data starts 8-byte aligned
+    encoded += b" " * (-len(encoded) % 8)
+    with path.open("wb") as f:
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        for tensor in tensors.values():
+            data = tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8)
+            f.write(data.numpy().data)
+
+
+class TensorFile(Mapping[str, torch.Tensor]):
+    """Lazy, memory-mapped view of a safetensors file.
+
+    Only the header is parsed on open. Each tensor is created on access as a
+    zero-copy view into a private memory map, so reading a few tensors from a
+    large checkpoint touches only their pages.
+
+    Args:
+        path: Path to a ``.safetensors`` file.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            (header_size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_size))
+            # Copy-on-write mapping: shares the page cache and yields writable tensors
+            self._mmap = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_COPY)
+        self.metadata: dict[str, str] = header.pop("__metadata__", None) or {}
+        self._entries: dict[str, dict[str, Any]] = header
+        self._data_start = 8 + header_size
+
+    def __getitem__(self, name: str) -> torch.Tensor:
+        entry = self._entries[name]
+        dtype = DTYPES[entry["dtype"]]
+        start, end = entry["data_offsets"]
+        if start == end:
+            return torch.empty(entry["shape"], dtype=dtype)
+        tensor = torch.frombuffer(
+            self._mmap,
+            dtype=dtype,
+            count=(end - start) // dtype.itemsize,
+            offset=self._data_start + start,
+        )
+        return tensor.reshape(entry["shape"])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def to_state(self) -> dict[str, Any]:
+        """Rebuild the nested state dictionary written by :func:`write_tensor_file`."""
+        state: dict[str, Any] = json.loads(self.metadata.get("state", "{}"))
+        for name in self._entries:
+            *parents, leaf = name.split(_SEP)
+            node = state
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = self[name]
+        return state
+
+
+def write_sharded(
+    state: Mapping[str, Any],
+    path: pathlib.Path,
+    num_shards: int,
+    format: Literal["torch", "safetensors"] = "torch",
+    executor: Executor | None = None,
+) -> None:
+    """Write a state dictionary as a directory of shards, in parallel and atomically.
+
+    Tensors in nested mappings are spread over ``num_shards`` files of similar
+    size. Everything else is saved to ``state.pt`` and an ``index.json``
+    records which shard holds each tensor. The directory is assembled under a
+    temporary name and renamed into place when complete.
+
+    Args:
+        state: State dictionary to write.
+        path: Destination directory.
+        num_shards: Number of shard files.
+        format: Shard file format, ``"torch"`` or ``"safetensors"``.
+        executor: Pool to write shards with. Defaults to one thread per shard.
+    """
+    tensors: list[tuple[list[Any], torch.Tensor]] = []
+    skeleton = extract_tensors(state, [], tensors)
+
+    # Greedy balancing: largest tensors first, each into the lightest shard
+    suffix = SAFETENSORS_SUFFIX if format == "safetensors" else ".pt"
+    names = [f"shard-{i:05d}-of-{num_shards:05d}{suffix}" for i in range(num_shards)]
+    shards: list[dict[str, torch.Tensor]] = [{} for _ in range(num_shards)]
+    sizes = [0] * num_shards
+    entries = []
+    order = sorted(range(len(tensors)), key=lambda i: -tensors[i][1].nbytes)
+    for index in order:
+        keys, tensor = tensors[index]
+        shard = sizes.index(min(sizes))
+        shards[shard][f"t{index}"] = tensor
+        sizes[shard] += tensor.nbytes
+        entries.append({"keys": keys, "shard": shard, "name": f"t{index}"})
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        pool = executor or ThreadPoolExecutor(max_workers=num_shards)
+        try:
+            futures = [
+                pool.submit(write_state, shard, tmp / name, format)
+                for shard, name in zip(shards, names, strict=True)
+            ]
+            futures.append(pool.submit(write_state, skeleton, tmp / "state.pt"))
+            for future in futures:
+                future.result()
+        finally:
+            if executor is None:
+                pool.shutdown()
+        manifest = {"format": format, "shards": names, "tensors": entries}
+        with atomic_path(tmp / SHARD_INDEX) as index_tmp:
+            index_tmp.write_text(json.dumps(manifest))
+        fsync_directory(tmp)
+        # Move the previous checkpoint aside instead of deleting it first, so a
+        # crash between the two renames still leaves a complete copy on disk
+        old = path.with_name(f".{path.name}.old")
+        shutil.rmtree(old, ignore_errors=True)
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        fsync_directory(path.parent)
+        shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _load_sharded(path: pathlib.Path, mmap: bool) -> Mapping[str, Any]:
+    """Reassemble a state dictionary written by :func:`write_sharded`."""
+    index = json.loads((path / SHARD_INDEX).read_text())
+    state = torch.load(path / "state.pt", map_location="cpu")
+    shards = [load_state(path / name, mmap=mmap) for name in index["shards"]]
+    for entry in index["tensors"]:
+        *parents, leaf = entry["keys"]
+        node = state
+        for key in parents:
+            node = node[key]
+        node[leaf] = shards[entry["shard"]][entry["name"]]
+    return state
+
+
+@contextmanager
+def atomic_path(path: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Yield a temporary path that replaces ``path`` once the block succeeds.
+
+    The file and then its directory are fsynced, so after a crash ``path``
+    holds either the old or the new contents.
+    """
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        yield tmp
+        with tmp.open("rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        fsync_directory(path.parent)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def fsync_directory(path: pathlib.Path) -> None:
+    """Flush a directory's entries (e.g. a rename into it) to disk.
+
+    A no-op where directories cannot be opened, such as on Windows.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def extract_tensors(
+    value: Any, keys: list[Any], tensors: list[tuple[list[Any], torch.Tensor]]
+) -> Any:
+    """Replace tensors in nested mappings with ``None``, collecting them with their key path."""
+    if isinstance(value, torch.Tensor):
+        tensors.append((keys, value))
+        return None
+    if isinstance(value, Mapping):
+        return {key: extract_tensors(item, [*keys, key], tensors) for key, item in value.items()}
+    return value
+
 
+def _split_tensors(value: Any, path: str, tensors: dict[str, torch.Tensor]) -> Any:
+    """Move tensors out of a nested state into ``tensors`` and return the rest."""
+    if isinstance(value, torch.Tensor):
+        tensors[path] = value
+        return None
+    if isinstance(value, Mapping):
+        rest = {}
+        for key, item in value.items():
+            if _SEP in str(key):
+                raise ValueError(f"State key {key!r} may not contain {_SEP!r}")
+            child = _split_tensors(item, f"{path}{_SEP}{key}" if path else str(key), tensors)
+            if child is not None or not isinstance(item, torch.Tensor):
+                rest[str(key)] = child
+        return rest
+    try:
+        json.dumps(value)
+    except TypeError as e:
+        raise TypeError(f"Value at {path!r} is not JSON serializable; use format='torch'") from e
+    return value
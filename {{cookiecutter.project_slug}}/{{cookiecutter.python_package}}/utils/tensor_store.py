@@ -0,0 +1,166 @@
+"""Content-addressed checkpoint store that only writes changed tensors."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import math
+import pathlib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import torch
+
+from {{ cookiecutter.python_package }}.utils.checkpointing import (
+    DTYPE_NAMES,
+    DTYPES,
+    atomic_path,
+    extract_tensors,
+)
+
+MANIFEST_SUFFIX = ".json"
+
+
+@dataclass
+class SaveStats:
+    """What a :meth:`TensorStore.save` call wrote."""
+
+    blobs_written: int = 0
+    blobs_reused: int = 0
+    bytes_written: int = 0
+
+
+class TensorStore:
+    """Checkpoint store that deduplicates tensors by content hash.
+
+    Every tensor is hashed and stored once as a raw blob under
+    ``root/blobs``. Each checkpoint is a small JSON manifest in ``root``
+    listing the blobs that make up its state, so tensors that did not change
+    between checkpoints (e.g. a frozen backbone) are never written again.
+    ``load_state`` reads the manifests directly.
+
+    Args:
+        root: Directory holding manifests and the ``blobs`` directory.
+    """
+
+    def __init__(self, root: pathlib.Path) -> None:
+        self.root = pathlib.Path(root)
+        self.blobs = self.root / "blobs"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.last_stats = SaveStats()
+
+    def save(self, state: Mapping[str, Any], name: str) -> pathlib.Path:
+        """Save a checkpoint, writing only blobs that are not already stored.
+
+        Args:
+            state: State dictionary to save. Tensors inside nested mappings are
+                deduplicated; everything else is stored as one small blob.
+            name: Checkpoint name; the manifest is written to ``root/<name>.json``.
+
+        Returns:
+            Path to the checkpoint manifest.
+        """
+        stats = SaveStats()
+        tensors: list[tuple[list[Any], torch.Tensor]] = []
+        skeleton = extract_tensors(state, [], tensors)
+
+        entries = []
+        for keys, tensor in tensors:
+            if tensor.dtype not in DTYPE_NAMES:
+                raise TypeError(f"Unsupported dtype {tensor.dtype} at {keys}")
+            data = _tensor_bytes(tensor)
+            entries.append(
+                {
+                    "keys": keys,
+                    "blob": self._put(data, stats),
+                    "dtype": DTYPE_NAMES[tensor.dtype],
+                    "shape": list(tensor.shape),
+                }
+            )
+
+        buffer = io.BytesIO()
+        torch.save(skeleton, buffer)
+        manifest = {"state": self._put(memoryview(buffer.getbuffer()), stats), "tensors": entries}
+
+        path = self.root / f"{name}{MANIFEST_SUFFIX}"
+        with atomic_path(path) as tmp:
+            tmp.write_text(json.dumps(manifest))
+        self.last_stats = stats
+        return path
+
+    def load(self, manifest: pathlib.Path, mmap: bool = False) -> dict[str, Any]:
+        """Reassemble the state dictionary of a checkpoint.
+
+        Args:
+            manifest: Path to a checkpoint manifest.
+            mmap: Memory-map tensor blobs instead of reading them into RAM.
+
+        Returns:
+            The saved state dictionary.
+        """
+        index = json.loads(pathlib.Path(manifest).read_text())
+        state = torch.load(io.BytesIO(self._blob(index["state"]).read_bytes()), map_location="cpu")
+        for entry in index["tensors"]:
+            tensor = self._read_tensor(entry, mmap)
+            *parents, leaf = entry["keys"]
+            node = state
+            for key in parents:
+                node = node[key]
+            node[leaf] = tensor
+        return state
+
+    def gc(self) -> int:
+        """Delete blobs no manifest refers to.
+
+        Returns:
+            Number of blobs deleted.
+        """
+        referenced = set()
+        for manifest in self.root.glob(f"*{MANIFEST_SUFFIX}"):
+            index = json.loads(manifest.read_text())
+            referenced.add(index["state"])
+            referenced.update(entry["blob"] for entry in index["tensors"])
+        removed = 0
+        for blob in self.blobs.glob("*/*"):
+            if blob.name not in referenced:
+                blob.unlink()
+                removed += 1
+        return removed
+
+    def _blob(self, digest: str) -> pathlib.Path:
+        return self.blobs / digest[:2] / digest
+
+    def _put(self, data: memoryview, stats: SaveStats) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob(digest)
+        if path.exists():
+            stats.blobs_reused += 1
+            return digest
+        path.parent.mkdir(exist_ok=True)
+        with atomic_path(path) as tmp:
+            tmp.write_bytes(data)
+        stats.blobs_written += 1
+        stats.bytes_written += data.nbytes
+        return digest
+
+    def _read_tensor(self, entry: Mapping[str, Any], mmap: bool) -> torch.Tensor:
+        dtype = DTYPES[entry["dtype"]]
+        shape = entry["shape"]
+        numel = math.prod(shape)
+        if numel == 0:
+            return torch.empty(shape, dtype=dtype)
+        path = self._blob(entry["blob"])
+        if mmap:
+            # Private mapping: pages come from the page cache until written
+            tensor = torch.from_file(str(path), shared=False, size=numel, dtype=dtype)
+        else:
+            tensor = torch.frombuffer(bytearray(path.read_bytes()), dtype=dtype)
+        return tensor.reshape(shape)
+
+
+def _tensor_bytes(tensor: torch.Tensor) -> memoryview:
+    """Raw bytes of a tensor's contents, without copying contiguous CPU tensors."""
+    flat = tensor.detach().cpu().contiguous().reshape(-1)
+    return flat.view(torch.uint8).numpy().data
@@ -1,25 +1,55 @@
-"""Computer vision utilities and models."""
+"""Computer vision utilities and models.
+
+torch, OpenCV and PIL are imported on first use rather than with this
+module, so image decoding (e.g. in the shard packer) does not pay for torch
+and importing the API does not pay for any of them.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import io
+import itertools
+import os
 import pathlib
-from typing import Any
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING, Any, Literal
 
-import cv2
 import numpy as np
-import torch
-from PIL import Image
+
+if TYPE_CHECKING:
+    import torch
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+# EXIF orientations that rotate the image by 90 degrees
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
 
 
-def load_image(image_path: str | pathlib.Path) -> np.ndarray:
+def load_image(image_path: str | pathlib.Path, size: tuple[int, int] | None = None) -> np.ndarray:
     """Load an image from file path.
 
     Args:
         image_path: Path to the image file.
+        size: Optional target size (height, width) of the model input. Images
+            larger than this are shrunk while decoding, see
+            :func:`load_image_from_buffer`.
 
     Returns:
         Image as numpy array in RGB format.
     """
+    if size is not None:
+        try:
+            data = pathlib.Path(image_path).read_bytes()
+        except OSError as e:
+            raise ValueError(f"Could not load image from {image_path}") from e
+        return load_image_from_buffer(data, size)
+    import cv2
+
     image = cv2.imread(str(image_path))
     if image is None:
         raise ValueError(f"Could not load image from {image_path}")
@@ -28,50 +58,745 @@ def load_image(image_path: str | pathlib.Path) -> np.ndarray:
     return image
 
 
-def preprocess_image(image: np.ndarray, size: tuple[int, int] = (224, 224)) -> torch.Tensor:
+def load_image_from_buffer(
+    buffer: bytes | bytearray | memoryview | np.ndarray, size: tuple[int, int] | None = None
+) -> np.ndarray:
+    """Decode an encoded image (JPEG, PNG, etc.) held in memory.
+
+    The buffer is wrapped in a zero-copy numpy view and decoded directly, so
+    nothing is written to disk.
+
+    With ``size``, images larger than the target in both dimensions are returned
+    resized to exactly ``size``, which is what preprocessing would do anyway.
+    JPEGs are decoded at the smallest 1/2, 1/4 or 1/8 scale that still covers
+    the target, so a 12 MP photo never exists at full resolution in memory.
+    Other formats are resized before the color conversion, so it runs on the
+    small image.
+
+    Args:
+        buffer: Encoded image data in any object supporting the buffer protocol
+            (bytes, bytearray, memoryview, mmap, uint8 numpy array).
+        size: Optional target size (height, width) of the model input.
+
+    Returns:
+        Image as numpy array in RGB format.
+    """
+    return decode_image(buffer, size)[0]
+
+
+def decode_image(
+    buffer: bytes | bytearray | memoryview | np.ndarray, size: tuple[int, int] | None = None
+) -> tuple[np.ndarray, tuple[int, int, int]]:
+    """Decode like :func:`load_image_from_buffer`, also returning the full-size shape.
+
+    Returns:
+        The decoded RGB image, and the (height, width, channels) it has at full
+        resolution, which differs from the image's own shape when ``size``
+        shrank it while decoding.
+    """
+    import cv2
+
+    encoded = np.frombuffer(buffer, dtype=np.uint8)
+    if size is not None and encoded[:3].tobytes() == JPEG_MAGIC:
+        image, shape = _decode_jpeg_reduced(encoded, size)
+        return _fit(image, size), shape
+    decoded = cv2.imdecode(encoded, cv2.IMREAD_COLOR) if encoded.size else None
+    if decoded is None:
+        raise ValueError("Could not decode image from buffer")
+    shape = (decoded.shape[0], decoded.shape[1], decoded.shape[2])
+    image = _fit(decoded, size) if size is not None else decoded
+    # Convert BGR to RGB in place, the decoded array is not shared
+    cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+    return image, shape
+
+
+def load_image_from_bytes(data: bytes, size: tuple[int, int] | None = None) -> np.ndarray:
+    """Decode an image from raw file bytes, e.g. an HTTP upload.
+
+    Args:
+        data: Encoded image bytes.
+        size: Optional target size (height, width), see :func:`load_image_from_buffer`.
+
+    Returns:
+        Image as numpy array in RGB format.
+    """
+    return load_image_from_buffer(data, size)
+
+
+class ImageTooLargeError(ValueError):
+    """Raised for encoded images with more pixels than a caller accepts."""
+
+
+def check_image_size(
+    buffer: bytes | bytearray | memoryview | np.ndarray, max_pixels: int
+) -> tuple[int, int]:
+    """Read an encoded image's size from its header, without decoding it.
+
+    Args:
+        buffer: Encoded image data.
+        max_pixels: Largest accepted height times width.
+
+    Returns:
+        The image's (height, width).
+
+    Raises:
+        ImageTooLargeError: If the image has more than ``max_pixels`` pixels,
+            or more than PIL opens at all.
+        ValueError: If the header cannot be read.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(np.frombuffer(buffer, dtype=np.uint8).data)) as image:
+            width, height = image.size
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e)) from e
+    except OSError as e:
+        raise ValueError("Could not read the image size from its header") from e
+    if height * width > max_pixels:
+        raise ImageTooLargeError(
+            f"Image has {height * width} pixels ({height}x{width}), more than {max_pixels}"
+        )
+    return height, width
+
+
+def _decode_jpeg_reduced(
+    encoded: np.ndarray, size: tuple[int, int]
+) -> tuple[np.ndarray, tuple[int, int, int]]:
+    """Decode a JPEG with DCT scaling to the smallest scale covering ``size``.
+
+    Also returns the full-resolution (height, width, 3) from the header.
+
+    Raises:
+        ImageTooLargeError: If the image has more pixels than PIL opens.
+        ValueError: If the image cannot be decoded.
+    """
+    from PIL import ExifTags, Image, ImageOps
+
+    height, width = size
+    try:
+        with Image.open(io.BytesIO(encoded.data)) as image:
+            orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+            full_width, full_height = image.size
+            # draft() takes (width, height) of the stored, unrotated image
+            if orientation in _TRANSPOSED_ORIENTATIONS:
+                image.draft("RGB", (height, width))
+                full_width, full_height = full_height, full_width
+            else:
+                image.draft("RGB", (width, height))
+            # Decodes straight to RGB, no BGR intermediate
+            rgb = ImageOps.exif_transpose(image).convert("RGB")
+            return np.array(rgb), (full_height, full_width, 3)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e)) from e
+    except OSError as e:
+        raise ValueError("Could not decode image from buffer") from e
+
+
+def _fit(image: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """Shrink ``image`` to exactly ``size`` if it is larger in both dimensions."""
+    height, width = size
+    if image.shape[0] < height or image.shape[1] < width or image.shape[:2] == (height, width):
+        return image
+    import cv2
+
+    # cv2.resize takes (width, height)
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def preprocess_image(
+    image: np.ndarray,
+    size: tuple[int, int] = (224, 224),
+    dtype: torch.dtype | None = None,
+    channels_last: bool = False,
+) -> torch.Tensor:
     """Preprocess image for model inference.
 
     Args:
         image: Image as numpy array (H, W, C) in RGB format.
         size: Target size (height, width).
+        dtype: Tensor dtype, e.g. ``torch.bfloat16``. Defaults to float32.
+        channels_last: Return a tensor in ``torch.channels_last`` memory format.
 
     Returns:
         Preprocessed image as torch tensor (1, C, H, W) normalized to [0, 1].
     """
-    # Resize
-    image = cv2.resize(image, size)
-    # Convert to tensor and normalize
-    image_tensor = torch.from_numpy(image).float()
-    # Convert HWC to CHW
-    image_tensor = image_tensor.permute(2, 0, 1)
-    # Normalize to [0, 1]
-    image_tensor = image_tensor / 255.0
-    # Add batch dimension
-    image_tensor = image_tensor.unsqueeze(0)
-    return image_tensor
+    return preprocess_batch([image], size, dtype=dtype, channels_last=channels_last)
+
+
+def preprocess_batch(
+    images: Sequence[np.ndarray] | np.ndarray,
+    size: tuple[int, int] = (224, 224),
+    mean: Sequence[float] | None = None,
+    std: Sequence[float] | None = None,
+    channels_last: bool = False,
+    out: torch.Tensor | None = None,
+    dtype: torch.dtype | None = None,
+) -> torch.Tensor:
+    """Preprocess a batch of images into a single model input tensor.
+
+    Resizing, the HWC to CHW layout change and normalization are written
+    directly into one preallocated buffer, so no per-image intermediate
+    tensors are created. Reduced-precision batches (numpy has no bfloat16)
+    go through a single float32 image that is cast into the buffer.
+
+    Args:
+        images: Sequence of uint8 images (H, W, C) in RGB format, or a stacked
+            uint8 array (N, H, W, C). Images may have different sizes.
+        size: Target size (height, width).
+        mean: Optional per-channel mean in [0, 1] scale, e.g. ImageNet's
+            ``(0.485, 0.456, 0.406)``. Requires ``std``.
+        std: Optional per-channel standard deviation in [0, 1] scale.
+        channels_last: Return a tensor in ``torch.channels_last`` memory format.
+        out: Optional tensor of shape (N, C, H, W) and ``dtype`` to write into,
+            e.g. a buffer reused across calls. Must be contiguous in the
+            requested format.
+        dtype: Tensor dtype, e.g. ``torch.bfloat16`` for reduced-precision
+            models. Defaults to float32.
+
+    Returns:
+        Preprocessed batch as torch tensor (N, C, H, W), scaled to [0, 1] and
+        then normalized with ``mean``/``std`` if given.
+    """
+    import cv2
+    import torch
+
+    if (mean is None) != (std is None):
+        raise ValueError("mean and std must be given together")
+    if len(images) == 0:
+        raise ValueError("Cannot preprocess an empty batch")
+
+    height, width = size
+    channels = images[0].shape[2] if images[0].ndim == 3 else 1
+    batch_shape = (len(images), channels, height, width)
+    memory_format = torch.channels_last if channels_last else torch.contiguous_format
+    dtype = dtype or torch.float32
+
+    if out is None:
+        out = torch.empty(batch_shape, dtype=dtype, memory_format=memory_format)
+    elif tuple(out.shape) != batch_shape or out.dtype != dtype:
+        raise ValueError(f"out must be a {dtype} tensor of shape {batch_shape}")
+    elif not out.is_contiguous(memory_format=memory_format):
+        raise ValueError("out is not contiguous in the requested memory format")
+
+    # Fold [0, 1] scaling and mean/std normalization into one multiply-add
+    scale = np.full(channels, 1.0 / 255.0, dtype=np.float32)
+    offset = None
+    if mean is not None and std is not None:
+        std_arr = np.asarray(std, dtype=np.float32)
+        scale = scale / std_arr
+        offset = -np.asarray(mean, dtype=np.float32) / std_arr
+
+    # Tensors in the layout numpy writes: (N, H, W, C) for channels_last storage
+    target = out.permute(0, 2, 3, 1) if channels_last else out
+    if not channels_last:
+        # Images are written through a CHW view
+        scale = scale[:, None, None]
+        offset = offset[:, None, None] if offset is not None else None
+    staging = None
+    if dtype == torch.float32:
+        buffer = target.numpy()
+    else:
+        staging = np.empty(target.shape[1:], dtype=np.float32)
+
+    # Reused resize target; cv2.resize takes (width, height)
+    resized = np.empty((height, width, *images[0].shape[2:]), dtype=np.uint8)
+    for index, image in enumerate(images):
+        if image.shape[:2] != (height, width):
+            image = cv2.resize(image, (width, height), dst=resized)
+        image = image.reshape(height, width, channels)
+        source = image if channels_last else image.transpose(2, 0, 1)
+        destination = buffer[index] if staging is None else staging
+        np.multiply(source, scale, out=destination)
+        if offset is not None:
+            np.add(destination, offset, out=destination)
+        if staging is not None:
+            target[index].copy_(torch.from_numpy(staging))
+    return out
+
+
+def content_key(data: bytes | bytearray | memoryview, *params: Any) -> str:
+    """Cache key for encoded image bytes and the parameters applied to them.
+
+    Args:
+        data: Encoded image bytes.
+        params: Anything else the cached value depends on, e.g. the target size
+            or model version. Must have a stable ``repr``.
+
+    Returns:
+        Hex digest identifying the content and parameters.
+    """
+    digest = hashlib.blake2b(data, digest_size=16)
+    if params:
+        digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def _is_tensor(value: Any) -> bool:
+    # A value cannot be a tensor before torch has been imported
+    torch = sys.modules.get("torch")
+    return torch is not None and isinstance(value, torch.Tensor)
+
+
+class ContentCache:
+    """Thread-safe LRU cache for preprocessed tensors and predictions.
+
+    Entries are keyed by :func:`content_key`, so byte-identical inputs hit the
+    cache no matter where they come from. The in-memory tier evicts least
+    recently used entries once ``max_bytes`` is exceeded. With ``directory``
+    set, tensors are also written there as ``.npy`` files and memory-mapped on
+    a memory miss, so they survive restarts and are shared between processes.
+    Other values (e.g. prediction dictionaries) and tensors of dtypes numpy
+    lacks (bfloat16) are kept in memory only.
+
+    Cached tensors are shared between callers and must not be modified in place.
+
+    Args:
+        max_bytes: Memory budget for the in-memory tier.
+        directory: Optional directory for the on-disk tier.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, directory: pathlib.Path | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.directory = pathlib.Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        path = self._path(key)
+        return key in self._entries or (path is not None and path.exists())
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for ``key``, or ``None`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        path = self._path(key)
+        if path is not None and path.exists():
+            import torch
+
+            # Copy-on-write mapping: pages are read lazily from the page cache
+            value = torch.from_numpy(np.load(path, mmap_mode="c"))
+            self._remember(key, value)
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache ``value`` under ``key``, evicting old entries if over budget."""
+        path = self._path(key)
+        if path is not None and _is_tensor(value) and not path.exists():
+            try:
+                array = value.detach().cpu().numpy()
+            except TypeError:
+                # No numpy dtype to save it as, e.g. bfloat16
+                array = None
+            if array is not None:
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with tmp.open("wb") as f:
+                    np.save(f, array)
+                os.replace(tmp, path)
+        self._remember(key, value)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier. Files in ``directory`` are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _remember(self, key: str, value: Any) -> None:
+        if _is_tensor(value) or isinstance(value, np.ndarray):
+            size = value.nbytes
+        else:
+            size = len(pickle.dumps(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
 
+    def _path(self, key: str) -> pathlib.Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / key[:2] / f"{key}.npy"
 
-def predict_simple(image_path: str | pathlib.Path) -> dict[str, Any]:
+
+def preprocess_bytes(
+    data: bytes,
+    size: tuple[int, int] = (224, 224),
+    mean: Sequence[float] | None = None,
+    std: Sequence[float] | None = None,
+    cache: ContentCache | None = None,
+) -> torch.Tensor:
+    """Decode and preprocess an encoded image, reusing cached results.
+
+    Args:
+        data: Encoded image bytes (JPEG, PNG, etc.).
+        size: Target size (height, width).
+        mean: Optional per-channel normalization mean, see :func:`preprocess_batch`.
+        std: Optional per-channel normalization std.
+        cache: Optional cache consulted before decoding. Keys include the
+            preprocessing parameters, so one cache can serve several settings.
+
+    Returns:
+        Preprocessed image as torch tensor (1, C, H, W).
+    """
+    if cache is None:
+        return preprocess_batch([load_image_from_buffer(data, size)], size, mean=mean, std=std)
+    key = content_key(data, "preprocess", size, mean, std)
+    tensor = cache.get(key)
+    if tensor is None:
+        tensor = preprocess_batch([load_image_from_buffer(data, size)], size, mean=mean, std=std)
+        cache.put(key, tensor)
+    return tensor
+
+
+def build_model(architecture: str = "resnet18", num_classes: int = 1000) -> torch.nn.Module:
+    """Build an untrained model to load checkpoint weights into.
+
+    Replace with your own network if it is not a torchvision architecture.
+
+    Args:
+        architecture: Name of a torchvision classification model.
+        num_classes: Number of output classes.
+
+    Returns:
+        Model with randomly initialized weights.
+    """
+    import torchvision
+
+    return torchvision.models.get_model(architecture, weights=None, num_classes=num_classes)
+
+
+def predict_batch(
+    images: Sequence[np.ndarray],
+    size: tuple[int, int] = (224, 224),
+    model: torch.nn.Module | None = None,
+    timings: dict[str, float] | None = None,
+    probabilities: bool = False,
+) -> list[dict[str, Any]]:
+    """Run a single batched forward pass over several images.
+
+    Without a model this returns placeholder predictions that demonstrate the
+    structure. Replace the postprocessing with your own task's outputs.
+
+    Args:
+        images: Images as numpy arrays (H, W, C) in RGB format.
+        size: Target size (height, width).
+        model: Classification model in eval mode, e.g. from the model registry.
+        timings: Optional dictionary that receives the ``"preprocess"`` and
+            ``"inference"`` durations of the batch in seconds.
+        probabilities: Also return each image's class probabilities as a
+            float32 array under ``"probabilities"``, e.g. for :func:`merge_tiles`.
+
+    Returns:
+        One prediction dictionary per input image, in input order.
+    """
+    if not images:
+        return []
+    start = time.perf_counter()
+    # Preprocess into a single (N, C, H, W) batch
+    batch = preprocess_batch(images, size, **input_format(model))
+    preprocessed = time.perf_counter()
+    if model is None:
+        # Placeholder: return dummy predictions
+        labels: list[Any] = ["placeholder"] * len(images)
+        scores = [0.0] * len(images)
+    else:
+        output = _probabilities(model, batch)
+        confidence, index = output.max(dim=-1)
+        labels, scores = index.tolist(), confidence.tolist()
+    if timings is not None:
+        timings["preprocess"] = preprocessed - start
+        timings["inference"] = time.perf_counter() - preprocessed
+    results = [
+        {
+            "image_shape": image.shape,
+            "processed_shape": [1, *batch.shape[1:]],
+            "prediction": label,
+            "confidence": score,
+        }
+        for image, label, score in zip(images, labels, scores, strict=True)
+    ]
+    if probabilities and model is not None:
+        for result, row in zip(results, output.float().numpy(), strict=True):
+            result["probabilities"] = row
+    return results
+
+
+def input_format(model: torch.nn.Module | None) -> dict[str, Any]:
+    """``preprocess_batch`` arguments matching the input a model expects.
+
+    Reduced-precision models from ``backends.apply_precision`` declare an
+    ``input_dtype`` and ``channels_last``; other models take float32 NCHW.
+    """
+    return {
+        "dtype": getattr(model, "input_dtype", None),
+        "channels_last": getattr(model, "channels_last", False),
+    }
+
+
+def _probabilities(model: torch.nn.Module, batch: torch.Tensor) -> torch.Tensor:
+    """Class probabilities (N, classes) of a classification model on the CPU."""
+    import torch
+
+    # Compiled and exported backends may not expose parameters
+    tensor = next(itertools.chain(model.parameters(), model.buffers()), None)
+    device = tensor.device if tensor is not None else torch.device("cpu")
+    with torch.inference_mode():
+        logits = model(batch.to(device))
+    return logits.softmax(dim=-1).cpu()
+
+
+def tile_positions(length: int, tile: int, stride: int) -> list[int]:
+    """Start offsets of tiles covering ``length``; the last tile ends at the edge."""
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile + 1, stride))
+    if starts[-1] != length - tile:
+        starts.append(length - tile)
+    return starts
+
+
+def iter_tiles(
+    image: np.ndarray, tile: tuple[int, int] = (512, 512), overlap: float = 0.25
+) -> Iterator[tuple[tuple[int, int, int, int], np.ndarray]]:
+    """Yield overlapping tiles covering an image, in row-major order.
+
+    Tiles are slices of ``image``, i.e. strided views: no pixels are copied.
+    Edge tiles are shifted inwards rather than padded, so every tile has the
+    same size. Dimensions smaller than the tile give a single, smaller tile.
+
+    Args:
+        image: Image (H, W, C).
+        tile: Tile size (height, width) in image pixels.
+        overlap: Fraction of a tile shared with its neighbour, in ``[0, 1)``.
+
+    Yields:
+        The tile's ``(y, x, height, width)`` box and its view of ``image``.
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap must be in [0, 1)")
+    image_height, image_width = image.shape[:2]
+    height, width = min(tile[0], image_height), min(tile[1], image_width)
+    rows = tile_positions(image_height, height, max(1, round(height * (1 - overlap))))
+    columns = tile_positions(image_width, width, max(1, round(width * (1 - overlap))))
+    for y in rows:
+        for x in columns:
+            yield (y, x, height, width), image[y : y + height, x : x + width]
+
+
+def _accumulate(
+    combined: torch.Tensor | None,
+    probabilities: torch.Tensor,
+    aggregate: Literal["mean", "max"],
+) -> torch.Tensor:
+    """Fold tile class probabilities (N, classes) into the running sum or maximum."""
+    import torch
+
+    if aggregate == "mean":
+        total = probabilities.sum(dim=0)
+        return total if combined is None else combined + total
+    peak = probabilities.amax(dim=0)
+    return peak if combined is None else torch.maximum(combined, peak)
+
+
+def _aggregate_label(
+    combined: torch.Tensor | None, tiles: int, aggregate: Literal["mean", "max"]
+) -> tuple[Any, float]:
+    """The image's label and confidence from its accumulated tile probabilities."""
+    if combined is None:
+        return "placeholder", 0.0
+    if aggregate == "mean":
+        combined = combined / tiles
+    confidence, index = combined.max(dim=-1)
+    return index.item(), confidence.item()
+
+
+def merge_tiles(
+    image_shape: tuple[int, ...],
+    tiles: Sequence[tuple[tuple[int, int, int, int], dict[str, Any]]],
+    aggregate: Literal["mean", "max"] = "mean",
+) -> dict[str, Any]:
+    """Combine separately predicted tiles into the image's prediction.
+
+    The counterpart of :func:`predict_tiled` for tiles that were predicted
+    elsewhere, e.g. one by one through a micro-batcher.
+
+    Args:
+        image_shape: Shape of the tiled image.
+        tiles: Each tile's ``(y, x, height, width)`` box and its prediction from
+            :func:`predict_batch` with ``probabilities=True``.
+        aggregate: ``"mean"`` or ``"max"`` of the tile class probabilities.
+
+    Returns:
+        The image prediction in the format of :func:`predict_tiled`.
+    """
+    import torch
+
+    if aggregate not in ("mean", "max"):
+        raise ValueError(f"Unknown aggregate: {aggregate!r}")
+    if not tiles:
+        raise ValueError("No tiles to merge")
+    combined = None
+    if all("probabilities" in prediction for _, prediction in tiles):
+        stacked = np.stack([prediction["probabilities"] for _, prediction in tiles])
+        combined = _accumulate(None, torch.from_numpy(stacked), aggregate)
+    label, score = _aggregate_label(combined, len(tiles), aggregate)
+    return {
+        "image_shape": image_shape,
+        "processed_shape": [len(tiles), *tiles[0][1]["processed_shape"][1:]],
+        "prediction": label,
+        "confidence": score,
+        "tiles": [
+            {"box": list(box), "prediction": p["prediction"], "confidence": p["confidence"]}
+            for box, p in tiles
+        ],
+    }
+
+
+def predict_tiled(
+    image: np.ndarray,
+    tile: tuple[int, int] = (512, 512),
+    overlap: float = 0.25,
+    size: tuple[int, int] = (224, 224),
+    model: torch.nn.Module | None = None,
+    batch_size: int = 16,
+    aggregate: Literal["mean", "max"] = "mean",
+    timings: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """Predict a high-resolution image tile by tile instead of shrinking it whole.
+
+    Tiles from :func:`iter_tiles` are resized to ``size`` and run through the
+    model ``batch_size`` at a time, reusing one input buffer, so memory beyond
+    the decoded image stays constant however large the image is.
+
+    Args:
+        image: Image (H, W, C) in RGB format, at full resolution.
+        tile: Tile size (height, width) in image pixels.
+        overlap: Fraction of a tile shared with its neighbour.
+        size: Model input size (height, width) each tile is resized to.
+        model: Classification model in eval mode. ``None`` returns placeholders.
+        batch_size: Tiles per forward pass.
+        aggregate: How tile class probabilities combine into the image's:
+            ``"mean"`` averages them, ``"max"`` keeps each class's highest
+            probability, e.g. to flag a defect visible in any one tile.
+        timings: Optional dictionary that receives the total ``"preprocess"``
+            and ``"inference"`` durations in seconds.
+
+    Returns:
+        Prediction dictionary for the image, with one entry per tile under
+        ``"tiles"`` giving its ``box`` as ``[y, x, height, width]``.
+    """
+    import torch
+
+    if aggregate not in ("mean", "max"):
+        raise ValueError(f"Unknown aggregate: {aggregate!r}")
+    channels = image.shape[2] if image.ndim == 3 else 1
+    options = input_format(model)
+    memory_format = torch.channels_last if options["channels_last"] else torch.contiguous_format
+    buffer = torch.empty(
+        batch_size,
+        channels,
+        *size,
+        dtype=options["dtype"] or torch.float32,
+        memory_format=memory_format,
+    )
+    tiles = iter_tiles(image, tile, overlap)
+    results: list[dict[str, Any]] = []
+    combined: torch.Tensor | None = None
+    preprocess_time = inference_time = 0.0
+    while chunk := list(itertools.islice(tiles, batch_size)):
+        start = time.perf_counter()
+        views = [view for _, view in chunk]
+        batch = preprocess_batch(views, size, out=buffer[: len(chunk)], **options)
+        preprocessed = time.perf_counter()
+        if model is None:
+            # Placeholder: return dummy predictions
+            labels: list[Any] = ["placeholder"] * len(chunk)
+            scores = [0.0] * len(chunk)
+        else:
+            probabilities = _probabilities(model, batch)
+            confidence, index = probabilities.max(dim=-1)
+            labels, scores = index.tolist(), confidence.tolist()
+            combined = _accumulate(combined, probabilities, aggregate)
+        preprocess_time += preprocessed - start
+        inference_time += time.perf_counter() - preprocessed
+        results.extend(
+            {"box": list(box), "prediction": label, "confidence": score}
+            for (box, _), label, score in zip(chunk, labels, scores, strict=True)
+        )
+
+    label, score = _aggregate_label(combined, len(results), aggregate)
+    if timings is not None:
+        timings["preprocess"] = preprocess_time
+        timings["inference"] = inference_time
+    return {
+        "image_shape": image.shape,
+        "processed_shape": [len(results), channels, *size],
+        "prediction": label,
+        "confidence": score,
+        "tiles": results,
+    }
+
+
+def predict_bytes(data: bytes) -> dict[str, Any]:
+    """Run prediction on an encoded image held in memory.
+
+    Args:
+        data: Encoded image bytes (JPEG, PNG, etc.).
+
+    Returns:
+        Dictionary with prediction results.
+    """
+    image = load_image_from_bytes(data)
+    return predict_batch([image])[0]
+
+
+def predict_simple(
+    image_path: str | pathlib.Path,
+    model: torch.nn.Module | None = None,
+    tile: tuple[int, int] | None = None,
+    overlap: float = 0.25,
+) -> dict[str, Any]:
     """Simple example prediction function.
 
     This is a placeholder that demonstrates the structure.
-    Replace with your actual model inference logic.
+    Replace with your actual model inference logic in `predict_batch`.
 
     Args:
         image_path: Path to the image file.
+        model: Optional model, e.g. wrapped by ``backends.optimize_model``.
+        tile: Predict overlapping tiles of this size (height, width) at full
+            resolution, see :func:`predict_tiled`, instead of the whole image
+            resized to the model input.
+        overlap: Fraction of a tile shared with its neighbour when tiling.
 
     Returns:
         Dictionary with prediction results.
     """
     image = load_image(image_path)
-    # Preprocess
-    tensor = preprocess_image(image)
-    # Placeholder: return dummy prediction
-    # Replace this with actual model inference
-    return {
-        "image_shape": image.shape,
-        "processed_shape": list(tensor.shape),
-        "prediction": "placeholder",
-        "confidence": 0.0,
-    }
-
+    if tile is not None:
+        return predict_tiled(image, tile, overlap, model=model)
+    return predict_batch([image], model=model)[0]